@@ -0,0 +1,70 @@
+"""
+Agent 생성 비용 벤치마크: 호출마다 Agent를 새로 만드는 방식과 AgentPool 재사용 방식 비교
+
+모델 호출은 하지 않고 호출 직전까지의 준비 비용(모델 클라이언트 생성, 도구 스키마 구성 등)만 측정합니다.
+
+    python benchmarks/bench_agent_pool.py --iterations 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "test03_review_moderator"))
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+from strands import Agent
+
+from review_common.agent_pool import AgentPool
+from review_moderator.agent import MODEL_ID, MODERATION_TOOLS, UNIFIED_MODERATOR_PROMPT
+from review_moderator.routing import ROUTING_POLICIES
+from review_moderator.tools import IMAGE_MATCH_PROMPT, PROFANITY_PROMPT
+
+# 실제로 실행되는 Agent 구성: (모델 id, 시스템 프롬프트, 도구)
+# 검사별 Agent는 라우팅 정책의 첫 단계 모델을 사용하고 도구가 없습니다 (이미지는 메시지에 바이트로 포함)
+SCENARIOS = {
+    "profanity": (ROUTING_POLICIES["profanity"].tiers[0], PROFANITY_PROMPT, []),
+    "image_match": (ROUTING_POLICIES["image_match"].tiers[0], IMAGE_MATCH_PROMPT, []),
+    "moderator": (MODEL_ID, UNIFIED_MODERATOR_PROMPT, MODERATION_TOOLS),
+}
+
+
+def measure(fn, iterations):
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    return statistics.mean(durations), durations[int(len(durations) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'scenario':<14} {'mode':<10} {'mean(ms)':>10} {'p99(ms)':>10}")
+    for name, (model_id, system_prompt, tools) in SCENARIOS.items():
+
+        def fresh():
+            Agent(model=model_id, system_prompt=system_prompt, tools=tools, callback_handler=None)
+
+        pool = AgentPool()
+
+        def pooled():
+            with pool.checkout(model_id, system_prompt, tools):
+                pass
+
+        for mode, fn in (("fresh", fresh), ("pooled", pooled)):
+            mean, p99 = measure(fn, args.iterations)
+            print(f"{name:<14} {mode:<10} {mean:>10.3f} {p99:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
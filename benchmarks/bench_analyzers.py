@@ -0,0 +1,230 @@
+"""
+분석기 처리량 벤치마크: 가짜 모델(FakeModel)로 Bedrock 호출 없이 처리량/지연 시간/메모리를 측정합니다.
+
+analyze_sentiment, search_keywords, moderate_review 를 동시성 수준별로 실행하고
+reviews/sec, 리뷰당 p50/p99 지연 시간, tracemalloc 기준 최대 메모리 증가량을 출력합니다.
+
+- async 모드: *_async API를 asyncio로 실행 (동시성 = 동시에 처리하는 리뷰 수 = 전역 동시 호출 한도)
+- sync 모드: 기존 동기 API를 스레드 풀에서 실행 (동시성 = 스레드 수)
+- 결과 캐시는 끄고 측정합니다
+- --engine agent 에서는 가짜 모델도 검수 도구를 호출(toolUse)하므로 도구 실행과 최종 응답까지의 왕복이 포함됩니다
+- --failure-kind throttle 로 Bedrock throttling을 흉내 내면 재시도/서킷 브레이커/로컬 결과 대체(degr) 동작을 확인할 수 있습니다
+
+    python benchmarks/bench_analyzers.py --reviews 500 --concurrency 1 8 32 128
+    python benchmarks/bench_analyzers.py --mode sync --latency-ms 200 --failure-rate 0.01
+    RETRY_BASE_DELAY_SECONDS=0.05 python benchmarks/bench_analyzers.py --failure-rate 0.3 --failure-kind throttle --rate-limit 50
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "test01_review_sentiment_analyzer"))
+sys.path.append(os.path.join(ROOT, "test02_review_keyword_extractor"))
+sys.path.append(os.path.join(ROOT, "test03_review_moderator"))
+
+from keyword_extractor.agent import search_keywords, search_keywords_async
+from review_common.agent_pool import default_pool
+from review_common.concurrency import set_max_concurrency
+from review_common.fake_model import DEFAULT_FAILURE_KIND, FakeModel
+from review_common.resilience import resilience_stats, set_rate_limit
+from review_common.response_parser import structured_output_stats
+from review_common.result_cache import set_result_cache
+from review_moderator.agent import moderate_review, moderate_review_async
+from review_moderator.routing import TIERED_MODELS, routing_stats
+from sentiment_analyzer.agent import analyze_sentiment, analyze_sentiment_async
+
+PRODUCT_DATA = {"name": "프리미엄 무선 이어폰", "category": "전자기기"}
+
+REVIEW_TEMPLATES = [
+    "음질이 정말 좋아요. 배송도 빨라서 만족합니다 ({n})",
+    "배터리가 생각보다 빨리 닳아서 실망했어요 ({n})",
+    "그냥 무난한 제품입니다. 가격 대비 쓸만해요 ({n})",
+    "디자인은 예쁜데 귀가 좀 아파요 ({n})",
+    "노이즈 캔슬링 성능이 최고예요. 추천합니다 ({n})",
+]
+
+
+def build_reviews(size, seed):
+    rng = random.Random(seed)
+    return [
+        (rng.choice(REVIEW_TEMPLATES).format(n=i), rng.randint(1, 5)) for i in range(size)
+    ]
+
+
+def sync_call(analyzer, args):
+    if analyzer == "sentiment":
+        return lambda text, rating: analyze_sentiment(text)
+    if analyzer == "keywords":
+        return lambda text, rating: search_keywords(text, semantic=args.semantic)
+    return lambda text, rating: moderate_review(text, rating, PRODUCT_DATA, engine=args.engine)
+
+
+def async_call(analyzer, args):
+    if analyzer == "sentiment":
+        return lambda text, rating: analyze_sentiment_async(text)
+    if analyzer == "keywords":
+        return lambda text, rating: search_keywords_async(text, semantic=args.semantic)
+    return lambda text, rating: moderate_review_async(
+        text, rating, PRODUCT_DATA, engine=args.engine
+    )
+
+
+def run_sync(call, reviews, concurrency):
+    def timed(review):
+        start = time.perf_counter()
+        try:
+            result = call(*review)
+            ok = True
+        except Exception:
+            result, ok = None, False
+        return time.perf_counter() - start, ok, _degraded(result)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(timed, reviews))
+
+
+def run_async(call, reviews, concurrency):
+    async def timed(review, in_flight):
+        # sync 모드와 같이 동시에 처리 중인 리뷰 수를 제한하고, 대기 시간은 지연 시간에서 제외합니다
+        async with in_flight:
+            start = time.perf_counter()
+            try:
+                result = await call(*review)
+                ok = True
+            except Exception:
+                result, ok = None, False
+            return time.perf_counter() - start, ok, _degraded(result)
+
+    async def main():
+        set_max_concurrency(concurrency)
+        in_flight = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(timed(review, in_flight) for review in reviews))
+
+    return asyncio.run(main())
+
+
+def _degraded(result):
+    """모델 대신 로컬 결과로 대체된 응답인지"""
+    return isinstance(result, dict) and bool(result.get("degraded"))
+
+
+def measure(runner, call, reviews, concurrency, trace_memory):
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    results = runner(call, reviews, concurrency)
+    elapsed = time.perf_counter() - start
+    peak_mb = 0.0
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak_mb = peak / 1024 / 1024
+
+    latencies = sorted(latency * 1000 for latency, _, _ in results)
+    failures = sum(1 for _, ok, _ in results if not ok)
+    degraded = sum(1 for _, _, is_degraded in results if is_degraded)
+    return {
+        "reviews_per_sec": len(reviews) / elapsed,
+        "p50": statistics.median(latencies),
+        "p99": latencies[max(int(len(latencies) * 0.99) - 1, 0)],
+        "peak_mb": peak_mb,
+        "failures": failures,
+        "degraded": degraded,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--analyzers", nargs="+", default=["sentiment", "keywords", "moderate"])
+    parser.add_argument("--reviews", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--mode", choices=["async", "sync"], default="async")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--failure-kind", choices=["error", "throttle"], default=DEFAULT_FAILURE_KIND)
+    parser.add_argument("--rate-limit", type=float, default=None, help="모델 id별 초당 요청 수 제한 (기본: 환경 변수)")
+    parser.add_argument("--semantic", choices=["auto", "always", "never"], default="always")
+    parser.add_argument("--engine", choices=["agent", "parallel"], default="parallel")
+    parser.add_argument("--no-memory", action="store_true", help="tracemalloc 측정 생략")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    logging.getLogger("strands").setLevel(logging.WARNING)
+    set_result_cache(None)
+    default_pool.model_factory = lambda model_id: FakeModel(
+        model_id,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+        failure_kind=args.failure_kind,
+        seed=args.seed,
+    )
+    if args.rate_limit is not None:
+        for model_id in TIERED_MODELS:
+            set_rate_limit(model_id, args.rate_limit)
+    default_pool.clear()
+    # 동시성 수준만큼 Agent가 유지되도록 풀 크기를 맞춥니다
+    default_pool.max_size = max(args.concurrency)
+
+    reviews = build_reviews(args.reviews, args.seed)
+    runner = run_async if args.mode == "async" else run_sync
+    print(
+        f"mode={args.mode} reviews={args.reviews} latency={args.latency_ms}ms "
+        f"jitter={args.jitter_ms}ms failure_rate={args.failure_rate} ({args.failure_kind})"
+    )
+    print(
+        f"{'analyzer':<10} {'conc':>5} {'reviews/s':>10} {'p50(ms)':>9} {'p99(ms)':>9} "
+        f"{'peak(MB)':>9} {'fail':>5} {'degr':>5}"
+    )
+    for analyzer in args.analyzers:
+        call = (async_call if args.mode == "async" else sync_call)(analyzer, args)
+        for concurrency in args.concurrency:
+            stats = measure(runner, call, reviews, concurrency, not args.no_memory)
+            print(
+                f"{analyzer:<10} {concurrency:>5} {stats['reviews_per_sec']:>10.1f} "
+                f"{stats['p50']:>9.1f} {stats['p99']:>9.1f} {stats['peak_mb']:>9.1f} "
+                f"{stats['failures']:>5} {stats['degraded']:>5}"
+            )
+
+    if "moderate" in args.analyzers:
+        print("\nmodel routing (check / model: attempts, hit rate, share of final answers)")
+        for check, models in sorted(routing_stats().items()):
+            for model_id, entry in models.items():
+                print(
+                    f"  {check:<20} {model_id:<48} {entry.get('attempts', 0):>6} "
+                    f"{entry['hit_rate']:>7.1%} {entry['served_share']:>7.1%}"
+                )
+
+    model_stats = {key: entry for key, entry in resilience_stats().items() if key in TIERED_MODELS}
+    if model_stats:
+        print("\nresilience (model: throttled, retries, rate-limited waits, circuit opened, rejected, state)")
+        for model_id, entry in sorted(model_stats.items()):
+            print(
+                f"  {model_id:<48} {entry.get('throttled', 0):>6} {entry.get('retries', 0):>6} "
+                f"{entry.get('rate_limited', 0):>6} {entry.get('circuit_opened', 0):>4} "
+                f"{entry.get('rejected', 0):>6} {entry.get('circuit', '-'):>9}"
+            )
+
+    parse_stats = structured_output_stats()
+    if parse_stats:
+        print("\nresponse parsing (label: direct, repaired = retries avoided, re-asked, re-ask rate)")
+        for label, entry in sorted(parse_stats.items()):
+            print(
+                f"  {label:<20} {entry.get('parsed_direct', 0):>6} {entry['retries_avoided']:>6} "
+                f"{entry.get('structured_output_calls', 0):>6} {entry['reask_rate']:>7.1%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
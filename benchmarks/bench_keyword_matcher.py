@@ -0,0 +1,91 @@
+"""
+키워드 로컬 매처 벤치마크: 모든 리뷰를 LLM으로 보내는 방식과 로컬 매처 우선(semantic="auto") 방식 비교
+
+합성 리뷰 코퍼스에 대해 로컬 매처 지연 시간과 LLM 호출 수를 측정합니다.
+LLM 지연 시간은 측정하지 않고 --llm-latency-ms 값(가정치)으로 총 소요 시간을 추정합니다.
+
+    python benchmarks/bench_keyword_matcher.py --reviews 100000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "test02_review_keyword_extractor"))
+
+from keyword_extractor.matcher import KeywordMatcher
+
+KEYWORDS_FILE = os.path.join(
+    ROOT, "test02_review_keyword_extractor", "keyword_extractor", "registered_keywords.txt"
+)
+
+FRAGMENTS = [
+    "{kw}이 생각보다 좋아요",
+    "{kw}는 무난합니다",
+    "{kw}에서도 만족스러워요",
+    "고{kw} 느낌이라 좋네요",
+    "배송이 빨라서 좋았어요",
+    "가격 대비 쓸만한 것 같습니다",
+    "귀가 작아서 그런지 좀 아파요",
+    "배터리가 오래 갑니다",
+    "음질은 그냥저냥이에요",
+]
+
+
+def build_corpus(keywords, size, seed):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        parts = [
+            rng.choice(FRAGMENTS).format(kw=rng.choice(keywords))
+            for _ in range(rng.randint(1, 4))
+        ]
+        corpus.append(". ".join(parts) + ".")
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reviews", type=int, default=100_000)
+    parser.add_argument("--llm-latency-ms", type=float, default=1500.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with open(KEYWORDS_FILE, encoding="utf-8") as f:
+        keywords = [line.strip() for line in f if line.strip()]
+    corpus = build_corpus(keywords, args.reviews, args.seed)
+
+    start = time.perf_counter()
+    matcher = KeywordMatcher(keywords)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    durations = []
+    no_local_match = 0
+    for review in corpus:
+        start = time.perf_counter()
+        matches = matcher.find(review)
+        durations.append((time.perf_counter() - start) * 1_000_000)
+        if not matches:
+            no_local_match += 1
+    durations.sort()
+
+    baseline_calls = len(corpus)
+    local_calls = no_local_match
+    print(f"reviews                : {len(corpus)}")
+    print(f"keywords               : {len(keywords)} (build {build_ms:.2f} ms)")
+    print(f"local match p50 / p99  : {statistics.median(durations):.1f} / {durations[int(len(durations) * 0.99) - 1]:.1f} us")
+    print(f"LLM calls (LLM only)   : {baseline_calls}")
+    print(f"LLM calls (local auto) : {local_calls} ({local_calls / baseline_calls:.1%})")
+    print(
+        f"est. total time        : {baseline_calls * args.llm_latency_ms / 1000:.0f} s -> "
+        f"{(local_calls * args.llm_latency_ms + sum(durations) / 1000) / 1000:.0f} s "
+        f"(assuming {args.llm_latency_ms:.0f} ms per LLM call)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+로컬 의미 매처(SemanticMatcher) 벤치마크: 키워드 10,000개 x 리뷰 100,000건
+
+합성 키워드/리뷰로 키워드 행렬 생성 시간, 배치당 지연 시간, 처리량, semantic 매칭 수를 측정합니다.
+모델 호출이나 네트워크 없이 CPU만 사용합니다.
+
+    python benchmarks/bench_semantic_matcher.py --keywords 10000 --reviews 100000
+    python benchmarks/bench_semantic_matcher.py --embedder <sentence-transformers 모델 이름>
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "test02_review_keyword_extractor"))
+
+from keyword_extractor.semantic import SemanticMatcher, create_embedder
+
+SYLLABLES = "가나다라마바사아자차카타파하배터리음질화질디자인착용감충전무선소리색상포장"
+
+FRAGMENTS = [
+    "{kw}이 생각보다 좋아요",
+    "{spaced}도 만족스러워요",
+    "{kw} 부분은 무난합니다",
+    "배송이 빨라서 좋았어요",
+    "가격 대비 쓸만한 것 같습니다",
+    "귀가 작아서 그런지 좀 아파요",
+]
+
+
+def build_keywords(size, rng):
+    keywords = set()
+    while len(keywords) < size:
+        keywords.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(keywords)
+
+
+def build_corpus(keywords, size, rng):
+    corpus = []
+    for _ in range(size):
+        parts = []
+        for _ in range(rng.randint(1, 4)):
+            keyword = rng.choice(keywords)
+            # 띄어쓰기 변형 ("무선충전" -> "무선 충전")으로 로컬 exact 매처가 놓치는 경우를 만듭니다
+            cut = rng.randint(1, len(keyword) - 1)
+            spaced = f"{keyword[:cut]} {keyword[cut:]}"
+            parts.append(rng.choice(FRAGMENTS).format(kw=keyword, spaced=spaced))
+        corpus.append(". ".join(parts) + ".")
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keywords", type=int, default=10_000)
+    parser.add_argument("--reviews", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--embedder", default="hashing")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    keywords = build_keywords(args.keywords, rng)
+    corpus = build_corpus(keywords, args.reviews, rng)
+
+    start = time.perf_counter()
+    matcher = SemanticMatcher(keywords, embedder=create_embedder(args.embedder))
+    build_ms = (time.perf_counter() - start) * 1000
+
+    durations = []
+    matched_reviews = 0
+    total_matches = 0
+    start = time.perf_counter()
+    for offset in range(0, len(corpus), args.batch_size):
+        batch = corpus[offset : offset + args.batch_size]
+        batch_start = time.perf_counter()
+        results = matcher.find_batch(batch)
+        durations.append((time.perf_counter() - batch_start) * 1000)
+        matched_reviews += sum(1 for matches in results if matches)
+        total_matches += sum(len(matches) for matches in results)
+    elapsed = time.perf_counter() - start
+    durations.sort()
+
+    print(f"embedder               : {matcher.embedder.name} (threshold {matcher.threshold})")
+    print(f"keywords               : {len(keywords)} (matrix {matcher._term_matrix.nbytes / 1024 / 1024:.1f} MiB, build {build_ms:.0f} ms)")
+    print(f"reviews                : {len(corpus)} (batch {args.batch_size})")
+    print(f"batch p50 / p99        : {statistics.median(durations):.1f} / {durations[max(0, int(len(durations) * 0.99) - 1)]:.1f} ms")
+    print(f"throughput             : {len(corpus) / elapsed:,.0f} reviews/s ({elapsed:.1f} s)")
+    print(f"semantic matches       : {total_matches} in {matched_reviews} reviews ({matched_reviews / len(corpus):.1%})")
+
+
+if __name__ == "__main__":
+    main()
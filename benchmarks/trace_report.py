@@ -0,0 +1,123 @@
+"""
+트레이스 파일(JSON Lines) 분석: 느린 호출의 span 트리와 hot path, span 이름별 self time 합계
+
+TRACE_EXPORTER=json 으로 실행해 기록한 파일(기본 data/traces.jsonl)을 읽습니다.
+트리에서 * 표시는 각 단계에서 가장 오래 걸린 자식을 따라간 경로(hot path)입니다.
+
+    TRACE_EXPORTER=json streamlit run test03_review_moderator/streamlit_app.py
+    python benchmarks/trace_report.py --top 3
+    python benchmarks/trace_report.py --root review.moderation
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from review_common.tracing import TRACE_FILE
+
+
+def load_traces(path):
+    traces = defaultdict(list)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                span = json.loads(line)
+                traces[span["trace_id"]].append(span)
+    return traces
+
+
+def build_tree(spans):
+    by_id = {span["span_id"]: span for span in spans}
+    children = defaultdict(list)
+    roots = []
+    for span in spans:
+        if span["parent_id"] in by_id:
+            children[span["parent_id"]].append(span)
+        else:
+            roots.append(span)
+    for items in children.values():
+        items.sort(key=lambda span: span["start"])
+    return roots, children
+
+
+def self_time_ms(span, children):
+    """자식 span이 겹쳐 실행된 구간을 한 번만 빼고 남은 시간"""
+    intervals = sorted((child["start"], child["end"]) for child in children.get(span["span_id"], []))
+    covered, cursor = 0, span["start"]
+    for start, end in intervals:
+        start, end = max(start, cursor), min(end, span["end"])
+        if end > start:
+            covered += end - start
+            cursor = end
+    return max(span["end"] - span["start"] - covered, 0) / 1e6
+
+
+def hot_path(span, children):
+    path = {span["span_id"]}
+    while children.get(span["span_id"]):
+        span = max(children[span["span_id"]], key=lambda child: child["duration_ms"])
+        path.add(span["span_id"])
+    return path
+
+
+def describe(span):
+    attributes = span["attributes"]
+    details = []
+    for key in ("gen_ai.request.model", "gen_ai.tool.name", "review.input_tokens", "review.output_tokens"):
+        if key in attributes:
+            details.append(f"{key.split('.')[-1]}={attributes[key]}")
+    if attributes.get("review.cache_hit"):
+        details.append("cache_hit")
+    if attributes.get("review.degraded"):
+        details.append("degraded")
+    if span["status"] == "ERROR":
+        details.append("ERROR")
+    return f" ({', '.join(details)})" if details else ""
+
+
+def print_tree(span, children, path, depth=0):
+    marker = "*" if span["span_id"] in path else " "
+    print(f"{marker} {'  ' * depth}{span['name']:<{48 - 2 * depth}} {span['duration_ms']:>9.1f} ms{describe(span)}")
+    for child in children.get(span["span_id"], []):
+        print_tree(child, children, path, depth + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", default=TRACE_FILE)
+    parser.add_argument("--top", type=int, default=5, help="트리를 출력할 가장 느린 트레이스 수")
+    parser.add_argument("--root", default=None, help="루트 span 이름으로 필터 (예: review.moderation)")
+    args = parser.parse_args()
+
+    traces = load_traces(args.file)
+    trees = []
+    self_times = defaultdict(lambda: [0, 0.0])
+    for spans in traces.values():
+        roots, children = build_tree(spans)
+        for span in spans:
+            entry = self_times[span["name"]]
+            entry[0] += 1
+            entry[1] += self_time_ms(span, children)
+        for root in roots:
+            if args.root is None or root["name"] == args.root:
+                trees.append((root, children))
+
+    trees.sort(key=lambda tree: tree[0]["duration_ms"], reverse=True)
+    print(f"traces: {len(traces)} (file {args.file})\n")
+    for root, children in trees[: args.top]:
+        print(f"trace {root['trace_id']}")
+        print_tree(root, children, hot_path(root, children))
+        print()
+
+    print(f"{'span':<48} {'count':>7} {'self ms':>11} {'avg ms':>9}")
+    for name, (count, total) in sorted(self_times.items(), key=lambda item: item[1][1], reverse=True):
+        print(f"{name:<48} {count:>7} {total:>11.1f} {total / count:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,310 @@
-def main():
-    print("Hello from miscellaneous!")
+"""
+리뷰 파일 일괄 처리 CLI
+
+    python main.py sentiment --in reviews.jsonl --out results.jsonl
+    python main.py keywords --in reviews.csv --out results.jsonl --workers 32
+    python main.py moderate --in reviews.jsonl --out results.jsonl --engine parallel
+
+pip install -e . 로 설치하면 같은 명령을 miscellaneous sentiment ... 로 실행할 수 있습니다.
+(편집 가능 설치 전용: 일반 설치는 main.py 만 복사되어 review_common/실습 폴더를 찾지 못합니다)
+
+- 입력(JSONL/CSV)은 한 줄씩 읽고, 동시에 처리 중인 리뷰 수는 --workers * 2 를 넘지 않습니다
+- 결과는 끝나는 순서대로 JSONL 한 줄씩 기록합니다 (index: 입력 레코드 번호, 0부터)
+- 체크포인트 파일에는 "앞에서부터 결과 기록이 끝난 레코드 수"가 저장되며,
+  같은 명령을 다시 실행하면 그 지점부터 이어서 처리합니다 (--restart 로 처음부터)
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+LABS = (
+    "test01_review_sentiment_analyzer",
+    "test02_review_keyword_extractor",
+    "test03_review_moderator",
+)
+# 설치된 miscellaneous 명령으로 실행할 때도 review_common 과 실습 폴더를 찾을 수 있도록 추가
+for lab in ("",) + LABS:
+    sys.path.append(os.path.join(ROOT, lab))
+
+logger = logging.getLogger("miscellaneous")
+
+DEFAULT_WORKERS = 8
+# 체크포인트를 최소 이 간격(초)마다 갱신합니다
+CHECKPOINT_INTERVAL = 1.0
+PROGRESS_INTERVAL = 1000
+
+
+def read_records(path: str, input_format: str) -> Iterator[Tuple[int, Dict[str, Any], Optional[str]]]:
+    """
+    입력 파일을 한 레코드씩 읽습니다.
+
+    Returns:
+        Iterator: (레코드 번호, 레코드, 파싱 오류 메시지)
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if input_format == "csv":
+            for index, row in enumerate(csv.DictReader(f)):
+                yield index, row, None
+            return
+
+        index = 0
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                error = None if isinstance(record, dict) else "JSON 객체가 아닙니다."
+            except json.JSONDecodeError as e:
+                record, error = {}, f"JSON 파싱 실패: {e}"
+            yield index, record if isinstance(record, dict) else {}, error
+            index += 1
+
+
+def load_checkpoint(path: str) -> int:
+    """체크포인트 파일의 offset (없으면 0)"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return int(json.load(f).get("offset", 0))
+    except FileNotFoundError:
+        return 0
+
+
+def save_checkpoint(path: str, offset: int, input_path: str) -> None:
+    """체크포인트를 임시 파일에 쓴 뒤 교체합니다. (쓰는 도중 중단되어도 이전 값이 남음)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"offset": offset, "input": os.path.abspath(input_path)}, f)
+    os.replace(tmp_path, path)
+
+
+def completed_after(output_path: str, offset: int) -> Set[int]:
+    """
+    이전 실행에서 offset 이후로 이미 기록된 레코드 번호
+
+    결과는 끝나는 순서대로 기록되므로 offset 뒤에도 기록된 레코드가 있을 수 있습니다.
+    (최대 동시 처리 수만큼이라 메모리 사용량은 작습니다)
+    """
+    done: Set[int] = set()
+    try:
+        with open(output_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    index = json.loads(line).get("index", -1)
+                except (json.JSONDecodeError, AttributeError):
+                    # 마지막 줄이 쓰다 만 상태일 수 있습니다
+                    continue
+                if isinstance(index, int) and index >= offset:
+                    done.add(index)
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def _review_text(record: Dict[str, Any], args: argparse.Namespace) -> str:
+    text = record.get(args.text_field)
+    if not text:
+        raise ValueError(f"'{args.text_field}' 필드가 비어 있습니다.")
+    return str(text)
+
+
+async def analyze_record(record: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    """서브커맨드에 맞는 분석기로 레코드 하나를 처리합니다."""
+    if args.command == "sentiment":
+        from sentiment_analyzer.agent import analyze_sentiment_async
+
+        return await analyze_sentiment_async(_review_text(record, args), timeout=args.timeout)
+
+    if args.command == "keywords":
+        from keyword_extractor.agent import search_keywords_async
+
+        return await search_keywords_async(
+            _review_text(record, args), semantic=args.semantic, timeout=args.timeout
+        )
+
+    from review_moderator.agent import moderate_review_async
+
+    image = None
+    image_path = record.get("image_path")
+    if image_path:
+        from PIL import Image
+
+        image = await asyncio.to_thread(Image.open, image_path)
+    product_data = record.get("product_data")
+    if not isinstance(product_data, dict):
+        product_data = {
+            "name": record.get("product_name", "Unknown"),
+            "category": record.get("category", "알수없음"),
+        }
+    response = await moderate_review_async(
+        _review_text(record, args),
+        int(record.get("rating", 0)),
+        product_data,
+        image=image,
+        engine=args.engine,
+        timeout=args.timeout,
+    )
+    return {**response, "moderation_result": response["moderation_result"].model_dump()}
+
+
+async def process_one(
+    index: int, record: Dict[str, Any], parse_error: Optional[str], args: argparse.Namespace
+) -> Dict[str, Any]:
+    """레코드 하나를 처리해 출력 줄(dict)을 만듭니다. 실패해도 예외 대신 error를 기록합니다."""
+    output: Dict[str, Any] = {"index": index, "id": record.get(args.id_field)}
+    if parse_error:
+        return {**output, "success": False, "error": parse_error}
+    try:
+        result = await analyze_record(record, args)
+    except asyncio.TimeoutError:
+        return {**output, "success": False, "error": f"{args.timeout}초 안에 처리되지 않았습니다."}
+    except Exception as e:
+        return {**output, "success": False, "error": f"{type(e).__name__}: {e}"}
+    return {**output, "success": bool(result.get("success", True)), "result": result}
+
+
+async def run(args: argparse.Namespace) -> Dict[str, int]:
+    """입력을 스트리밍으로 읽어 동시에 처리하고, 결과와 체크포인트를 기록합니다."""
+    from review_common.concurrency import set_max_concurrency
+
+    set_max_concurrency(args.workers)
+    checkpoint_path = args.checkpoint or f"{args.out}.ckpt"
+    input_format = args.format or ("csv" if args.input.lower().endswith(".csv") else "jsonl")
+
+    if args.restart:
+        offset, already_done = 0, set()
+        for path in (args.out, checkpoint_path):
+            if os.path.exists(path):
+                os.remove(path)
+    else:
+        offset = load_checkpoint(checkpoint_path)
+        already_done = completed_after(args.out, offset)
+    if offset or already_done:
+        logger.info("체크포인트에서 이어서 처리합니다: offset=%d", offset)
+
+    counts = {"processed": 0, "failed": 0, "skipped": offset + len(already_done)}
+    # offset 이후 끝난 레코드 번호 (offset이 앞으로 이동하면 제거)
+    finished = set(already_done)
+    max_in_flight = args.workers * 2
+    in_flight: Set[asyncio.Task] = set()
+    last_checkpoint = time.monotonic()
+
+    with open(args.out, "a", encoding="utf-8") as out:
+
+        def write_result(line: Dict[str, Any]) -> None:
+            nonlocal offset, last_checkpoint
+            out.write(json.dumps(line, ensure_ascii=False) + "\n")
+            counts["processed"] += 1
+            counts["failed"] += 0 if line["success"] else 1
+            finished.add(line["index"])
+            while offset in finished:
+                finished.remove(offset)
+                offset += 1
+            if counts["processed"] % PROGRESS_INTERVAL == 0:
+                logger.info("처리 %d건 (실패 %d건)", counts["processed"], counts["failed"])
+            if time.monotonic() - last_checkpoint >= CHECKPOINT_INTERVAL:
+                checkpoint()
+
+        def checkpoint() -> None:
+            nonlocal last_checkpoint
+            # 체크포인트가 기록되지 않은 결과를 가리키지 않도록 출력부터 디스크에 내립니다
+            out.flush()
+            os.fsync(out.fileno())
+            save_checkpoint(checkpoint_path, offset, args.input)
+            last_checkpoint = time.monotonic()
+
+        async def drain(return_when: str) -> None:
+            done, _ = await asyncio.wait(in_flight, return_when=return_when)
+            for task in done:
+                in_flight.discard(task)
+                write_result(task.result())
+
+        try:
+            for index, record, parse_error in read_records(args.input, input_format):
+                if index < offset or index in already_done:
+                    continue
+                if args.limit is not None and counts["processed"] + len(in_flight) >= args.limit:
+                    break
+                in_flight.add(asyncio.create_task(process_one(index, record, parse_error, args)))
+                if len(in_flight) >= max_in_flight:
+                    await drain(asyncio.FIRST_COMPLETED)
+            if in_flight:
+                await drain(asyncio.ALL_COMPLETED)
+        finally:
+            for task in in_flight:
+                task.cancel()
+            checkpoint()
+
+    return counts
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="miscellaneous",
+        description="리뷰 파일(JSONL/CSV)을 일괄 분석해 JSONL로 기록합니다.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--in", dest="input", required=True, help="입력 파일 (.jsonl 또는 .csv)")
+    common.add_argument("--out", required=True, help="결과 JSONL 파일")
+    common.add_argument("--format", choices=["jsonl", "csv"], help="입력 형식 (기본값: 확장자로 판단)")
+    common.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="동시 모델 호출 수")
+    common.add_argument("--timeout", type=float, default=120.0, help="리뷰당 제한 시간(초)")
+    common.add_argument("--checkpoint", help="체크포인트 파일 (기본값: <out>.ckpt)")
+    common.add_argument("--restart", action="store_true", help="기존 결과/체크포인트를 지우고 처음부터 처리")
+    common.add_argument("--limit", type=int, help="이번 실행에서 처리할 최대 리뷰 수")
+    common.add_argument("--text-field", default="review_text", help="리뷰 텍스트 필드 이름")
+    common.add_argument("--id-field", default="id", help="결과에 함께 기록할 ID 필드 이름")
+
+    subparsers.add_parser("sentiment", parents=[common], help="감정 분석")
+    keywords = subparsers.add_parser("keywords", parents=[common], help="등록 키워드 매칭")
+    keywords.add_argument("--semantic", choices=["auto", "always", "never"], default="auto")
+    moderate = subparsers.add_parser(
+        "moderate",
+        parents=[common],
+        help="리뷰 검수 (rating, product_name, category, image_path 필드 사용)",
+    )
+    moderate.add_argument("--engine", choices=["agent", "parallel"], default="parallel")
+    return parser
+
+
+def check_checkout() -> None:
+    """main.py 옆에 review_common 과 실습 폴더가 있는지 확인합니다. (일반 pip install 로는 함께 설치되지 않음)"""
+    missing = [name for name in ("review_common",) + LABS if not os.path.isdir(os.path.join(ROOT, name))]
+    if missing:
+        raise SystemExit(
+            f"{ROOT} 에서 {', '.join(missing)} 폴더를 찾을 수 없습니다. "
+            "miscellaneous 명령은 저장소에서 pip install -e . 로 설치한 경우에만 동작합니다."
+        )
+
+
+def main(argv: Optional[list] = None) -> int:
+    args = build_parser().parse_args(argv)
+    check_checkout()
+    if args.workers < 1:
+        raise SystemExit("--workers는 1 이상이어야 합니다.")
+    logging.basicConfig(
+        format="%(levelname)s | %(name)s | %(message)s", handlers=[logging.StreamHandler()]
+    )
+    logger.setLevel(logging.INFO)
+
+    counts = asyncio.run(run(args))
+    logger.info(
+        "완료: 처리 %d건, 실패 %d건, 건너뜀 %d건",
+        counts["processed"],
+        counts["failed"],
+        counts["skipped"],
+    )
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
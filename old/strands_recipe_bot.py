@@ -1,10 +1,16 @@
 # Import Agent and tools
 import logging
+import os
+import sys
 
 from ddgs import DDGS
 from ddgs.exceptions import DDGSException, RatelimitException
 from strands import Agent, tool
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from review_common.resilience import ModelUnavailableError, call_with_retry
+
 # Configure logging
 logging.getLogger("strands").setLevel(
     logging.INFO
@@ -25,10 +31,15 @@ def websearch(
         List of dictionaries with search results.
     """
     try:
-        results = DDGS().text(keywords, region=region, max_results=max_results)
+        # Rate limits are retried with jittered backoff; repeated failures open the circuit for a while
+        results = call_with_retry(
+            "websearch",
+            lambda: DDGS().text(keywords, region=region, max_results=max_results),
+            retry_on=(RatelimitException,),
+        )
         return results if results else "No results found."
-    except RatelimitException:
-        return "RatelimitException: Please try again after a short delay."
+    except (RatelimitException, ModelUnavailableError):
+        return "Web search is temporarily unavailable due to rate limiting. Answer without search results."
     except DDGSException as d:
         return f"DuckDuckGoSearchException: {d}"
     except Exception as e:
@@ -0,0 +1 @@
+"""세 가지 리뷰 분석 실습(감정 분석, 키워드 검색, 리뷰 검수)이 함께 사용하는 공통 모듈"""
@@ -0,0 +1,184 @@
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from strands import Agent
+from strands.models import BedrockModel
+from strands.telemetry.metrics import EventLoopMetrics
+
+from .metrics import ModelCallMetricsHook, default_metrics, record_agent
+from .resilience import RateLimitHook, ResilientRetryStrategy, breaker_for
+from .tracing import add_event, span
+
+logger = logging.getLogger(__name__)
+
+# 풀 기본 설정 (환경 변수로 조정 가능)
+DEFAULT_POOL_SIZE = int(os.environ.get("AGENT_POOL_SIZE", "8"))
+DEFAULT_IDLE_TIMEOUT = float(os.environ.get("AGENT_POOL_IDLE_SECONDS", "300"))
+# 모델 제공자 (bedrock: 실제 Bedrock 호출, fake: 네트워크 없이 고정 응답을 주는 로컬 가짜 모델)
+MODEL_PROVIDER = os.environ.get("MODEL_PROVIDER", "bedrock")
+
+PoolKey = Tuple[str, str, Tuple[str, ...]]
+
+
+def create_model(model_id: str) -> Any:
+    """MODEL_PROVIDER 설정에 맞는 모델 클라이언트를 만듭니다."""
+    if MODEL_PROVIDER == "fake":
+        from .fake_model import FakeModel
+
+        return FakeModel(model_id)
+    return BedrockModel(model_id=model_id)
+
+
+def tool_name(tool: Any) -> str:
+    """@tool 함수와 모듈 기반 도구(file_read, image_reader 등)의 이름을 반환합니다."""
+    return getattr(tool, "tool_name", None) or getattr(tool, "__name__", repr(tool))
+
+
+class AgentPool:
+    """
+    (model id, system prompt, tool set) 조합별로 Strands Agent를 재사용하는 스레드 안전 풀
+
+    - 모델 클라이언트는 model id별로 한 번만 생성하여 모든 Agent가 공유합니다
+    - checkout 시 대화 기록과 메트릭을 초기화하므로 이전 호출의 상태가 섞이지 않습니다
+    - 키별로 최대 max_size 개의 유휴 Agent를 보관하고, idle_timeout 초 이상 쓰이지 않은 Agent는 제거합니다
+    - checkout 블록에서 예외가 발생한 Agent는 상태를 신뢰할 수 없으므로 풀에 반환하지 않습니다
+    - Agent마다 모델 호출 시간/재시도 훅을 등록하고, 반환 시 토큰 사용량을 현재 호출의 메트릭에 기록합니다
+    - Agent마다 model id별 속도 제한 훅과 jitter 백오프 재시도 전략을 등록하고,
+      model id의 서킷이 열려 있으면 Agent를 꺼내지 않고 ModelUnavailableError를 발생시킵니다
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_POOL_SIZE,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        model_factory: Optional[Callable[[str], Any]] = None,
+    ):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.model_factory = model_factory or create_model
+        self.stats: Counter = Counter()
+        self._idle: Dict[PoolKey, List[Tuple[float, Agent]]] = defaultdict(list)
+        self._models: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def checkout(
+        self,
+        model_id: str,
+        system_prompt: str,
+        tools: Optional[Sequence[Any]] = None,
+    ) -> Iterator[Agent]:
+        """
+        풀에서 Agent를 하나 꺼내 사용하고, 블록이 끝나면 풀에 반환합니다.
+
+        Args:
+            model_id (str): Bedrock 모델 ID
+            system_prompt (str): 시스템 프롬프트
+            tools (Optional[Sequence[Any]]): Agent에 등록할 도구 목록
+
+        Yields:
+            Agent: 대화 기록이 비어 있는 Agent
+
+        Raises:
+            ModelUnavailableError: model id의 서킷이 열려 있을 때
+        """
+        breaker_for(model_id).before_call()
+        tools = list(tools or [])
+        key: PoolKey = (model_id, system_prompt, tuple(tool_name(t) for t in tools))
+        agent = self._acquire(key, model_id, system_prompt, tools)
+        try:
+            yield agent
+        except BaseException:
+            record_agent(model_id, agent)
+            with self._lock:
+                self.stats["discarded"] += 1
+            raise
+        else:
+            record_agent(model_id, agent)
+            self._release(key, agent)
+
+    def clear(self) -> None:
+        """유휴 Agent와 모델 클라이언트를 모두 비웁니다."""
+        with self._lock:
+            self._idle.clear()
+            self._models.clear()
+
+    def idle_count(self) -> int:
+        """현재 풀에 보관 중인 유휴 Agent 수"""
+        with self._lock:
+            return sum(len(entries) for entries in self._idle.values())
+
+    def _acquire(
+        self, key: PoolKey, model_id: str, system_prompt: str, tools: List[Any]
+    ) -> Agent:
+        with self._lock:
+            self._evict_idle(time.monotonic())
+            entries = self._idle.get(key)
+            if entries:
+                _, agent = entries.pop()
+                self.stats["reused"] += 1
+            else:
+                agent = None
+                model = self._models.get(model_id)
+                if model is None:
+                    model = self._models[model_id] = self.model_factory(model_id)
+                    self.stats["models_created"] += 1
+
+        if agent is None:
+            with span(
+                "agent_pool.create_agent",
+                {"gen_ai.request.model": model_id, "agent_pool.tools": list(key[2])},
+            ):
+                agent = Agent(
+                    model=model,
+                    system_prompt=system_prompt,
+                    tools=tools,
+                    # 기본 콜백(PrintingCallbackHandler)은 스트리밍 응답을 stdout에 출력하므로 끕니다
+                    callback_handler=None,
+                    # 속도 제한 대기가 모델 호출 시간에 포함되지 않도록 메트릭 훅보다 먼저 등록합니다
+                    hooks=[RateLimitHook(model_id), ModelCallMetricsHook(model_id)],
+                    retry_strategy=ResilientRetryStrategy(model_id),
+                )
+            with self._lock:
+                self.stats["created"] += 1
+        else:
+            _reset_agent(agent)
+            add_event("agent_pool.reuse", {"gen_ai.request.model": model_id})
+        return agent
+
+    def _release(self, key: PoolKey, agent: Agent) -> None:
+        with self._lock:
+            entries = self._idle[key]
+            if len(entries) < self.max_size:
+                entries.append((time.monotonic(), agent))
+            else:
+                self.stats["dropped"] += 1
+
+    def _evict_idle(self, now: float) -> None:
+        """idle_timeout 이상 사용되지 않은 Agent를 제거합니다. (lock 보유 상태에서 호출)"""
+        for key in list(self._idle):
+            entries = self._idle[key]
+            alive = [(ts, agent) for ts, agent in entries if now - ts < self.idle_timeout]
+            evicted = len(entries) - len(alive)
+            if evicted:
+                self.stats["evicted"] += evicted
+            if alive:
+                self._idle[key] = alive
+            else:
+                del self._idle[key]
+
+
+def _reset_agent(agent: Agent) -> None:
+    """재사용할 Agent의 대화 기록과 누적 메트릭을 초기화합니다."""
+    agent.messages.clear()
+    agent.event_loop_metrics = EventLoopMetrics()
+
+
+# 세 가지 분석기와 검수 도구가 함께 사용하는 기본 풀
+default_pool = AgentPool()
+default_metrics.register_counters("agent_pool", lambda: default_pool.stats)
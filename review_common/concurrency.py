@@ -0,0 +1,58 @@
+import asyncio
+import os
+import weakref
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# 이벤트 루프 하나에서 동시에 진행할 수 있는 모델 호출 수와 호출별 기본 제한 시간
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get("ASYNC_MAX_CONCURRENCY", "64"))
+DEFAULT_TIMEOUT = float(os.environ.get("ASYNC_CALL_TIMEOUT_SECONDS", "120"))
+
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+_max_concurrency = DEFAULT_MAX_CONCURRENCY
+
+
+def set_max_concurrency(limit: int) -> None:
+    """전역 동시 호출 한도를 바꿉니다. (이후 새로 만들어지는 이벤트 루프별 세마포어부터 적용)"""
+    global _max_concurrency
+    if limit < 1:
+        raise ValueError("limit은 1 이상이어야 합니다.")
+    _max_concurrency = limit
+    _semaphores.clear()
+
+
+def get_max_concurrency() -> int:
+    """현재 전역 동시 호출 한도"""
+    return _max_concurrency
+
+
+def get_semaphore() -> asyncio.Semaphore:
+    """현재 이벤트 루프에서 모든 분석기가 공유하는 동시 호출 세마포어"""
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(_max_concurrency)
+    return semaphore
+
+
+async def run_limited(
+    call: Callable[[], Awaitable[T]], timeout: Optional[float] = DEFAULT_TIMEOUT
+) -> T:
+    """
+    전역 세마포어 안에서 비동기 호출을 실행합니다.
+
+    제한 시간(timeout)을 넘기면 asyncio.TimeoutError가 발생하고 진행 중인 호출은 취소됩니다.
+    세마포어 대기 시간은 제한 시간에 포함되지 않습니다.
+
+    Args:
+        call (Callable[[], Awaitable[T]]): 실행할 코루틴을 만드는 함수
+        timeout (Optional[float]): 초 단위 제한 시간 (None이면 제한 없음)
+
+    Returns:
+        T: 호출 결과
+    """
+    async with get_semaphore():
+        return await asyncio.wait_for(call(), timeout)
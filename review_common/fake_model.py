@@ -0,0 +1,318 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+from strands.models import Model
+from strands.types.exceptions import ModelThrottledException
+
+T = TypeVar("T", bound=BaseModel)
+
+# 환경 변수로 조정하는 기본 동작 (MODEL_PROVIDER=fake 일 때 AgentPool 기본 팩토리가 사용)
+DEFAULT_LATENCY_MS = float(os.environ.get("FAKE_MODEL_LATENCY_MS", "50"))
+DEFAULT_JITTER_MS = float(os.environ.get("FAKE_MODEL_JITTER_MS", "0"))
+DEFAULT_FAILURE_RATE = float(os.environ.get("FAKE_MODEL_FAILURE_RATE", "0"))
+# error: 일반 예외 (즉시 호출자에게 전달), throttle: ModelThrottledException (Strands 내부 재시도 대상)
+DEFAULT_FAILURE_KIND = os.environ.get("FAKE_MODEL_FAILURE_KIND", "error")
+
+_REVIEW_ID = re.compile(r'<review id="([^"]+)">(.*?)</review>', re.DOTALL)
+_REVIEW_CONTENT = re.compile(r"<review_content>(.*?)</review_content>", re.DOTALL)
+_RATING = re.compile(r"<rating>\s*(\d)\s*</rating>|별점:\s*(\d)")
+_MODERATION_FIELD = re.compile(r"^\s*(리뷰 내용|제품|카테고리):\s*(.*)$", re.MULTILINE)
+_IMAGE_REF = re.compile(r"image_ref:\s*([^)\s]+)\)")
+
+NEGATIVE_HINTS = ("별로", "최악", "실망", "불만", "아쉽", "환불", "고장", "느려", "비추")
+POSITIVE_HINTS = ("좋", "만족", "추천", "최고", "훌륭", "깔끔", "빨라", "편해")
+
+
+class FakeModelError(RuntimeError):
+    """FakeModel이 failure_rate에 따라 주입한 모델 오류"""
+
+
+def _sentiment_of(text: str) -> Tuple[str, float]:
+    """리뷰 텍스트의 간단한 단서로 결정적인 감정/점수를 만듭니다."""
+    negative = sum(text.count(hint) for hint in NEGATIVE_HINTS)
+    positive = sum(text.count(hint) for hint in POSITIVE_HINTS)
+    if positive > negative:
+        return "positive", 0.8
+    if negative > positive:
+        return "negative", -0.7
+    return "neutral", 0.0
+
+
+def _sentiment_response(text: str) -> Dict[str, Any]:
+    sentiment, score = _sentiment_of(text)
+    return {
+        "sentiment": sentiment,
+        "score": score,
+        "confidence": 0.85,
+        "reason": "테스트용 가짜 모델 응답입니다.",
+    }
+
+
+def _batch_sentiment_response(text: str) -> List[Dict[str, Any]]:
+    results = []
+    for review_id, review in _REVIEW_ID.findall(text):
+        id_value: Any = int(review_id) if review_id.isdigit() else review_id
+        results.append({"id": id_value, **_sentiment_response(review)})
+    return results
+
+
+def _keyword_response(text: str) -> Dict[str, Any]:
+    return {"matched_keywords": []}
+
+
+def _check(status: str) -> Dict[str, Any]:
+    return {"status": status, "reason": "테스트용 가짜 모델 응답입니다.", "confidence": 0.9}
+
+
+def _moderation_response(text: str) -> Dict[str, Any]:
+    has_image = "이미지: 있음" in text
+    return {
+        "profanity_check": _check("PASS"),
+        "rating_consistency": _check("PASS"),
+        "image_match": _check("PASS" if has_image else "SKIP"),
+        "overall_status": "PASS",
+        "failed_checks": [],
+    }
+
+
+def _moderation_tool_calls(text: str, tool_names: List[str]) -> List[Tuple[str, Dict[str, Any]]]:
+    """통합 검수 프롬프트의 리뷰 정보로 검수 도구 호출 목록 (이름, 입력)을 만듭니다. (이미지가 없으면 이미지 검사 제외)"""
+    fields = dict(_MODERATION_FIELD.findall(text))
+    content = fields.get("리뷰 내용", "")
+    rating_match = _RATING.search(text)
+    rating = int(next(g for g in rating_match.groups() if g)) if rating_match else 3
+    image_match = _IMAGE_REF.search(text)
+    image_ref = image_match.group(1) if image_match and image_match.group(1) != "없음" else None
+    product_data = {"name": fields.get("제품", ""), "category": fields.get("카테고리", "")}
+    calls = [
+        ("check_profanity", {"content": content}),
+        ("check_rating_consistency", {"rating": rating, "content": content}),
+    ]
+    if image_ref:
+        calls.append(("check_image_product_match", {"image_ref": image_ref, "product_data": product_data}))
+    return [(name, tool_input) for name, tool_input in calls if name in tool_names]
+
+
+def _profanity_response(text: str) -> Dict[str, Any]:
+    return {
+        "is_appropriate": True,
+        "confidence": 0.9,
+        "detected_issues": [],
+        "severity": "low",
+        "reason": "테스트용 가짜 모델 응답입니다.",
+    }
+
+
+def _rating_response(text: str) -> Dict[str, Any]:
+    match = _REVIEW_CONTENT.search(text)
+    sentiment, _ = _sentiment_of(match.group(1) if match else text)
+    rating_match = _RATING.search(text)
+    rating = int(next(g for g in rating_match.groups() if g)) if rating_match else 3
+    expected = "positive" if rating >= 4 else "negative" if rating <= 2 else "neutral"
+    return {
+        "content_sentiment": sentiment,
+        "sentiment_confidence": 0.85,
+        "is_consistent": sentiment == expected or sentiment == "neutral",
+        "reason": "테스트용 가짜 모델 응답입니다.",
+        "detected_emotions": [],
+    }
+
+
+def _image_response(text: str) -> Dict[str, Any]:
+    return {
+        "is_related": True,
+        "confidence": 0.8,
+        "reason": "테스트용 가짜 모델 응답입니다.",
+        "detected_objects": [],
+    }
+
+
+# 도구가 주어지면 첫 응답에서 도구를 호출하는 프롬프트 (시스템 프롬프트 표식, 도구 호출 목록 생성 함수)
+TOOL_CALLERS: List[Tuple[str, Callable[[str, List[str]], List[Tuple[str, Dict[str, Any]]]]]] = [
+    ("overall_status", _moderation_tool_calls),
+]
+
+# (시스템 프롬프트에 포함된 표식, 응답 생성 함수) - 앞에서부터 비교합니다
+RESPONDERS: List[Tuple[str, Callable[[str], Any]]] = [
+    ("<배치처리>", _batch_sentiment_response),
+    ("overall_status", _moderation_response),
+    ("is_appropriate", _profanity_response),
+    ("is_consistent", _rating_response),
+    ("is_related", _image_response),
+    ("matched_keywords", _keyword_response),
+    ('"sentiment"', _sentiment_response),
+]
+
+
+class FakeModel(Model):
+    """
+    Bedrock 대신 사용하는 로컬 가짜 모델 (네트워크 호출 없음)
+
+    시스템 프롬프트를 보고 감정 분석/키워드/검수 프롬프트에 맞는 스키마의 고정 응답을 돌려줍니다.
+    통합 검수 Agent처럼 도구가 주어진 경우에는 먼저 검수 도구 호출(toolUse)을 돌려주고,
+    도구 결과를 받은 다음 호출에서 최종 JSON 응답을 돌려줍니다.
+    지연 시간(latency_ms ± jitter_ms)과 실패 비율(failure_rate)을 주입할 수 있어
+    처리량 측정과 장애 대응 로직 확인에 사용합니다.
+    """
+
+    def __init__(
+        self,
+        model_id: str = "fake",
+        latency_ms: float = DEFAULT_LATENCY_MS,
+        jitter_ms: float = DEFAULT_JITTER_MS,
+        failure_rate: float = DEFAULT_FAILURE_RATE,
+        failure_kind: str = DEFAULT_FAILURE_KIND,
+        seed: Optional[int] = None,
+    ):
+        self.config: Dict[str, Any] = {
+            "model_id": model_id,
+            "latency_ms": latency_ms,
+            "jitter_ms": jitter_ms,
+            "failure_rate": failure_rate,
+            "failure_kind": failure_kind,
+        }
+        self.calls = 0
+        self._tool_use_ids = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def update_config(self, **model_config: Any) -> None:
+        self.config.update(model_config)
+
+    def get_config(self) -> Dict[str, Any]:
+        return self.config
+
+    async def structured_output(
+        self,
+        output_model: Type[T],
+        prompt: Any,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        await self._simulate_call()
+        text = _messages_text(prompt)
+        candidates = [self.respond(system_prompt, text)]
+        candidates += [responder(text) for _, responder in RESPONDERS]
+        for candidate in candidates:
+            try:
+                output = output_model.model_validate(candidate)
+            except ValidationError:
+                continue
+            yield {"output": output}
+            return
+        raise ValueError(f"{output_model.__name__}에 맞는 가짜 응답이 없습니다.")
+
+    async def stream(
+        self,
+        messages: Any,
+        tool_specs: Optional[list] = None,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        latency_ms = await self._simulate_call()
+        text = _messages_text(messages)
+        tool_calls = self.tool_calls(system_prompt, text, tool_specs) if not _has_tool_results(messages) else []
+
+        yield {"messageStart": {"role": "assistant"}}
+        if tool_calls:
+            response = ""
+            for name, tool_input in tool_calls:
+                encoded = json.dumps(tool_input, ensure_ascii=False)
+                response += encoded
+                with self._lock:
+                    self._tool_use_ids += 1
+                    tool_use_id = f"fake-tool-{self._tool_use_ids}"
+                yield {"contentBlockStart": {"start": {"toolUse": {"name": name, "toolUseId": tool_use_id}}}}
+                yield {"contentBlockDelta": {"delta": {"toolUse": {"input": encoded}}}}
+                yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "tool_use"}}
+        else:
+            # 도구 결과를 받은 뒤에는 처음 사용자 요청을 기준으로 최종 응답을 만듭니다
+            prompt = _first_user_text(messages) if _has_tool_results(messages) else text
+            response = json.dumps(self.respond(system_prompt, prompt), ensure_ascii=False)
+            yield {"contentBlockStart": {"start": {}}}
+            yield {"contentBlockDelta": {"delta": {"text": response}}}
+            yield {"contentBlockStop": {}}
+            yield {"messageStop": {"stopReason": "end_turn"}}
+        input_tokens = len(text) // 2 + len(system_prompt or "") // 2
+        output_tokens = len(response) // 2
+        yield {
+            "metadata": {
+                "usage": {
+                    "inputTokens": input_tokens,
+                    "outputTokens": output_tokens,
+                    "totalTokens": input_tokens + output_tokens,
+                },
+                "metrics": {"latencyMs": int(latency_ms)},
+            }
+        }
+
+    def tool_calls(
+        self, system_prompt: Optional[str], text: str, tool_specs: Optional[list]
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """주어진 도구 중 이번 요청에서 호출할 도구 목록 (이름, 입력)"""
+        tool_names = [spec["name"] for spec in tool_specs or []]
+        if not tool_names:
+            return []
+        for marker, caller in TOOL_CALLERS:
+            if marker in (system_prompt or ""):
+                return caller(text, tool_names)
+        return []
+
+    def respond(self, system_prompt: Optional[str], text: str) -> Any:
+        """시스템 프롬프트 종류에 맞는 고정 응답 (dict/list)"""
+        for marker, responder in RESPONDERS:
+            if marker in (system_prompt or ""):
+                return responder(text)
+        return {"text": hashlib.sha256(text.encode("utf-8")).hexdigest()[:8]}
+
+    async def _simulate_call(self) -> float:
+        """설정된 지연 시간만큼 기다리고, failure_rate 확률로 예외를 발생시킵니다."""
+        with self._lock:
+            self.calls += 1
+            jitter = self._random.uniform(-1.0, 1.0) * self.config["jitter_ms"]
+            failed = self._random.random() < self.config["failure_rate"]
+        latency_ms = max(self.config["latency_ms"] + jitter, 0.0)
+        await asyncio.sleep(latency_ms / 1000)
+        if failed:
+            if self.config["failure_kind"] == "throttle":
+                raise ModelThrottledException("가짜 모델: 요청이 제한되었습니다.")
+            raise FakeModelError("가짜 모델: 주입된 호출 실패입니다.")
+        return latency_ms
+
+
+def _messages_text(messages: Any) -> str:
+    """대화 메시지에서 텍스트 블록만 이어 붙입니다. (마지막 사용자 메시지 기준)"""
+    if isinstance(messages, str):
+        return messages
+    for message in reversed(messages or []):
+        if message.get("role") == "user":
+            return "\n".join(
+                block["text"] for block in message.get("content", []) if "text" in block
+            )
+    return ""
+
+
+def _has_tool_results(messages: Any) -> bool:
+    """마지막 사용자 메시지가 도구 결과인지"""
+    if isinstance(messages, str):
+        return False
+    for message in reversed(messages or []):
+        if message.get("role") == "user":
+            return any("toolResult" in block for block in message.get("content", []))
+    return False
+
+
+def _first_user_text(messages: Any) -> str:
+    """대화의 첫 사용자 메시지 텍스트 (도구 호출 전의 원래 요청)"""
+    for message in messages or []:
+        if message.get("role") == "user":
+            return "\n".join(block["text"] for block in message.get("content", []) if "text" in block)
+    return ""
@@ -0,0 +1,211 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Literal, Optional
+
+from .metrics import default_metrics
+
+logger = logging.getLogger(__name__)
+
+# 작업 큐 기본 설정 (환경 변수로 조정 가능)
+# LLM 호출은 대부분 네트워크 대기이므로 스레드 풀로 여러 리뷰를 동시에 분석합니다
+DEFAULT_JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "8"))
+# 끝난 작업을 가져가지 않으면 이 시간(초)이 지난 뒤 작업 표에서 제거합니다
+DEFAULT_RESULT_TTL = float(os.environ.get("JOB_RESULT_TTL_SECONDS", "3600"))
+
+# Streamlit 앱이 진행 중인 작업을 확인하는 주기 (초)
+POLL_INTERVAL = float(os.environ.get("JOB_POLL_SECONDS", "1.0"))
+# "전체 분석" 한 번이 동시에 큐에 넣는 최대 작업 수 (한 세션이 공용 작업 큐를 독차지하지 않도록 제한)
+BULK_MAX_IN_FLIGHT = int(os.environ.get("BULK_MAX_IN_FLIGHT", "4"))
+
+JobStatus = Literal["pending", "running", "done", "failed"]
+
+
+@dataclass
+class Job:
+    """작업 표의 한 행 (조회 시에는 복사본을 반환합니다)"""
+
+    id: str
+    name: str
+    status: JobStatus = "pending"
+    result: Any = None
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+
+class JobQueue:
+    """
+    분석 작업을 백그라운드 스레드에서 실행하는 작업 큐
+
+    - submit 으로 작업을 넣으면 바로 작업 id를 돌려주고, 실행은 스레드 풀에서 진행됩니다
+    - 앱은 작업 id로 상태를 조회(poll)하다가 끝난 작업의 결과를 가져갑니다(collect)
+    - 결과는 작업 표에만 저장하므로 작업 스레드가 Streamlit 세션 상태를 직접 건드리지 않습니다
+    """
+
+    def __init__(
+        self, max_workers: int = DEFAULT_JOB_WORKERS, result_ttl: float = DEFAULT_RESULT_TTL
+    ):
+        self.max_workers = max_workers
+        self.result_ttl = result_ttl
+        self.stats: Counter = Counter()
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="review-job")
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> str:
+        """
+        작업을 큐에 넣고 작업 id를 반환합니다.
+
+        Args:
+            fn (Callable): 실행할 함수 (예: analyze_sentiment)
+            *args, **kwargs: fn 에 넘길 인자
+
+        Returns:
+            str: 작업 id
+        """
+        with self._lock:
+            self._prune()
+            job = Job(id=uuid.uuid4().hex, name=getattr(fn, "__name__", "job"))
+            self._jobs[job.id] = job
+            self.stats["submitted"] += 1
+
+        future: Future = self._executor.submit(self._run, job.id, fn, args, kwargs)
+        future.add_done_callback(_log_unexpected)
+        return job.id
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """작업 상태 (없거나 이미 가져간 작업이면 None)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return replace(job) if job else None
+
+    def poll(self, job_ids: Iterable[str]) -> Dict[str, Job]:
+        """여러 작업의 상태를 한 번에 조회합니다."""
+        with self._lock:
+            return {job_id: replace(self._jobs[job_id]) for job_id in job_ids if job_id in self._jobs}
+
+    def collect(self, job_ids: Iterable[str]) -> Dict[str, Job]:
+        """끝난 작업을 작업 표에서 꺼내 반환합니다. (대기/실행 중인 작업은 그대로 둠)"""
+        finished: Dict[str, Job] = {}
+        with self._lock:
+            for job_id in job_ids:
+                job = self._jobs.get(job_id)
+                if job is not None and job.finished:
+                    finished[job_id] = self._jobs.pop(job_id)
+        return finished
+
+    def collect_pending(self, pending: Dict[Hashable, str]) -> Dict[Hashable, Job]:
+        """
+        {항목 id: 작업 id} 표에서 끝난 작업을 꺼냅니다. (Streamlit 세션의 진행 중 작업 표에 사용)
+
+        끝났거나 작업 표에서 사라진(만료된) 작업은 pending 에서 제거하고,
+        끝난 작업만 {항목 id: 작업} 으로 반환합니다.
+        """
+        finished = self.collect(pending.values())
+        results: Dict[Hashable, Job] = {}
+        for item_id, job_id in list(pending.items()):
+            if job_id in finished:
+                results[item_id] = finished[job_id]
+            elif self.get(job_id) is not None:
+                continue
+            del pending[item_id]
+        return results
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if not job.finished)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job_id: str, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        with self._lock:
+            job = self._jobs[job_id]
+            job.status, job.started_at = "running", time.time()
+        try:
+            result, error, status = fn(*args, **kwargs), None, "done"
+        except Exception as e:
+            logger.warning("백그라운드 작업 실패 (%s): %s", job.name, e)
+            result, error, status = None, str(e), "failed"
+        with self._lock:
+            job.result, job.error, job.status = result, error, status
+            job.finished_at = time.time()
+            self.stats[status] += 1
+
+    def _prune(self) -> None:
+        """가져가지 않은 채 result_ttl 이 지난 작업을 제거합니다. (lock 보유 상태에서 호출)"""
+        cutoff = time.time() - self.result_ttl
+        expired: List[str] = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished and (job.finished_at or 0) < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        self.stats["expired"] += len(expired)
+
+
+@dataclass
+class BulkRun:
+    """
+    "전체 분석" 한 번의 진행 상황 (Streamlit 세션 상태에 보관)
+
+    대상 항목을 한꺼번에 제출하지 않고, 진행 중인 작업이 max_in_flight 개를 넘지 않도록
+    화면이 갱신될 때마다(dispatch) 남은 항목을 채워 넣습니다.
+    """
+
+    item_ids: List[Hashable]
+    max_in_flight: int = BULK_MAX_IN_FLIGHT
+    queued: List[Hashable] = field(default_factory=list)
+    errors: Dict[Hashable, str] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if not self.queued:
+            self.queued = list(self.item_ids)
+
+    def dispatch(self, pending: Dict[Hashable, str], submit: Callable[[Hashable], str]) -> None:
+        """
+        남은 항목을 제출합니다.
+
+        Args:
+            pending (Dict): 세션의 진행 중 작업 표 {항목 id: 작업 id} (제출한 작업을 추가)
+            submit (Callable): 항목 id를 받아 작업을 제출하고 작업 id를 반환하는 함수
+        """
+        in_flight = sum(1 for item_id in self.item_ids if item_id in pending)
+        while self.queued and in_flight < self.max_in_flight:
+            item_id = self.queued.pop(0)
+            if item_id in pending:
+                continue
+            pending[item_id] = submit(item_id)
+            in_flight += 1
+
+    def completed(self, pending: Dict[Hashable, str]) -> int:
+        """끝난 항목 수 (실패 포함)"""
+        remaining = len(self.queued) + sum(1 for item_id in self.item_ids if item_id in pending)
+        return len(self.item_ids) - remaining
+
+    def record_error(self, item_id: Hashable, error: str) -> None:
+        if item_id in self.item_ids:
+            self.errors[item_id] = error
+
+
+def _log_unexpected(future: Future) -> None:
+    error = future.exception()
+    if error is not None:
+        logger.error("작업 큐 내부 오류: %s", error)
+
+
+# 세 Streamlit 앱이 (프로세스 안의 모든 세션이) 함께 사용하는 기본 작업 큐
+default_job_queue = JobQueue()
+default_metrics.register_counters("jobs", lambda: default_job_queue.stats)
@@ -0,0 +1,594 @@
+import asyncio
+import bisect
+import contextvars
+import functools
+import logging
+import math
+import os
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from strands.hooks import (
+    AfterModelCallEvent,
+    BeforeInvocationEvent,
+    BeforeModelCallEvent,
+    HookProvider,
+    HookRegistry,
+)
+
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Prometheus 텍스트 엔드포인트 포트 (0이면 서버를 띄우지 않습니다)
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))
+METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
+# 스냅샷에 보관할 최근 호출 기록 수 (백분위 계산에도 사용)
+RECENT_CALLS = int(os.environ.get("METRICS_RECENT_CALLS", "256"))
+
+METRIC_PREFIX = "review"
+# 호출 전체 시간(wall) 히스토그램 구간 (초)
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+# 모델별 1,000 토큰당 가격 (USD, 입력/출력) - 비용 추정용이며 목록에 없는 모델은 0으로 계산합니다
+MODEL_PRICES_PER_1K: Dict[str, Tuple[float, float]] = {
+    "apac.anthropic.claude-3-haiku-20240307-v1:0": (0.00025, 0.00125),
+    "us.anthropic.claude-3-7-sonnet-20250219-v1:0": (0.003, 0.015),
+}
+
+_current_call: contextvars.ContextVar[Optional["CallMetrics"]] = contextvars.ContextVar(
+    "review_current_call", default=None
+)
+
+
+@dataclass
+class ModelUsage:
+    """한 호출 안에서 모델 하나가 사용한 양"""
+
+    model_calls: int = 0
+    retries: int = 0
+    errors: int = 0
+    model_seconds: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    def add(self, other: "ModelUsage") -> None:
+        self.model_calls += other.model_calls
+        self.retries += other.retries
+        self.errors += other.errors
+        self.model_seconds += other.model_seconds
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+
+
+@dataclass
+class CallMetrics:
+    """
+    진입점/도구 호출 한 번의 측정값
+
+    - wall_seconds: 호출 전체 시간
+    - models: 이 호출이 직접 사용한 Agent의 모델별 사용량 (하위 도구 호출의 사용량은 포함하지 않음)
+    - tool_seconds: 하위 도구 호출(nested)의 wall 시간 합 (병렬 실행 시 wall_seconds 보다 클 수 있음)
+    - degraded: 모델을 쓸 수 없어 로컬 결과로 대체했는지 여부 (하위 도구 호출 포함은 any_degraded)
+    """
+
+    operation: str
+    parent: Optional[str] = None
+    status: str = "ok"
+    cache_hit: bool = False
+    degraded: bool = False
+    started_at: float = field(default_factory=time.time)
+    wall_seconds: float = 0.0
+    tool_seconds: float = 0.0
+    models: Dict[str, ModelUsage] = field(default_factory=lambda: defaultdict(ModelUsage))
+    nested: List["CallMetrics"] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def model_seconds(self) -> float:
+        return sum(usage.model_seconds for usage in self.models.values())
+
+    @property
+    def input_tokens(self) -> int:
+        return sum(usage.input_tokens for usage in self.models.values())
+
+    @property
+    def output_tokens(self) -> int:
+        return sum(usage.output_tokens for usage in self.models.values())
+
+    @property
+    def retries(self) -> int:
+        return sum(usage.retries for usage in self.models.values())
+
+    @property
+    def cost_usd(self) -> float:
+        return sum(estimate_cost(model_id, usage) for model_id, usage in self.models.items())
+
+    @property
+    def any_degraded(self) -> bool:
+        with self._lock:
+            nested = list(self.nested)
+        return self.degraded or any(call.any_degraded for call in nested)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """스냅샷용 딕셔너리 (하위 도구 호출 포함)"""
+        with self._lock:
+            models = {model_id: vars(usage).copy() for model_id, usage in self.models.items()}
+            nested = list(self.nested)
+        return {
+            "operation": self.operation,
+            "parent": self.parent,
+            "status": self.status,
+            "cache_hit": self.cache_hit,
+            "degraded": self.degraded,
+            "started_at": self.started_at,
+            "wall_seconds": self.wall_seconds,
+            "model_seconds": self.model_seconds,
+            "tool_seconds": self.tool_seconds,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "retries": self.retries,
+            "cost_usd": self.cost_usd,
+            "models": models,
+            "nested": [call.to_dict() for call in nested],
+        }
+
+
+def estimate_cost(model_id: str, usage: ModelUsage) -> float:
+    """토큰 사용량으로 추정한 비용 (USD)"""
+    input_price, output_price = MODEL_PRICES_PER_1K.get(model_id, (0.0, 0.0))
+    return (usage.input_tokens * input_price + usage.output_tokens * output_price) / 1000
+
+
+@dataclass
+class _OperationTotals:
+    calls: Counter = field(default_factory=Counter)
+    cache_hits: int = 0
+    degraded: int = 0
+    wall_seconds: float = 0.0
+    tool_seconds: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(DURATION_BUCKETS) + 1))
+    recent_walls: Deque[float] = field(default_factory=lambda: deque(maxlen=RECENT_CALLS))
+    models: Dict[str, ModelUsage] = field(default_factory=lambda: defaultdict(ModelUsage))
+
+    def copy(self) -> "_OperationTotals":
+        """렌더링용 복사본 (lock 보유 상태에서 호출)"""
+        return _OperationTotals(
+            calls=Counter(self.calls),
+            cache_hits=self.cache_hits,
+            degraded=self.degraded,
+            wall_seconds=self.wall_seconds,
+            tool_seconds=self.tool_seconds,
+            buckets=list(self.buckets),
+            recent_walls=deque(self.recent_walls, maxlen=self.recent_walls.maxlen),
+            models=defaultdict(ModelUsage, {m: ModelUsage(**vars(u)) for m, u in self.models.items()}),
+        )
+
+
+class MetricsRegistry:
+    """
+    분석 진입점과 검수 도구의 호출별 지연 시간/토큰/재시도 집계 (스레드 안전)
+
+    - track 블록(또는 instrumented 데코레이터) 하나가 호출 한 번이며, 안에서 다시 track 된 호출은
+      하위 도구 호출(nested)로 부모 호출에 연결됩니다 (contextvars 사용, 스레드/태스크로 전달하려면 컨텍스트 복사 필요)
+    - 모델 시간과 재시도는 풀의 Agent에 등록된 ModelCallMetricsHook 이, 토큰은 Agent 반환 시 record_agent 가 기록합니다
+    - snapshot(): 프로세스 내 조회용 딕셔너리, render_prometheus(): Prometheus 텍스트 형식
+    - 다른 모듈의 기존 stats 카운터(에이전트 풀, 결과 캐시 등)도 register_counters 로 함께 노출합니다
+    """
+
+    def __init__(self, recent_calls: int = RECENT_CALLS):
+        self._operations: Dict[str, _OperationTotals] = defaultdict(_OperationTotals)
+        self._recent: Deque[CallMetrics] = deque(maxlen=recent_calls)
+        self._counter_sources: Dict[str, Callable[[], Mapping[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def track(self, operation: str) -> Iterator[CallMetrics]:
+        """
+        블록 실행을 호출 한 번으로 측정합니다.
+
+        Args:
+            operation (str): 호출 이름 (예: sentiment, keywords, moderation, check_profanity)
+
+        Yields:
+            CallMetrics: 진행 중인 호출의 측정값 (블록이 끝나면 wall_seconds 가 채워집니다)
+        """
+        parent = _current_call.get()
+        call = CallMetrics(operation, parent=parent.operation if parent else None)
+        token = _current_call.set(call)
+        start = time.perf_counter()
+        try:
+            yield call
+        except BaseException:
+            call.status = "error"
+            raise
+        finally:
+            call.wall_seconds = time.perf_counter() - start
+            _current_call.reset(token)
+            if parent is not None:
+                with parent._lock:
+                    parent.nested.append(call)
+                    parent.tool_seconds += call.wall_seconds
+            self._observe(call)
+
+    def register_counters(self, component: str, source: Callable[[], Mapping[str, Any]]) -> None:
+        """기존 stats 카운터를 노출 대상에 추가합니다. (source는 {이름: 값} 을 반환하는 함수)"""
+        with self._lock:
+            self._counter_sources[component] = source
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        현재까지의 집계 스냅샷
+
+        Returns:
+            Dict[str, Any]: operations(호출 종류별 합계/백분위/모델별 사용량),
+                recent(최근 최상위 호출과 하위 도구 호출), counters(다른 모듈의 stats 카운터)
+        """
+        with self._lock:
+            operations = {name: totals.copy() for name, totals in self._operations.items()}
+            recent = list(self._recent)
+            sources = dict(self._counter_sources)
+        return {
+            "operations": {name: _totals_dict(totals) for name, totals in operations.items()},
+            "recent": [call.to_dict() for call in recent],
+            "counters": {component: _read_counters(source) for component, source in sources.items()},
+        }
+
+    def recent_calls(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """최근 최상위 호출 기록 (최신 순)"""
+        with self._lock:
+            recent = list(self._recent)[-limit:]
+        return [call.to_dict() for call in reversed(recent)]
+
+    def render_prometheus(self) -> str:
+        """Prometheus 텍스트 노출 형식(0.0.4)으로 렌더링합니다."""
+        with self._lock:
+            operations = {name: totals.copy() for name, totals in self._operations.items()}
+            sources = dict(self._counter_sources)
+
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str) -> str:
+            metric = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            return metric
+
+        metric = family("calls_total", "counter", "Entry point and tool calls by status.")
+        for operation, totals in operations.items():
+            for status, count in sorted(totals.calls.items()):
+                lines.append(f"{metric}{_labels(operation=operation, status=status)} {count}")
+
+        metric = family("cache_hits_total", "counter", "Calls answered from the result cache.")
+        for operation, totals in operations.items():
+            lines.append(f"{metric}{_labels(operation=operation)} {totals.cache_hits}")
+
+        metric = family("degraded_total", "counter", "Calls answered with local results (model unavailable).")
+        for operation, totals in operations.items():
+            lines.append(f"{metric}{_labels(operation=operation)} {totals.degraded}")
+
+        metric = family("call_duration_seconds", "histogram", "Wall time per call.")
+        for operation, totals in operations.items():
+            cumulative = 0
+            for bound, count in zip(DURATION_BUCKETS + (math.inf,), totals.buckets):
+                cumulative += count
+                le = "+Inf" if math.isinf(bound) else repr(bound)
+                lines.append(f"{metric}_bucket{_labels(operation=operation, le=le)} {cumulative}")
+            lines.append(f"{metric}_sum{_labels(operation=operation)} {totals.wall_seconds:.6f}")
+            lines.append(f"{metric}_count{_labels(operation=operation)} {cumulative}")
+
+        metric = family("tool_seconds_total", "counter", "Wall time spent in nested tool calls.")
+        for operation, totals in operations.items():
+            lines.append(f"{metric}{_labels(operation=operation)} {totals.tool_seconds:.6f}")
+
+        per_model = [
+            (operation, model_id, usage)
+            for operation, totals in operations.items()
+            for model_id, usage in sorted(totals.models.items())
+        ]
+        model_families = [
+            ("model_calls_total", "Model invocation attempts, including failed ones.", lambda u: u.model_calls),
+            ("model_retries_total", "Model invocations retried after a failed attempt.", lambda u: u.retries),
+            ("model_errors_total", "Failed model attempts.", lambda u: u.errors),
+            ("model_seconds_total", "Time spent waiting for the model.", lambda u: f"{u.model_seconds:.6f}"),
+        ]
+        for name, help_text, value in model_families:
+            metric = family(name, "counter", help_text)
+            for operation, model_id, usage in per_model:
+                lines.append(f"{metric}{_labels(operation=operation, model=model_id)} {value(usage)}")
+
+        metric = family("tokens_total", "counter", "Model tokens by direction.")
+        for operation, model_id, usage in per_model:
+            for direction, count in (("input", usage.input_tokens), ("output", usage.output_tokens)):
+                labels = _labels(operation=operation, model=model_id, direction=direction)
+                lines.append(f"{metric}{labels} {count}")
+
+        metric = family("cost_usd_total", "counter", "Estimated model cost in USD.")
+        for operation, model_id, usage in per_model:
+            cost = estimate_cost(model_id, usage)
+            lines.append(f"{metric}{_labels(operation=operation, model=model_id)} {cost:.8f}")
+
+        metric = family("component_events_total", "counter", "Existing component stats counters.")
+        for component, source in sorted(sources.items()):
+            for event, value in sorted(_read_counters(source).items()):
+                lines.append(f"{metric}{_labels(component=component, event=event)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """호출 집계를 비웁니다. (등록된 카운터 소스는 유지)"""
+        with self._lock:
+            self._operations.clear()
+            self._recent.clear()
+
+    def _observe(self, call: CallMetrics) -> None:
+        with call._lock:
+            models = {model_id: ModelUsage(**vars(usage)) for model_id, usage in call.models.items()}
+        with self._lock:
+            totals = self._operations[call.operation]
+            totals.calls[call.status] += 1
+            totals.cache_hits += int(call.cache_hit)
+            totals.degraded += int(call.degraded)
+            totals.wall_seconds += call.wall_seconds
+            totals.tool_seconds += call.tool_seconds
+            totals.buckets[bisect.bisect_left(DURATION_BUCKETS, call.wall_seconds)] += 1
+            totals.recent_walls.append(call.wall_seconds)
+            for model_id, usage in models.items():
+                totals.models[model_id].add(usage)
+            if call.parent is None:
+                self._recent.append(call)
+
+        if call.parent is None:
+            logger.info(
+                "%s %s: %.2fs (model %.2fs, tool %.2fs) tokens in=%d out=%d retries=%d%s",
+                call.operation,
+                call.status,
+                call.wall_seconds,
+                call.model_seconds,
+                call.tool_seconds,
+                call.input_tokens,
+                call.output_tokens,
+                call.retries,
+                " (cache hit)" if call.cache_hit else " (degraded)" if call.any_degraded else "",
+            )
+
+
+def current_call() -> Optional[CallMetrics]:
+    """현재 진행 중인 (가장 안쪽의) 호출 측정값"""
+    return _current_call.get()
+
+
+def mark_cache_hit() -> None:
+    """현재 호출이 결과 캐시에서 응답했음을 기록합니다."""
+    call = _current_call.get()
+    if call is not None:
+        call.cache_hit = True
+
+
+def mark_degraded() -> None:
+    """현재 호출이 모델 대신 로컬 결과로 응답했음을 기록합니다."""
+    call = _current_call.get()
+    if call is not None:
+        call.degraded = True
+
+
+def record_agent(model_id: str, agent: Any) -> None:
+    """
+    Agent의 누적 토큰 사용량을 현재 호출에 더합니다.
+
+    AgentPool이 checkout 할 때 메트릭을 초기화하므로, 반환 시점의 누적값이 곧 이번 호출의 사용량입니다.
+    """
+    call = _current_call.get()
+    metrics = getattr(agent, "event_loop_metrics", None)
+    if call is None or metrics is None:
+        return
+    usage = metrics.accumulated_usage
+    with call._lock:
+        model_usage = call.models[model_id]
+        model_usage.input_tokens += usage.get("inputTokens", 0)
+        model_usage.output_tokens += usage.get("outputTokens", 0)
+
+
+def instrumented(operation: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    함수 호출을 default_metrics.track 으로 측정하고 트레이스 span(review.<operation>)으로 감싸는
+    데코레이터 (동기/비동기 함수 모두 지원, 측정값은 span 속성으로도 기록합니다)
+
+    @tool 아래에 두어도 시그니처와 docstring이 유지되므로 도구 스펙은 그대로입니다.
+    """
+
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        if asyncio.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with _traced_call(operation):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with _traced_call(operation):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def _traced_call(operation: str) -> Iterator[CallMetrics]:
+    with span(f"review.{operation}", {"review.operation": operation}) as current:
+        call: Optional[CallMetrics] = None
+        try:
+            with default_metrics.track(operation) as call:
+                yield call
+        finally:
+            if call is not None and current.is_recording():
+                current.set_attributes(
+                    {
+                        "review.cache_hit": call.cache_hit,
+                        "review.degraded": call.degraded,
+                        "review.model_seconds": call.model_seconds,
+                        "review.tool_seconds": call.tool_seconds,
+                        "review.input_tokens": call.input_tokens,
+                        "review.output_tokens": call.output_tokens,
+                        "review.retries": call.retries,
+                        "review.models": sorted(call.models),
+                    }
+                )
+
+
+def propagate(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    현재 컨텍스트(진행 중인 호출)를 복사해 fn 을 실행하는 함수로 감쌉니다.
+
+    ThreadPoolExecutor.submit 은 contextvars 를 전달하지 않으므로, 스레드에서 실행하는 하위 도구 호출을
+    부모 호출에 연결하려면 submit(propagate(fn), ...) 처럼 사용합니다.
+    """
+    context = contextvars.copy_context()
+    return functools.partial(context.run, fn)
+
+
+class ModelCallMetricsHook(HookProvider):
+    """
+    Agent의 모델 호출 시간과 재시도를 현재 호출에 기록하는 Strands 훅
+
+    AgentPool이 Agent를 만들 때 등록하며, Agent는 한 번에 한 스레드에서만 사용되므로 상태를 인스턴스에 둡니다.
+    실패한 시도 뒤에 다시 모델을 호출하면(Strands의 스로틀링 재시도 등) 재시도 한 번으로 셉니다.
+    """
+
+    def __init__(self, model_id: str):
+        self.model_id = model_id
+        self._started: Optional[float] = None
+        self._last_failed = False
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeInvocationEvent, self._on_invocation)
+        registry.add_callback(BeforeModelCallEvent, self._before_model_call)
+        registry.add_callback(AfterModelCallEvent, self._after_model_call)
+
+    def _on_invocation(self, event: BeforeInvocationEvent) -> None:
+        self._last_failed = False
+
+    def _before_model_call(self, event: BeforeModelCallEvent) -> None:
+        self._started = time.perf_counter()
+        call = _current_call.get()
+        if call is not None and self._last_failed:
+            with call._lock:
+                call.models[self.model_id].retries += 1
+
+    def _after_model_call(self, event: AfterModelCallEvent) -> None:
+        elapsed = time.perf_counter() - self._started if self._started is not None else 0.0
+        self._started = None
+        self._last_failed = event.exception is not None
+        call = _current_call.get()
+        if call is None:
+            return
+        with call._lock:
+            usage = call.models[self.model_id]
+            usage.model_calls += 1
+            usage.model_seconds += elapsed
+            usage.errors += int(self._last_failed)
+
+
+def start_metrics_server(
+    port: int = METRICS_PORT, host: str = METRICS_HOST, registry: Optional[MetricsRegistry] = None
+) -> Optional[ThreadingHTTPServer]:
+    """
+    /metrics 경로로 Prometheus 텍스트를 제공하는 HTTP 서버를 데몬 스레드로 띄웁니다.
+
+    port가 0이면 아무것도 하지 않으며, 같은 프로세스에서 여러 번 호출해도(Streamlit 재실행) 서버는 하나만 띄웁니다.
+
+    Returns:
+        Optional[ThreadingHTTPServer]: 실행 중인 서버 (비활성화 시 None)
+    """
+    global _server
+    if not port:
+        return None
+    with _server_lock:
+        if _server is not None:
+            return _server
+        target = registry or default_metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = target.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug("metrics %s", format % args)
+
+        _server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+        logger.info("메트릭 엔드포인트: http://%s:%d/metrics", host, _server.server_address[1])
+        return _server
+
+
+def _labels(**labels: Any) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _escape(value: Any) -> str:
+    """Prometheus 레이블 값 이스케이프 (역슬래시, 줄바꿈, 큰따옴표)"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _totals_dict(totals: _OperationTotals) -> Dict[str, Any]:
+    walls = list(totals.recent_walls)
+    models = {model_id: vars(usage).copy() for model_id, usage in totals.models.items()}
+    return {
+        "calls": sum(totals.calls.values()),
+        "errors": totals.calls.get("error", 0),
+        "cache_hits": totals.cache_hits,
+        "degraded": totals.degraded,
+        "wall_seconds": totals.wall_seconds,
+        "tool_seconds": totals.tool_seconds,
+        "model_seconds": sum(usage["model_seconds"] for usage in models.values()),
+        "input_tokens": sum(usage["input_tokens"] for usage in models.values()),
+        "output_tokens": sum(usage["output_tokens"] for usage in models.values()),
+        "retries": sum(usage["retries"] for usage in models.values()),
+        "cost_usd": sum(estimate_cost(model_id, ModelUsage(**usage)) for model_id, usage in models.items()),
+        "wall_p50": _percentile(walls, 0.5),
+        "wall_p95": _percentile(walls, 0.95),
+        "models": models,
+    }
+
+
+def _read_counters(source: Callable[[], Mapping[str, Any]]) -> Dict[str, Any]:
+    try:
+        return {
+            name: value
+            for name, value in dict(source()).items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+        }
+    except Exception as e:
+        logger.warning("카운터 조회 실패: %s", e)
+        return {}
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+# 세 가지 분석기와 검수 도구가 함께 기록하는 기본 메트릭 레지스트리
+default_metrics = MetricsRegistry()
@@ -0,0 +1,347 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, Optional, Tuple, Type, TypeVar
+
+from strands import ModelRetryStrategy
+from strands.hooks import AfterModelCallEvent, BeforeModelCallEvent, HookProvider, HookRegistry
+from strands.types.exceptions import ContextWindowOverflowException, ModelThrottledException
+
+from .metrics import default_metrics, mark_degraded
+from .tracing import add_event
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 모델 호출 재시도 (지수 백오프 + full jitter: 0 ~ min(최대 지연, 기본 지연 * 2^시도) 사이에서 무작위로 대기)
+RETRY_MAX_ATTEMPTS = int(os.environ.get("RETRY_MAX_ATTEMPTS", "4"))
+RETRY_BASE_DELAY_SECONDS = float(os.environ.get("RETRY_BASE_DELAY_SECONDS", "0.5"))
+RETRY_MAX_DELAY_SECONDS = float(os.environ.get("RETRY_MAX_DELAY_SECONDS", "20"))
+
+# 모델 id별 클라이언트 측 속도 제한 (초당 요청 수, 0 이면 사용하지 않음)
+# MODEL_RATE_LIMITS 로 모델별 값을 따로 줄 수 있습니다 (예: "model-a=5:10,model-b=2" → 초당 5회/순간 10회, 초당 2회)
+MODEL_RATE_LIMIT_RPS = float(os.environ.get("MODEL_RATE_LIMIT_RPS", "0"))
+MODEL_RATE_LIMIT_BURST = float(os.environ.get("MODEL_RATE_LIMIT_BURST", "5"))
+MODEL_RATE_LIMITS = os.environ.get("MODEL_RATE_LIMITS", "")
+
+# 서킷 브레이커 (연속 실패가 기준에 닿으면 reset 시간 동안 모델 호출을 막고 캐시/로컬 결과로 대체)
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.environ.get("CIRCUIT_RESET_SECONDS", "30"))
+
+
+class ModelUnavailableError(RuntimeError):
+    """서킷이 열려 있어 모델을 호출하지 않았을 때 발생하는 예외"""
+
+    def __init__(self, key: str, retry_after: float):
+        super().__init__(f"{key} 호출이 일시적으로 차단되었습니다. ({retry_after:.1f}초 후 재시도)")
+        self.key = key
+        self.retry_after = retry_after
+
+
+# 모델을 쓸 수 없어 캐시/로컬 결과로 대체해야 하는 예외 (재시도를 모두 소진한 throttling 포함)
+UNAVAILABLE_ERRORS: Tuple[Type[BaseException], ...] = (ModelUnavailableError, ModelThrottledException)
+
+
+def backoff_delay(
+    attempt: int,
+    base_delay: float = RETRY_BASE_DELAY_SECONDS,
+    max_delay: float = RETRY_MAX_DELAY_SECONDS,
+) -> float:
+    """attempt(0부터)번째 재시도 전 대기 시간 (지수 백오프 상한 안에서 full jitter)"""
+    return random.uniform(0.0, min(max_delay, base_delay * (2**attempt)))
+
+
+class TokenBucket:
+    """
+    스레드 안전 토큰 버킷 (초당 rate 개 충전, 최대 burst 개 보관)
+
+    reserve()는 토큰을 먼저 예약하고 기다려야 할 시간을 돌려주므로,
+    동기/비동기 호출자가 각자의 방식(time.sleep / asyncio.sleep)으로 기다릴 수 있습니다.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """토큰 하나를 예약하고 사용 가능해질 때까지의 대기 시간(초)을 반환합니다."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1.0
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+
+class CircuitBreaker:
+    """
+    모델 id(또는 외부 서비스) 하나의 서킷 브레이커
+
+    - closed: 정상 호출, 연속 실패가 failure_threshold 에 닿으면 open
+    - open: reset_seconds 동안 호출을 막음 (ModelUnavailableError)
+    - half_open: reset_seconds 가 지나면 시험 호출 하나만 허용하고, 성공하면 closed, 실패하면 다시 open
+    """
+
+    def __init__(
+        self,
+        key: str,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_seconds: float = CIRCUIT_RESET_SECONDS,
+    ):
+        self.key = key
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """호출 전에 확인합니다. (차단 중이면 ModelUnavailableError)"""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == "closed":
+                return
+            if self.state == "open" and now - self._opened_at >= self.reset_seconds:
+                self.state = "half_open"
+            # 시험 호출이 결과 없이 끝난 경우(취소 등)를 대비해 reset_seconds 마다 새 시험 호출을 허용합니다
+            if self.state == "half_open" and now - self._probe_started >= self.reset_seconds:
+                self._probe_started = now
+                return
+            retry_after = max(self._opened_at + self.reset_seconds - now, 0.0)
+        _count(self.key, "rejected")
+        raise ModelUnavailableError(self.key, retry_after)
+
+    def record_success(self) -> None:
+        with self._lock:
+            closed = self.state != "closed"
+            self.state = "closed"
+            self.failures = 0
+        if closed:
+            logger.info("서킷 닫힘: %s", self.key)
+            _count(self.key, "circuit_closed")
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            opened = self.state == "half_open" or (
+                self.state == "closed" and self.failures >= self.failure_threshold
+            )
+            if opened:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+        _count(self.key, "failures")
+        if opened:
+            logger.warning("서킷 열림: %s (연속 실패 %d회)", self.key, self.failures)
+            _count(self.key, "circuit_opened")
+            add_event("resilience.circuit_open", {"resilience.key": self.key, "failures": self.failures})
+
+
+class ResilientRetryStrategy(ModelRetryStrategy):
+    """
+    Strands Agent의 재시도 전략 (throttling 시 jitter 지수 백오프, 최종 성공/실패는 서킷 브레이커에 기록)
+
+    Agent 생성 시 retry_strategy 로 전달합니다. Strands 기본 전략(4초부터 2배씩, 최대 6회)보다
+    짧은 지연에서 시작하고, 여러 요청이 동시에 제한을 받아도 같은 시각에 몰려 재시도하지 않도록 대기 시간을 흩뜨립니다.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        max_attempts: int = RETRY_MAX_ATTEMPTS,
+        base_delay: float = RETRY_BASE_DELAY_SECONDS,
+        max_delay: float = RETRY_MAX_DELAY_SECONDS,
+    ):
+        super().__init__(max_attempts=max_attempts, initial_delay=base_delay, max_delay=max_delay)  # type: ignore[arg-type]
+        self.model_id = model_id
+
+    def _calculate_delay(self, attempt: int) -> float:  # type: ignore[override]
+        return backoff_delay(attempt, self._initial_delay, self._max_delay)
+
+    async def _handle_after_model_call(self, event: AfterModelCallEvent) -> None:
+        await super()._handle_after_model_call(event)
+        if event.stop_response is not None:
+            breaker_for(self.model_id).record_success()
+        elif event.exception is not None:
+            if isinstance(event.exception, ModelThrottledException):
+                _count(self.model_id, "throttled")
+            if event.retry:
+                _count(self.model_id, "retries")
+                add_event(
+                    "resilience.retry",
+                    {"gen_ai.request.model": self.model_id, "error": type(event.exception).__name__},
+                )
+            elif is_availability_failure(event.exception):
+                breaker_for(self.model_id).record_failure()
+
+
+class RateLimitHook(HookProvider):
+    """모델 호출 직전에 모델 id별 토큰 버킷에서 토큰을 받습니다. (속도 제한이 꺼져 있으면 바로 통과)"""
+
+    def __init__(self, model_id: str):
+        self.model_id = model_id
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeModelCallEvent, self._before_model_call)
+
+    async def _before_model_call(self, event: BeforeModelCallEvent) -> None:
+        bucket = bucket_for(self.model_id)
+        if bucket is None:
+            return
+        wait = bucket.reserve()
+        if wait > 0:
+            _record_wait(self.model_id, wait)
+            await asyncio.sleep(wait)
+
+
+def is_availability_failure(exc: BaseException) -> bool:
+    """서킷 브레이커가 세는 실패인지 (요청 자체가 잘못된 경우는 제외)"""
+    return not isinstance(exc, (ContextWindowOverflowException, ValueError, TypeError))
+
+
+def call_with_retry(
+    key: str,
+    call: Callable[[], T],
+    retry_on: Tuple[Type[BaseException], ...],
+    max_attempts: int = RETRY_MAX_ATTEMPTS,
+) -> T:
+    """
+    Strands Agent 밖의 동기 호출(외부 API 등)에 같은 재시도/속도 제한/서킷 브레이커를 적용합니다.
+
+    Args:
+        key (str): 속도 제한/서킷 브레이커를 공유할 이름
+        call (Callable[[], T]): 실행할 호출
+        retry_on (Tuple[Type[BaseException], ...]): 백오프 후 다시 시도할 예외 (제한 초과 등)
+        max_attempts (int): 최대 시도 횟수
+
+    Raises:
+        ModelUnavailableError: 서킷이 열려 있을 때
+    """
+    breaker = breaker_for(key)
+    breaker.before_call()
+    bucket = bucket_for(key)
+    for attempt in range(max_attempts):
+        if bucket is not None:
+            wait = bucket.reserve()
+            if wait > 0:
+                _record_wait(key, wait)
+                time.sleep(wait)
+        try:
+            result = call()
+        except retry_on:
+            _count(key, "throttled")
+            if attempt == max_attempts - 1:
+                breaker.record_failure()
+                raise
+            _count(key, "retries")
+            time.sleep(backoff_delay(attempt))
+            continue
+        except Exception as e:
+            if is_availability_failure(e):
+                breaker.record_failure()
+            raise
+        breaker.record_success()
+        return result
+    raise AssertionError("unreachable")
+
+
+def record_degraded(operation: str, error: BaseException) -> None:
+    """모델 대신 캐시/로컬 결과로 응답한 호출을 기록합니다."""
+    logger.warning("%s: 모델을 사용할 수 없어 로컬 결과로 대체합니다 (%s)", operation, error)
+    _count(operation, "degraded")
+    mark_degraded()
+    add_event("resilience.degraded", {"operation": operation, "error": type(error).__name__})
+
+
+def breaker_for(key: str) -> CircuitBreaker:
+    with _registry_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker(key)
+        return breaker
+
+
+def bucket_for(key: str) -> Optional[TokenBucket]:
+    """key의 토큰 버킷 (속도 제한이 없으면 None)"""
+    with _registry_lock:
+        if key not in _buckets:
+            rate, burst = _rate_limits.get(key, (MODEL_RATE_LIMIT_RPS, MODEL_RATE_LIMIT_BURST))
+            _buckets[key] = TokenBucket(rate, burst) if rate > 0 else None
+        return _buckets[key]
+
+
+def set_rate_limit(key: str, rate: float, burst: Optional[float] = None) -> None:
+    """key(모델 id 등)의 초당 요청 수를 바꿉니다. (rate 0 이면 제한 없음)"""
+    with _registry_lock:
+        _rate_limits[key] = (rate, burst if burst is not None else MODEL_RATE_LIMIT_BURST)
+        _buckets.pop(key, None)
+
+
+def reset_resilience() -> None:
+    """서킷 브레이커/토큰 버킷/통계를 모두 초기화합니다. (벤치마크/실험용)"""
+    with _registry_lock:
+        _breakers.clear()
+        _buckets.clear()
+    with _stats_lock:
+        _stats.clear()
+
+
+def resilience_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    이름(모델 id, 외부 서비스, 진입점)별 통계 스냅샷
+
+    retries, throttled, rate_limited(속도 제한으로 기다린 호출 수), wait_seconds, failures,
+    circuit_opened/circuit_closed, rejected(서킷이 열려 막은 호출), degraded(로컬 결과로 대체), circuit(현재 상태)
+    """
+    with _stats_lock:
+        snapshot: Dict[str, Dict[str, Any]] = {key: dict(counter) for key, counter in _stats.items()}
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    for breaker in breakers:
+        snapshot.setdefault(breaker.key, {})["circuit"] = breaker.state
+    return snapshot
+
+
+def _parse_rate_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    limits: Dict[str, Tuple[float, float]] = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        key, _, value = item.rpartition("=")
+        rate, _, burst = value.partition(":")
+        limits[key] = (float(rate), float(burst) if burst else MODEL_RATE_LIMIT_BURST)
+    return limits
+
+
+def _record_wait(key: str, wait: float) -> None:
+    with _stats_lock:
+        _stats[key]["rate_limited"] += 1
+        _stats[key]["wait_seconds"] += wait
+
+
+def _count(key: str, name: str) -> None:
+    with _stats_lock:
+        _stats[key][name] += 1
+
+
+def _flat_stats() -> Dict[str, float]:
+    with _stats_lock:
+        return {f"{key}.{name}": value for key, counter in _stats.items() for name, value in counter.items()}
+
+
+_registry_lock = threading.Lock()
+_breakers: Dict[str, CircuitBreaker] = {}
+_buckets: Dict[str, Optional[TokenBucket]] = {}
+_rate_limits: Dict[str, Tuple[float, float]] = _parse_rate_limits(MODEL_RATE_LIMITS)
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Counter] = defaultdict(Counter)
+
+default_metrics.register_counters("resilience", _flat_stats)
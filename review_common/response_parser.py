@@ -0,0 +1,333 @@
+import ast
+import json
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterator, Literal, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from .metrics import default_metrics
+from .tracing import add_event
+
+T = TypeVar("T", bound=BaseModel)
+
+# 구조화 출력 방식
+# - single: 한 번의 모델 호출 응답을 로컬에서 검증/복구하고, 실패한 경우에만 structured_output 추가 호출
+# - two_pass: 기존 방식 (자유 응답 후 structured_output 으로 한 번 더 호출)
+StructuredMode = Literal["single", "two_pass"]
+DEFAULT_STRUCTURED_MODE: StructuredMode = os.environ.get(  # type: ignore[assignment]
+    "STRUCTURED_OUTPUT_MODE", "single"
+)
+
+_CODE_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.DOTALL)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Counter] = defaultdict(Counter)
+
+
+def extract_json_text(text: str) -> Optional[str]:
+    """
+    모델 응답에서 JSON 부분만 잘라냅니다.
+
+    코드 블록(```json ... ```)을 벗겨내고, 설명 문장이 섞여 있으면
+    처음 나오는 중괄호/대괄호 쌍이 닫히는 지점까지를 반환합니다.
+    """
+    return next(iter_json_candidates(text), None)
+
+
+def iter_json_candidates(text: str) -> Iterator[str]:
+    """
+    응답에서 괄호 짝이 맞는 JSON 후보 구간을 앞에서부터 차례로 돌려줍니다.
+
+    코드 블록이 있으면 블록 안을 먼저 보고, 설명 문장 속의 "[참고]" 처럼 JSON이 아닌
+    괄호 구간이 앞에 있어도 그 뒤의 구간을 이어서 찾을 수 있습니다.
+    """
+    fenced = _CODE_FENCE.search(text)
+    sources = (fenced.group(1), text) if fenced else (text,)
+    for source in sources:
+        position = 0
+        while True:
+            start = next((i for i in range(position, len(source)) if source[i] in "{["), None)
+            if start is None:
+                break
+            end = _balanced_end(source, start)
+            if end is None:
+                position = start + 1
+                continue
+            yield source[start:end]
+            position = end
+
+
+def _balanced_end(text: str, start: int) -> Optional[int]:
+    """start 위치의 괄호가 닫히는 바로 다음 위치 (짝이 맞지 않으면 None)"""
+    stack = []
+    in_string = False
+    escaped = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if not stack or stack.pop() != char:
+                return None
+            if not stack:
+                return index + 1
+    return None
+
+
+def repair_json_text(text: str) -> str:
+    """흔한 JSON 형식 오류(끝의 쉼표, 따옴표 종류)를 고칩니다."""
+    text = text.replace("“", '"').replace("”", '"')
+    return _TRAILING_COMMA.sub(r"\1", text)
+
+
+def load_json_value(text: str) -> Any:
+    """
+    JSON 후보 문자열을 해석합니다. (원문 → 형식 오류 수정 → 파이썬 dict 표기 순서로 시도)
+
+    Raises:
+        ValueError: 어떤 방식으로도 해석할 수 없을 때
+    """
+    for candidate in (text, repair_json_text(text)):
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    try:
+        # 작은따옴표/True/False/None 을 쓴 파이썬 dict 표기 응답
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError, MemoryError, RecursionError) as e:
+        raise ValueError(f"JSON으로 해석할 수 없습니다: {text[:80]}") from e
+
+
+def load_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """응답에서 처음으로 해석되는 JSON 객체를 찾습니다. (없으면 None)"""
+    for candidate in iter_json_candidates(text):
+        try:
+            data = load_json_value(candidate)
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+def parse_model_output(text: str, output_model: Type[T]) -> Tuple[Optional[T], bool]:
+    """
+    모델 응답 텍스트를 pydantic 모델로 검증합니다.
+
+    응답 전체가 올바른 JSON이면 그대로 검증하고, 아니면 코드 블록/설명 문장을 걷어낸
+    JSON 후보 구간을 차례로 복구해 처음으로 검증을 통과하는 결과를 사용합니다.
+
+    Args:
+        text (str): 모델 응답 텍스트
+        output_model (Type[T]): 검증할 pydantic 모델
+
+    Returns:
+        Tuple[Optional[T], bool]: (검증된 결과 또는 None, 로컬 복구를 거쳤는지 여부)
+    """
+    try:
+        return output_model.model_validate_json(text.strip()), False
+    except ValidationError:
+        pass
+
+    for candidate in iter_json_candidates(text):
+        try:
+            return output_model.model_validate(load_json_value(candidate)), True
+        except (ValueError, ValidationError):
+            continue
+    return None, False
+
+
+def schema_instruction(output_model: Type[BaseModel]) -> str:
+    """단일 호출에서 구조화된 응답을 받기 위해 프롬프트에 덧붙이는 JSON 스키마 지시문"""
+    schema = json.dumps(output_model.model_json_schema(), ensure_ascii=False)
+    return (
+        "\n응답은 설명이나 백틱(```json) 없이 다음 JSON 스키마를 만족하는 JSON 객체 하나로만 제공해주세요.\n"
+        f"<json_schema>{schema}</json_schema>\n"
+    )
+
+
+def invoke_structured(
+    agent: Any,
+    prompt: Any,
+    output_model: Type[T],
+    structured_prompt: str,
+    mode: StructuredMode = DEFAULT_STRUCTURED_MODE,
+    label: str = "default",
+) -> Tuple[T, str, int]:
+    """
+    Agent를 호출해 구조화된 결과를 얻습니다.
+
+    single 모드에서는 응답 텍스트를 로컬에서 검증/복구하고,
+    실패한 경우에만 agent.structured_output 을 추가로 호출합니다.
+
+    Args:
+        agent (Any): 대화 기록이 비어 있는 Strands Agent
+        prompt (Any): 사용자 프롬프트 (single 모드에서는 str 이어야 합니다)
+        output_model (Type[T]): 결과 pydantic 모델
+        structured_prompt (str): structured_output 호출 시 사용할 프롬프트
+        mode (StructuredMode): single 또는 two_pass
+        label (str): 통계 집계용 호출 구분 이름 (예: keywords, moderation)
+
+    Returns:
+        Tuple[T, str, int]: (구조화된 결과, 원본 응답 텍스트, 모델 호출 수)
+    """
+    if mode == "single":
+        prompt = prompt + schema_instruction(output_model)
+    response_text = str(agent(prompt))
+
+    if mode == "single":
+        result, fallback_calls = resolve_structured(
+            agent, response_text, output_model, structured_prompt, label
+        )
+    else:
+        result, fallback_calls = agent.structured_output(output_model, structured_prompt), 1
+        _count(label, "structured_output_calls")
+    return result, response_text, _finish(agent, fallback_calls, label)
+
+
+async def invoke_structured_async(
+    agent: Any,
+    prompt: Any,
+    output_model: Type[T],
+    structured_prompt: str,
+    mode: StructuredMode = DEFAULT_STRUCTURED_MODE,
+    label: str = "default",
+) -> Tuple[T, str, int]:
+    """invoke_structured 의 비동기 버전 (Agent.invoke_async / structured_output_async 사용)"""
+    if mode == "single":
+        prompt = prompt + schema_instruction(output_model)
+    response_text = str(await agent.invoke_async(prompt))
+
+    if mode == "single":
+        result, fallback_calls = await resolve_structured_async(
+            agent, response_text, output_model, structured_prompt, label
+        )
+    else:
+        result, fallback_calls = await agent.structured_output_async(output_model, structured_prompt), 1
+        _count(label, "structured_output_calls")
+    return result, response_text, _finish(agent, fallback_calls, label)
+
+
+def resolve_structured(
+    agent: Any, response_text: str, output_model: Type[T], reask_prompt: str, label: str
+) -> Tuple[T, int]:
+    """
+    이미 받은 응답을 로컬에서 검증/복구하고, 복구할 수 없을 때만 같은 Agent에 structured_output 으로 다시 묻습니다.
+
+    다시 물을 때는 Agent의 대화 기록(직전 응답 포함)을 그대로 사용하므로 리뷰 전체를 처음부터 다시 분석하지 않습니다.
+
+    Args:
+        agent (Any): 방금 응답한 Strands Agent
+        response_text (str): 모델 응답 텍스트
+        output_model (Type[T]): 결과 pydantic 모델
+        reask_prompt (str): 다시 물을 때 사용할 프롬프트
+        label (str): 통계 집계용 호출 구분 이름
+
+    Returns:
+        Tuple[T, int]: (검증된 결과, 추가 모델 호출 수 0 또는 1)
+    """
+    result = parse_structured(response_text, output_model, label)
+    if result is not None:
+        return result, 0
+    return reask_structured(agent, output_model, reask_prompt, label), 1
+
+
+async def resolve_structured_async(
+    agent: Any, response_text: str, output_model: Type[T], reask_prompt: str, label: str
+) -> Tuple[T, int]:
+    """resolve_structured 의 비동기 버전"""
+    result = parse_structured(response_text, output_model, label)
+    if result is not None:
+        return result, 0
+    return await reask_structured_async(agent, output_model, reask_prompt, label), 1
+
+
+def reask_structured(agent: Any, output_model: Type[T], reask_prompt: str, label: str) -> T:
+    """로컬에서 복구할 수 없는 응답을 같은 Agent에 structured_output 으로 다시 묻습니다."""
+    _count(label, "structured_output_calls")
+    return agent.structured_output(output_model, reask_prompt)
+
+
+async def reask_structured_async(agent: Any, output_model: Type[T], reask_prompt: str, label: str) -> T:
+    """reask_structured 의 비동기 버전"""
+    _count(label, "structured_output_calls")
+    return await agent.structured_output_async(output_model, reask_prompt)
+
+
+def parse_structured(response_text: str, output_model: Type[T], label: str) -> Optional[T]:
+    """parse_model_output 결과를 호출 구분별 통계(parsed_direct/parsed_repaired/unparsed)에 기록합니다."""
+    result, repaired = parse_model_output(response_text, output_model)
+    if result is None:
+        _count(label, "unparsed")
+    else:
+        _count(label, "parsed_repaired" if repaired else "parsed_direct")
+    # structured_output 추가 호출 여부를 트레이스에서도 확인할 수 있도록 기록합니다
+    add_event(
+        "structured_output.local_parse",
+        {"parsed": result is not None, "repaired": repaired, "label": label},
+    )
+    return result
+
+
+def _finish(agent: Any, fallback_calls: int, label: str) -> int:
+    """통계를 기록하고 이번 호출의 모델 호출 수를 반환합니다."""
+    # Agent 루프의 각 cycle이 한 번의 모델 호출입니다 (structured_output 호출은 cycle에 포함되지 않음)
+    model_calls = agent.event_loop_metrics.cycle_count + fallback_calls
+    _count(label, "reviews")
+    _count(label, "model_calls", model_calls)
+    return model_calls
+
+
+def structured_output_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    호출 구분별 구조화 출력 통계 스냅샷
+
+    - model_calls_per_review: 리뷰당 평균 모델 호출 수
+    - retries_avoided: 그대로는 json.loads 에 실패했지만 로컬 복구(코드 블록/설명 문장 제거, 쉼표 수정)로
+      추가 모델 호출 없이 처리한 응답 수 (parsed_repaired 와 같음)
+    - reask_rate: 로컬에서 복구하지 못해 structured_output 으로 다시 물은 비율
+    - unparsed: 로컬에서 복구하지 못한 응답 수 (다시 묻거나, 모델 등급 라우팅에서는 상위 모델로 넘김)
+    """
+    with _stats_lock:
+        snapshot = {label: dict(counter) for label, counter in _stats.items()}
+    for stats in snapshot.values():
+        reviews = stats.get("reviews", 0)
+        stats["model_calls_per_review"] = (
+            stats.get("model_calls", 0) / reviews if reviews else 0.0
+        )
+        parsed = stats.get("parsed_direct", 0) + stats.get("parsed_repaired", 0)
+        reasks = stats.get("structured_output_calls", 0)
+        stats["retries_avoided"] = stats.get("parsed_repaired", 0)
+        stats["reask_rate"] = reasks / (parsed + reasks) if parsed + reasks else 0.0
+    return snapshot
+
+
+def _count(label: str, name: str, amount: int = 1) -> None:
+    with _stats_lock:
+        _stats[label][name] += amount
+
+
+def _flat_stats() -> Dict[str, int]:
+    with _stats_lock:
+        return {
+            f"{label}.{name}": count
+            for label, counter in _stats.items()
+            for name, count in counter.items()
+        }
+
+
+default_metrics.register_counters("structured_output", _flat_stats)
@@ -0,0 +1,373 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional
+
+from .metrics import default_metrics, mark_cache_hit
+
+logger = logging.getLogger(__name__)
+
+# 캐시 기본 설정 (환경 변수로 조정 가능)
+DEFAULT_MAX_ENTRIES = int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", "1024"))
+DEFAULT_TTL_SECONDS = float(os.environ.get("RESULT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+DEFAULT_DB_MAX_BYTES = int(os.environ.get("RESULT_CACHE_DB_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def normalize_text(text: str) -> str:
+    """유니코드 정규화(NFC) 후 공백을 하나로 합쳐 캐시 키에 사용할 텍스트를 만듭니다."""
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def prompt_version(*prompts: str) -> str:
+    """프롬프트 문자열로부터 짧은 버전 해시를 만듭니다. 프롬프트가 바뀌면 캐시도 자연스럽게 무효화됩니다."""
+    digest = hashlib.sha256()
+    for prompt in prompts:
+        digest.update(prompt.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:12]
+
+
+def image_fingerprint(image: Any) -> Optional[str]:
+    """PIL 이미지의 픽셀 데이터 해시 (이미지가 없으면 None)"""
+    if image is None:
+        return None
+    digest = hashlib.sha256()
+    digest.update(f"{image.mode}:{image.size}".encode("utf-8"))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def make_cache_key(
+    kind: str,
+    review_text: str,
+    *,
+    model_id: str,
+    prompt_version: str,
+    rating: Optional[int] = None,
+    product_data: Optional[Dict[str, Any]] = None,
+    image_hash: Optional[str] = None,
+    extra: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    분석 결과 캐시 키를 만듭니다.
+
+    Args:
+        kind (str): 분석 종류 (sentiment, keywords, moderation)
+        review_text (str): 리뷰 텍스트 (정규화 후 해시)
+        model_id (str): 모델 ID
+        prompt_version (str): 프롬프트 버전 해시
+        rating (Optional[int]): 별점
+        product_data (Optional[Dict[str, Any]]): 제품 정보
+        image_hash (Optional[str]): 이미지 해시
+        extra (Optional[Dict[str, Any]]): 결과에 영향을 주는 기타 입력 (예: 등록 키워드 버전)
+
+    Returns:
+        str: SHA-256 hex 키
+    """
+    payload = {
+        "kind": kind,
+        "review_text": normalize_text(review_text),
+        "rating": rating,
+        "product_data": product_data,
+        "image_hash": image_hash,
+        "model_id": model_id,
+        "prompt_version": prompt_version,
+        "extra": extra,
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ResultCache(ABC):
+    """결과 캐시 인터페이스. 값은 JSON 직렬화 가능한 dict 입니다."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """키에 해당하는 값 (없거나 만료되었으면 None)"""
+
+    @abstractmethod
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """값을 저장합니다."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """모든 항목을 삭제합니다."""
+
+
+class MemoryLRUCache(ResultCache):
+    """프로세스 내 LRU 캐시 (max_entries 초과 시 가장 오래 사용되지 않은 항목부터 제거)"""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, encoded = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return json.loads(encoded)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        encoded = json.dumps(value, ensure_ascii=False)
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._entries[key] = (expires_at, encoded)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache(ResultCache):
+    """
+    디스크(SQLite) 캐시
+
+    - ttl_seconds가 지난 항목은 조회 시 무시되고 정리 시 삭제됩니다
+    - 저장된 값의 총 크기가 max_bytes를 넘으면 가장 오래 사용되지 않은 항목부터 삭제합니다
+    - 총 크기는 메모리에서 증감해 관리하고, 만료 정리(SWEEP_INTERVAL 쓰기마다) 때 DB 기준으로 다시 맞춥니다
+    - 조회 시각(accessed_at) 갱신은 모아 두었다가 TOUCH_BATCH 건마다 또는 다음 쓰기 때 한 번에 반영합니다
+    """
+
+    # 만료 항목 정리와 총 크기 재계산 주기 (쓰기 횟수)
+    SWEEP_INTERVAL = 256
+    # 조회 시각 갱신을 모아 반영하는 건수
+    TOUCH_BATCH = 64
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS,
+        max_bytes: int = DEFAULT_DB_MAX_BYTES,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # 아직 DB에 반영하지 않은 조회 시각 {key: accessed_at}
+        self._touched: Dict[str, float] = {}
+        self._writes = 0
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS result_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_result_cache_accessed ON result_cache (accessed_at)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_result_cache_expires ON result_cache (expires_at)"
+            )
+            self._total_bytes = self._stored_bytes()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, size, expires_at FROM result_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            encoded, size, expires_at = row
+            if expires_at is not None and expires_at < now:
+                self._conn.execute("DELETE FROM result_cache WHERE key = ?", (key,))
+                self._touched.pop(key, None)
+                self._total_bytes -= size
+                return None
+            self._touched[key] = now
+            if len(self._touched) >= self.TOUCH_BATCH:
+                self._flush_touched()
+        return json.loads(encoded)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.time()
+        encoded = json.dumps(value, ensure_ascii=False)
+        size = len(encoded.encode("utf-8"))
+        expires_at = now + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT size FROM result_cache WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO result_cache (key, value, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, size, expires_at, now),
+            )
+            self._touched.pop(key, None)
+            self._total_bytes += size - (row[0] if row else 0)
+            self._flush_touched()
+            self._writes += 1
+            if self._writes % self.SWEEP_INTERVAL == 0:
+                self._sweep(now)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM result_cache")
+            self._touched.clear()
+            self._total_bytes = 0
+
+    def _stored_bytes(self) -> int:
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM result_cache"
+        ).fetchone()
+        return total
+
+    def _flush_touched(self) -> None:
+        """모아 둔 조회 시각을 한 번에 반영합니다."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE result_cache SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _sweep(self, now: float) -> None:
+        """만료 항목을 지우고 총 크기를 DB 기준으로 다시 계산합니다. (다른 프로세스의 쓰기 반영)"""
+        self._conn.execute(
+            "DELETE FROM result_cache WHERE expires_at IS NOT NULL AND expires_at < ?",
+            (now,),
+        )
+        self._total_bytes = self._stored_bytes()
+
+    def _evict(self) -> None:
+        """총 크기가 max_bytes 이하가 될 때까지 LRU 순으로 삭제합니다."""
+        excess = self._total_bytes - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM result_cache ORDER BY accessed_at"
+        ):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM result_cache WHERE key = ?", victims)
+        self._total_bytes -= freed
+
+
+class TieredCache(ResultCache):
+    """
+    여러 캐시 계층을 순서대로 조회하는 캐시 (예: 메모리 LRU -> SQLite)
+
+    하위 계층에서 찾은 값은 상위 계층에도 채워 넣습니다.
+    stats에 hits, misses, 계층별 hits(hits.<계층 클래스명>)를 기록합니다.
+    """
+
+    def __init__(self, tiers: List[ResultCache]):
+        self.tiers = tiers
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        for depth, tier in enumerate(self.tiers):
+            try:
+                value = tier.get(key)
+            except Exception as e:
+                logger.warning("결과 캐시 조회 실패 (%s): %s", type(tier).__name__, e)
+                continue
+            if value is not None:
+                for upper in self.tiers[:depth]:
+                    upper.set(key, value)
+                self._count("hits", f"hits.{type(tier).__name__}")
+                return value
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        for tier in self.tiers:
+            try:
+                tier.set(key, value)
+            except Exception as e:
+                logger.warning("결과 캐시 저장 실패 (%s): %s", type(tier).__name__, e)
+
+    def clear(self) -> None:
+        for tier in self.tiers:
+            tier.clear()
+
+    def _count(self, *names: str) -> None:
+        with self._lock:
+            for name in names:
+                self.stats[name] += 1
+
+
+def build_default_cache() -> TieredCache:
+    """
+    기본 캐시: 메모리 LRU 계층 + (RESULT_CACHE_DB 환경 변수가 있으면) SQLite 계층
+    """
+    tiers: List[ResultCache] = [MemoryLRUCache()]
+    db_path = os.environ.get("RESULT_CACHE_DB")
+    if db_path:
+        tiers.append(SQLiteCache(db_path))
+    return TieredCache(tiers)
+
+
+_result_cache: Optional[ResultCache] = build_default_cache()
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """현재 설정된 결과 캐시 (비활성화된 경우 None)"""
+    return _result_cache
+
+
+def set_result_cache(cache: Optional[ResultCache]) -> None:
+    """결과 캐시를 교체합니다. None을 넘기면 캐시를 사용하지 않습니다."""
+    global _result_cache
+    _result_cache = cache
+
+
+def lookup_result(key: str) -> Optional[Dict[str, Any]]:
+    """설정된 캐시에서 결과를 조회합니다. (캐시 비활성화 시 항상 None, 적중 시 현재 호출 메트릭에 표시)"""
+    cache = _result_cache
+    value = cache.get(key) if cache is not None else None
+    if value is not None:
+        mark_cache_hit()
+    return value
+
+
+def store_result(key: str, value: Dict[str, Any]) -> None:
+    """설정된 캐시에 결과를 저장합니다. (캐시 비활성화 시 무시)"""
+    cache = _result_cache
+    if cache is not None:
+        cache.set(key, value)
+
+
+def _cache_stats() -> Dict[str, Any]:
+    cache = _result_cache
+    return getattr(cache, "stats", {}) if cache is not None else {}
+
+
+default_metrics.register_counters("result_cache", _cache_stats)
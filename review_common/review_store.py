@@ -0,0 +1,264 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# 리뷰/분석 결과 DB 경로 (세 앱이 같은 파일을 공유합니다)
+REVIEW_DB_PATH = os.environ.get(
+    "REVIEW_DB_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "reviews.sqlite3"),
+)
+
+# 리뷰 목록 한 페이지의 기본 크기
+DEFAULT_PAGE_SIZE = int(os.environ.get("REVIEW_PAGE_SIZE", "20"))
+
+# 검수 결과가 아직 없는 리뷰의 상태
+PENDING_STATUS = "pending"
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    product_id TEXT NOT NULL,
+    author TEXT NOT NULL,
+    rating INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    image_path TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reviews_product ON reviews (product_id, id);
+CREATE INDEX IF NOT EXISTS idx_reviews_product_rating ON reviews (product_id, rating, id);
+CREATE INDEX IF NOT EXISTS idx_reviews_product_status ON reviews (product_id, status, id);
+
+CREATE TABLE IF NOT EXISTS review_results (
+    review_id INTEGER NOT NULL REFERENCES reviews (id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (review_id, kind)
+);
+"""
+
+
+class ReviewStore:
+    """
+    리뷰와 분석 결과를 저장하는 SQLite 저장소 (세 Streamlit 앱 공용)
+
+    - WAL 모드로 열어 여러 세션/작업 스레드가 읽는 동안에도 쓰기가 막히지 않습니다
+    - 리뷰 id는 AUTOINCREMENT 로 발급하므로 삭제 후에도 재사용되지 않습니다
+    - 상품/평점/검수 상태별 조회와 페이지 조회는 모두 (product_id, ..., id) 인덱스를 탑니다
+    - 분석 결과는 (리뷰 id, 종류: sentiment/keywords/moderation) 별로 JSON 한 행에 저장합니다
+    - 연결은 스레드별로 하나씩 만들어 재사용합니다 (sqlite3 연결은 스레드 간 공유하지 않음)
+    """
+
+    def __init__(self, path: str = REVIEW_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    # ---- 리뷰 ----
+
+    def add_review(
+        self,
+        product_id: str,
+        author: str,
+        rating: int,
+        content: str,
+        image_path: Optional[str] = None,
+        created_at: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """리뷰를 저장하고 (새 id가 포함된) 리뷰를 반환합니다."""
+        created_at = created_at or datetime.now().strftime(TIMESTAMP_FORMAT)
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO reviews (product_id, author, rating, content, image_path, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (product_id, author, rating, content, image_path, created_at),
+            )
+            review_id = cursor.lastrowid
+        return self.get_review(review_id)
+
+    def seed_reviews(self, product_id: str, reviews: Iterable[Dict[str, Any]]) -> int:
+        """상품에 리뷰가 하나도 없을 때만 예시 리뷰를 넣습니다. (여러 세션이 동시에 호출해도 한 번만)"""
+        with self._transaction() as conn:
+            if conn.execute(
+                "SELECT 1 FROM reviews WHERE product_id = ? LIMIT 1", (product_id,)
+            ).fetchone():
+                return 0
+            rows = [
+                (
+                    product_id,
+                    review["author"],
+                    review["rating"],
+                    review["content"],
+                    review.get("image_path"),
+                    review.get("timestamp") or datetime.now().strftime(TIMESTAMP_FORMAT),
+                )
+                for review in reviews
+            ]
+            conn.executemany(
+                "INSERT INTO reviews (product_id, author, rating, content, image_path, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            return len(rows)
+
+    def get_review(self, review_id: int) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute("SELECT * FROM reviews WHERE id = ?", (review_id,)).fetchone()
+        return _review(row) if row else None
+
+    def list_reviews(
+        self,
+        product_id: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        offset: int = 0,
+        rating: Optional[int] = None,
+        status: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """최신 리뷰부터 한 페이지를 조회합니다."""
+        where, params = _filters(product_id, rating, status)
+        rows = self._connection().execute(
+            f"SELECT * FROM reviews WHERE {where} ORDER BY id DESC LIMIT ? OFFSET ?",
+            (*params, limit, offset),
+        ).fetchall()
+        return [_review(row) for row in rows]
+
+    def count_reviews(
+        self, product_id: str, rating: Optional[int] = None, status: Optional[str] = None
+    ) -> int:
+        where, params = _filters(product_id, rating, status)
+        return self._connection().execute(
+            f"SELECT COUNT(*) FROM reviews WHERE {where}", params
+        ).fetchone()[0]
+
+    def rating_summary(self, product_id: str) -> Tuple[int, float]:
+        """(리뷰 수, 평균 평점) - 리뷰 목록을 메모리로 읽지 않고 DB에서 집계합니다."""
+        count, average = self._connection().execute(
+            "SELECT COUNT(*), AVG(rating) FROM reviews WHERE product_id = ?", (product_id,)
+        ).fetchone()
+        return count, average or 0.0
+
+    def delete_review(self, review_id: int) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM reviews WHERE id = ?", (review_id,))
+
+    # ---- 분석 결과 ----
+
+    def save_result(
+        self, review_id: int, kind: str, payload: Dict[str, Any], status: Optional[str] = None
+    ) -> None:
+        """
+        분석 결과를 저장(덮어쓰기)합니다.
+
+        Args:
+            review_id (int): 리뷰 id
+            kind (str): 결과 종류 (sentiment, keywords, moderation)
+            payload (Dict): JSON으로 저장할 결과
+            status (Optional[str]): 리뷰의 검수 상태도 함께 바꿀 때 지정 (예: PASS/FAIL)
+        """
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO review_results (review_id, kind, payload, updated_at) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (review_id, kind) DO UPDATE SET"
+                " payload = excluded.payload, updated_at = excluded.updated_at",
+                (
+                    review_id,
+                    kind,
+                    json.dumps(payload, ensure_ascii=False, default=str),
+                    datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                ),
+            )
+            if status is not None:
+                conn.execute("UPDATE reviews SET status = ? WHERE id = ?", (status, review_id))
+
+    def get_results(self, review_ids: Iterable[int], kind: str) -> Dict[int, Dict[str, Any]]:
+        """여러 리뷰의 결과를 한 번에 조회합니다. (결과가 없는 리뷰는 제외)"""
+        review_ids = list(review_ids)
+        if not review_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in review_ids)
+        rows = self._connection().execute(
+            f"SELECT review_id, payload FROM review_results"
+            f" WHERE kind = ? AND review_id IN ({placeholders})",
+            (kind, *review_ids),
+        ).fetchall()
+        return {row["review_id"]: json.loads(row["payload"]) for row in rows}
+
+    # ---- 연결 ----
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self._initialize()
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """쓰기 트랜잭션 (BEGIN IMMEDIATE 로 시작해 쓰기 충돌 시 대기)"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _initialize(self) -> None:
+        """DB 파일/스키마를 만들고 WAL 모드로 전환합니다. (프로세스당 한 번)"""
+        with self._init_lock:
+            if self._initialized:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            try:
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.executescript(_SCHEMA)
+                conn.commit()
+            finally:
+                conn.close()
+            self._initialized = True
+
+
+def _filters(
+    product_id: str, rating: Optional[int], status: Optional[str]
+) -> Tuple[str, Tuple[Any, ...]]:
+    clauses, params = ["product_id = ?"], [product_id]
+    if rating is not None:
+        clauses.append("rating = ?")
+        params.append(rating)
+    if status is not None:
+        clauses.append("status = ?")
+        params.append(status)
+    return " AND ".join(clauses), tuple(params)
+
+
+def _review(row: sqlite3.Row) -> Dict[str, Any]:
+    """앱이 사용하던 comment 딕셔너리 형태로 변환 (timestamp = 작성 시각)"""
+    return {
+        "id": row["id"],
+        "product_id": row["product_id"],
+        "author": row["author"],
+        "rating": row["rating"],
+        "content": row["content"],
+        "image_path": row["image_path"],
+        "status": row["status"],
+        "timestamp": row["created_at"],
+    }
+
+
+# 세 Streamlit 앱이 함께 사용하는 기본 저장소
+default_review_store = ReviewStore()
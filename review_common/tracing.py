@@ -0,0 +1,274 @@
+import json
+import logging
+import os
+import threading
+import urllib.request
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from opentelemetry import trace as trace_api
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace import TracerProvider as SDKTracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+from strands.telemetry import StrandsTelemetry
+
+logger = logging.getLogger(__name__)
+
+# 트레이스 내보내기 대상 (쉼표로 여러 개 지정: json, otlp, console / 비어 있거나 off 이면 사용하지 않음)
+TRACE_EXPORTER = os.environ.get("TRACE_EXPORTER", "off")
+# json 내보내기 파일 (span 한 개당 JSON 한 줄)
+TRACE_FILE = os.environ.get(
+    "TRACE_FILE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "traces.jsonl"),
+)
+# otlp 내보내기 주소 (OpenTelemetry 표준 환경 변수, 기본값은 로컬 collector의 OTLP/HTTP 포트)
+OTLP_TRACES_ENDPOINT = os.environ.get(
+    "OTEL_EXPORTER_OTLP_TRACES_ENDPOINT",
+    os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318").rstrip("/") + "/v1/traces",
+)
+
+TRACER_NAME = "review_common"
+
+# OTLP JSON 의 SpanKind 는 OpenTelemetry Python SpanKind 값 + 1 입니다 (0 = UNSPECIFIED)
+_OTLP_KIND_OFFSET = 1
+
+
+class JsonFileSpanExporter(SpanExporter):
+    """
+    끝난 span을 JSON Lines 파일에 추가하는 내보내기 (benchmarks/trace_report.py 로 분석)
+
+    한 줄에 span 하나: trace_id, span_id, parent_id, name, start/end(ns), duration_ms, status, attributes, events
+    """
+
+    def __init__(self, path: str = TRACE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(json.dumps(span_record(span), ensure_ascii=False) + "\n" for span in spans)
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError as e:
+            logger.warning("트레이스 파일 기록 실패 (%s): %s", self.path, e)
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+class OtlpJsonSpanExporter(SpanExporter):
+    """
+    OTLP/HTTP JSON 형식으로 collector에 span을 보내는 내보내기 (표준 라이브러리만 사용)
+
+    opentelemetry-exporter-otlp 패키지가 없을 때 대신 사용하며, OTLP/HTTP를 받는
+    collector(OpenTelemetry Collector, Jaeger 등)나 로컬 대역 서버로 보낼 수 있습니다.
+    """
+
+    def __init__(self, endpoint: str = OTLP_TRACES_ENDPOINT, timeout: float = 10.0):
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        if not spans:
+            return SpanExportResult.SUCCESS
+        body = json.dumps(otlp_payload(spans)).encode("utf-8")
+        request = urllib.request.Request(
+            self.endpoint, data=body, headers={"Content-Type": "application/json"}, method="POST"
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except OSError as e:
+            logger.warning("OTLP 트레이스 전송 실패 (%s): %s", self.endpoint, e)
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+def setup_tracing(exporters: Optional[str] = None) -> Optional[StrandsTelemetry]:
+    """
+    전역 OpenTelemetry TracerProvider를 설정하고 내보내기를 연결합니다. (프로세스당 한 번)
+
+    Strands가 만드는 Agent 호출/모델 호출(chat)/도구 실행/structured_output span과
+    이 저장소의 진입점/도구/Agent 생성 span이 같은 트레이스에 부모-자식 관계로 기록됩니다.
+
+    Args:
+        exporters (Optional[str]): json, otlp, console 을 쉼표로 구분 (None이면 TRACE_EXPORTER)
+
+    Returns:
+        Optional[StrandsTelemetry]: 설정된 텔레메트리 (비활성화 시 None)
+    """
+    global _telemetry
+    names = [name.strip() for name in (exporters or TRACE_EXPORTER).split(",") if name.strip()]
+    names = [name for name in names if name != "off"]
+    if not names:
+        return None
+    with _setup_lock:
+        if _telemetry is not None:
+            return _telemetry
+        # 다른 곳에서 이미 SDK TracerProvider를 설정했다면 그대로 사용합니다
+        provider = trace_api.get_tracer_provider()
+        telemetry = StrandsTelemetry(
+            tracer_provider=provider if isinstance(provider, SDKTracerProvider) else None
+        )
+        for name in names:
+            if name == "json":
+                telemetry.tracer_provider.add_span_processor(
+                    BatchSpanProcessor(JsonFileSpanExporter(TRACE_FILE))
+                )
+            elif name == "otlp":
+                telemetry.tracer_provider.add_span_processor(BatchSpanProcessor(_otlp_exporter()))
+            elif name == "console":
+                telemetry.setup_console_exporter()
+            else:
+                logger.warning("알 수 없는 TRACE_EXPORTER 값: %s", name)
+        _telemetry = telemetry
+        logger.info("트레이스 내보내기: %s", ", ".join(names))
+        return telemetry
+
+
+def flush_traces(timeout_millis: int = 30000) -> None:
+    """대기 중인 span을 즉시 내보냅니다. (스크립트 종료 직전 등)"""
+    if _telemetry is not None:
+        _telemetry.tracer_provider.force_flush(timeout_millis)
+
+
+@contextmanager
+def span(name: str, attributes: Optional[Dict[str, Any]] = None) -> Iterator[trace_api.Span]:
+    """
+    현재 span의 자식 span을 만듭니다. (트레이스가 설정되지 않았으면 비용이 거의 없는 no-op span)
+
+    예외가 발생하면 span에 예외와 ERROR 상태가 기록됩니다.
+    """
+    tracer = trace_api.get_tracer(TRACER_NAME)
+    with tracer.start_as_current_span(name, attributes=_clean(attributes)) as current:
+        yield current
+
+
+def add_event(name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+    """현재 span에 이벤트를 추가합니다."""
+    current = trace_api.get_current_span()
+    if current.is_recording():
+        current.add_event(name, _clean(attributes))
+
+
+def span_record(span: ReadableSpan) -> Dict[str, Any]:
+    """JSON 파일에 기록하는 span 한 줄"""
+    context = span.get_span_context()
+    start, end = span.start_time or 0, span.end_time or 0
+    return {
+        "trace_id": f"{context.trace_id:032x}",
+        "span_id": f"{context.span_id:016x}",
+        "parent_id": f"{span.parent.span_id:016x}" if span.parent else None,
+        "name": span.name,
+        "start": start,
+        "end": end,
+        "duration_ms": (end - start) / 1e6,
+        "status": span.status.status_code.name,
+        "attributes": dict(span.attributes or {}),
+        "events": [
+            {"name": event.name, "time": event.timestamp, "attributes": dict(event.attributes or {})}
+            for event in span.events
+        ],
+    }
+
+
+def otlp_payload(spans: Sequence[ReadableSpan]) -> Dict[str, Any]:
+    """span 목록을 OTLP/HTTP JSON(ExportTraceServiceRequest) 형식으로 변환합니다."""
+    resources: Dict[int, Any] = {}
+    grouped: Dict[int, Dict[str, List[Dict[str, Any]]]] = {}
+    for item in spans:
+        key = id(item.resource)
+        resources[key] = item.resource
+        scope = item.instrumentation_scope.name if item.instrumentation_scope else ""
+        grouped.setdefault(key, {}).setdefault(scope, []).append(_otlp_span(item))
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": _otlp_attributes(resources[key].attributes)},
+                "scopeSpans": [
+                    {"scope": {"name": scope}, "spans": scope_spans}
+                    for scope, scope_spans in scopes.items()
+                ],
+            }
+            for key, scopes in grouped.items()
+        ]
+    }
+
+
+def _otlp_span(span: ReadableSpan) -> Dict[str, Any]:
+    context = span.get_span_context()
+    record = {
+        "traceId": f"{context.trace_id:032x}",
+        "spanId": f"{context.span_id:016x}",
+        "name": span.name,
+        "kind": span.kind.value + _OTLP_KIND_OFFSET,
+        "startTimeUnixNano": str(span.start_time or 0),
+        "endTimeUnixNano": str(span.end_time or 0),
+        "attributes": _otlp_attributes(span.attributes),
+        "events": [
+            {
+                "timeUnixNano": str(event.timestamp),
+                "name": event.name,
+                "attributes": _otlp_attributes(event.attributes),
+            }
+            for event in span.events
+        ],
+        "status": {"code": span.status.status_code.value, "message": span.status.description or ""},
+    }
+    if span.parent:
+        record["parentSpanId"] = f"{span.parent.span_id:016x}"
+    return record
+
+
+def _otlp_attributes(attributes: Any) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in dict(attributes or {}).items()]
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(item) for item in value]}}
+    return {"stringValue": str(value)}
+
+
+def _otlp_exporter() -> SpanExporter:
+    """opentelemetry-exporter-otlp 가 설치되어 있으면 사용하고, 없으면 OTLP/HTTP JSON 내보내기를 사용합니다."""
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    except ImportError:
+        return OtlpJsonSpanExporter(OTLP_TRACES_ENDPOINT)
+    return OTLPSpanExporter(endpoint=OTLP_TRACES_ENDPOINT)
+
+
+def _clean(attributes: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """OpenTelemetry 속성으로 쓸 수 없는 값(None, dict 등)을 제외/문자열화합니다."""
+    if not attributes:
+        return None
+    cleaned: Dict[str, Any] = {}
+    for key, value in attributes.items():
+        if value is None:
+            continue
+        if isinstance(value, (str, bool, int, float)):
+            cleaned[key] = value
+        elif isinstance(value, (list, tuple)) and all(isinstance(item, str) for item in value):
+            cleaned[key] = list(value)
+        else:
+            cleaned[key] = str(value)
+    return cleaned
+
+
+_telemetry: Optional[StrandsTelemetry] = None
+_setup_lock = threading.Lock()
@@ -1,17 +1,37 @@
 import json
 import logging
-from strands import Agent
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Literal, Optional, Tuple
+
+from pydantic import BaseModel, Field, ValidationError
+
+from review_common.agent_pool import default_pool
+from review_common.concurrency import DEFAULT_TIMEOUT, run_limited
+from review_common.metrics import instrumented
+from review_common.resilience import UNAVAILABLE_ERRORS, record_degraded
+from review_common.response_parser import (
+    iter_json_candidates,
+    load_json_value,
+    resolve_structured,
+    resolve_structured_async,
+)
+from review_common.result_cache import (
+    lookup_result,
+    make_cache_key,
+    prompt_version,
+    store_result,
+)
 
 #Configure logging
 logging.getLogger("strands").setLevel(logging.INFO)
-#Debug Customizing
-logging.info("Debugging Message from Young")
 #Add a handler to see the logs
 logging.basicConfig(
     level=logging.INFO,
     format="%(levelname)s:%(name)s:%(message)s", handlers=[logging.StreamHandler()]
 )
-SYSTEM_PROMPT = """
+MODEL_ID = "apac.anthropic.claude-3-haiku-20240307-v1:0"
+
+SENTIMENT_GUIDELINES = """
     당신은 리뷰 감정 분석 전문가입니다.
     리뷰 텍스트를 분석하여 감정을 분류하고 점수를 매겨주세요.
 
@@ -33,7 +53,9 @@ SYSTEM_PROMPT = """
     - 비교 표현('~보다 나아요')의 상대적 의미를 고려해주세요
     - 텍스트가 너무 짧거나 모호한 경우 confidence를 낮게 설정해주세요
     </주의사항>
+"""
 
+SYSTEM_PROMPT = SENTIMENT_GUIDELINES + """
     <출력형식>
     결과를 JSON 형식으로 반환해주세요. 답변에 백틱이나 코드 블록 포맷(```json, ```python 등)을 붙이지 마세요. :
     {
@@ -44,7 +66,50 @@ SYSTEM_PROMPT = """
     }
     </출력형식>
 """
+
+BATCH_SYSTEM_PROMPT = SENTIMENT_GUIDELINES + """
+    <배치처리>
+    - 여러 개의 리뷰가 <review id="..."> 태그로 구분되어 한 번에 주어집니다
+    - 각 리뷰는 서로 독립적으로 분석해주세요 (다른 리뷰의 내용이 판단에 영향을 주면 안 됩니다)
+    - 주어진 모든 id에 대해 정확히 하나의 결과를 반환해주세요
+    </배치처리>
+
+    <출력형식>
+    결과를 JSON 배열 형식으로 반환해주세요. 답변에 백틱이나 코드 블록 포맷(```json, ```python 등)을 붙이지 마세요. :
+    [
+        {
+        "id": 0,
+        "sentiment": "positive|negative|neutral",
+        "score": 0.8,
+        "confidence": 0.9,
+        "reason": "분석 근거"
+        }
+    ]
+    </출력형식>
+"""
+
+# 응답을 로컬에서 복구하지 못했을 때만 같은 Agent에 다시 묻는 프롬프트
+STRUCTURED_PROMPT = "방금 분석한 감정 분석 결과를 구조화된 형태로 추출하시오"
+
+
+class SentimentResult(BaseModel):
+    """감정 분석 결과"""
+
+    sentiment: Literal["positive", "negative", "neutral"] = Field(description="감정 분류")
+    score: float = Field(description="감정 점수 (-1.0 매우 부정 ~ 1.0 매우 긍정)")
+    confidence: float = Field(description="신뢰도 (0.0-1.0)")
+    reason: str = Field(default="", description="분석 근거")
+
+
+# 단건/배치 분석은 같은 분석 기준을 쓰므로 캐시를 공유합니다
+PROMPT_VERSION = prompt_version(SENTIMENT_GUIDELINES)
+
+# 배치 분석 기본값
+DEFAULT_BATCH_SIZE = 10
+DEFAULT_MAX_CONCURRENCY = 4
+
 # 감정 분석 Agent 생성
+@instrumented("sentiment")
 def analyze_sentiment(review_context:str) -> dict:
     """
     리뷰 텍스트의 감정을 분석하는 메인 함수(Strands Agent 사용)
@@ -52,20 +117,219 @@ def analyze_sentiment(review_context:str) -> dict:
     Args:
         review_context (str): 분석할 리뷰 텍스트
     Returns:
-        dict: 감정 분석 결과
+        dict: 감정 분석 결과 (모델을 쓸 수 없으면 success=False, degraded=True)
     """
-    sentiment_agent = Agent(
-        model="apac.anthropic.claude-3-haiku-20240307-v1:0",
-        system_prompt=SYSTEM_PROMPT
-    )
+    cache_key = _cache_key(review_context)
+    cached = lookup_result(cache_key)
+    if cached is not None:
+        return cached
 
-    #Strands Agent 호출
-    result = sentiment_agent(review_context)
-    str_result = str(result)
+    #Strands Agent 호출 (풀에서 재사용)
+    try:
+        with default_pool.checkout(MODEL_ID, SYSTEM_PROMPT) as sentiment_agent:
+            str_result = str(sentiment_agent(review_context))
+            # 코드 블록/설명 문장이 섞인 응답은 로컬에서 복구하고, 복구할 수 없을 때만 다시 묻습니다
+            sentiment, _ = resolve_structured(
+                sentiment_agent, str_result, SentimentResult, STRUCTURED_PROMPT, "sentiment"
+            )
+    except UNAVAILABLE_ERRORS as e:
+        return _degraded(e)
 
-    return {
+    return _finalize(cache_key, sentiment, str_result)
+
+
+@instrumented("sentiment")
+async def analyze_sentiment_async(
+    review_context: str, timeout: Optional[float] = DEFAULT_TIMEOUT
+) -> dict:
+    """
+    analyze_sentiment 의 비동기 버전 (Strands invoke_async 사용)
+
+    전역 동시 호출 세마포어 안에서 실행되며, 취소되거나 timeout을 넘기면
+    사용 중이던 Agent는 풀에 반환되지 않습니다.
+
+    Args:
+        review_context (str): 분석할 리뷰 텍스트
+        timeout (Optional[float]): 모델 호출 제한 시간(초), None이면 제한 없음
+    Returns:
+        dict: 감정 분석 결과 (모델을 쓸 수 없으면 success=False, degraded=True)
+    """
+    cache_key = _cache_key(review_context)
+    cached = lookup_result(cache_key)
+    if cached is not None:
+        return cached
+
+    async def invoke():
+        with default_pool.checkout(MODEL_ID, SYSTEM_PROMPT) as sentiment_agent:
+            str_result = str(await sentiment_agent.invoke_async(review_context))
+            sentiment, _ = await resolve_structured_async(
+                sentiment_agent, str_result, SentimentResult, STRUCTURED_PROMPT, "sentiment"
+            )
+            return sentiment, str_result
+
+    try:
+        sentiment, str_result = await run_limited(invoke, timeout)
+    except UNAVAILABLE_ERRORS as e:
+        return _degraded(e)
+    return _finalize(cache_key, sentiment, str_result)
+
+
+def _finalize(cache_key: str, sentiment: SentimentResult, str_result: str) -> Dict[str, Any]:
+    """검증된 결과를 반환 형식으로 만들고 캐시에 저장합니다."""
+    response = {
         "success": True,
-        "sentiment_result": json.loads(str_result),
+        "sentiment_result": sentiment.model_dump(),
         "raw_response": str_result,
     }
+    store_result(cache_key, response)
+    return response
+
+
+def _degraded(error: BaseException) -> Dict[str, Any]:
+    """
+    throttling/서킷 차단으로 모델을 호출할 수 없을 때의 결과
+
+    캐시된 결과는 모델 호출 전에 이미 반환되므로 여기서는 분석 실패로 표시만 하고 캐시에 저장하지 않습니다.
+    (서킷이 닫힌 뒤 다시 요청하면 정상 분석됩니다)
+    """
+    record_degraded("sentiment", error)
+    return {
+        "success": False,
+        "sentiment_result": {},
+        "raw_response": "",
+        "error": str(error),
+        "degraded": True,
+    }
+
+
+def analyze_sentiments(
+    reviews: Iterable[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> List[Dict[str, Any]]:
+    """
+    여러 리뷰를 배치로 묶어 감정을 분석하는 함수
+
+    batch_size 개의 리뷰를 id가 붙은 하나의 프롬프트로 묶어 호출하고,
+    배치들은 max_concurrency 개까지 동시에 실행합니다.
+    결과 JSON 파싱에 실패한 항목은 analyze_sentiment로 개별 재시도합니다.
+
+    Args:
+        reviews (Iterable[str]): 분석할 리뷰 텍스트 목록
+        batch_size (int): 한 번의 호출에 묶을 리뷰 수
+        max_concurrency (int): 동시에 실행할 배치 수
+
+    Returns:
+        List[Dict[str, Any]]: 입력 순서와 동일한 순서의 감정 분석 결과 목록
+            (각 항목은 analyze_sentiment 반환값과 같은 형식)
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size는 1 이상이어야 합니다.")
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency는 1 이상이어야 합니다.")
+
+    review_list = list(reviews)
+    results: List[Optional[Dict[str, Any]]] = [
+        lookup_result(_cache_key(review)) for review in review_list
+    ]
+    # 캐시에 없는 항목만 배치로 묶어 호출
+    pending = [i for i, cached in enumerate(results) if cached is None]
+    batches = [
+        pending[start : start + batch_size]
+        for start in range(0, len(pending), batch_size)
+    ]
+
+    def run_batch(indices: List[int]) -> None:
+        batch_items = _analyze_batch([(i, review_list[i]) for i in indices])
+        for i in indices:
+            if i in batch_items:
+                results[i] = batch_items[i]
+                store_result(_cache_key(review_list[i]), batch_items[i])
+            else:
+                # 배치 응답에서 누락되었거나 파싱에 실패한 항목은 개별 재시도
+                results[i] = _analyze_single_safely(review_list[i])
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        # list()로 소비하여 배치 내부 예외를 호출자에게 전파
+        list(executor.map(run_batch, batches))
+
+    return results
+
+
+def _cache_key(review_context: str) -> str:
+    """감정 분석 결과 캐시 키"""
+    return make_cache_key(
+        "sentiment", review_context, model_id=MODEL_ID, prompt_version=PROMPT_VERSION
+    )
+
+
+@instrumented("sentiment_batch")
+def _analyze_batch(items: List[Tuple[int, str]]) -> Dict[int, Dict[str, Any]]:
+    """
+    (id, 리뷰) 목록을 하나의 프롬프트로 묶어 분석하고 파싱에 성공한 항목만 반환합니다.
+    """
+    prompt = "\n".join(
+        f'<review id="{review_id}">{review_text}</review>'
+        for review_id, review_text in items
+    )
+
+    try:
+        with default_pool.checkout(MODEL_ID, BATCH_SYSTEM_PROMPT) as batch_agent:
+            str_result = str(batch_agent(prompt))
+    except Exception as e:
+        logging.warning("배치 감정 분석 호출 실패, 개별 재시도합니다: %s", e)
+        return {}
+
+    expected_ids = {review_id for review_id, _ in items}
+    parsed: Dict[int, Dict[str, Any]] = {}
+    for item in _parse_batch_items(str_result):
+        review_id = item.pop("id", None)
+        if isinstance(review_id, str) and review_id.isdigit():
+            review_id = int(review_id)
+        if review_id not in expected_ids:
+            continue
+        try:
+            sentiment = SentimentResult.model_validate(item)
+        except ValidationError:
+            continue
+        parsed[review_id] = {
+            "success": True,
+            "sentiment_result": sentiment.model_dump(),
+            "raw_response": json.dumps(item, ensure_ascii=False),
+        }
+    return parsed
+
+
+def _parse_batch_items(str_result: str) -> List[Dict[str, Any]]:
+    """
+    배치 응답에서 JSON 객체 목록을 추출합니다.
+
+    전체 배열 파싱에 실패하면 응답에서 개별 JSON 객체를 하나씩 찾아 복구합니다.
+    """
+    items: List[Dict[str, Any]] = []
+    for candidate in iter_json_candidates(str_result):
+        try:
+            value = load_json_value(candidate)
+        except ValueError:
+            if candidate.startswith("["):
+                # 배열 안의 한 항목이 깨졌으면 나머지 항목만이라도 살립니다
+                items.extend(_parse_batch_items(candidate[1:-1]))
+            continue
+        if isinstance(value, dict):
+            items.append(value)
+        elif isinstance(value, list):
+            items.extend(item for item in value if isinstance(item, dict))
+    return items
+
 
+def _analyze_single_safely(review_context: str) -> Dict[str, Any]:
+    """개별 재시도용 analyze_sentiment 래퍼 (실패 시 오류 결과 반환)"""
+    try:
+        return analyze_sentiment(review_context)
+    except Exception as e:
+        return {
+            "success": False,
+            "sentiment_result": {},
+            "raw_response": "",
+            "error": str(e),
+        }
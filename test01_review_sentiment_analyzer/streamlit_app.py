@@ -1,6 +1,21 @@
+import os
+import sys
+import time
 from datetime import datetime
 import streamlit as st
+
+# 공통 모듈(review_common) import를 위해 저장소 루트를 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from sentiment_analyzer.agent import analyze_sentiment
+from review_common.jobs import POLL_INTERVAL, BulkRun, default_job_queue
+from review_common.metrics import start_metrics_server
+from review_common.review_store import DEFAULT_PAGE_SIZE, default_review_store
+from review_common.tracing import setup_tracing
+
+# METRICS_PORT 가 설정되어 있으면 /metrics 엔드포인트를, TRACE_EXPORTER 가 설정되어 있으면 트레이스 내보내기를 켭니다 (프로세스당 한 번)
+start_metrics_server()
+setup_tracing()
 
 st.set_page_config(page_title="Review Sentiment Analyzer", layout="wide")
 st.markdown(
@@ -90,54 +105,65 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-if "comments" not in st.session_state:
-    st.session_state.comments = [
-        {
-            "id": 1,
-            "author": "김민수",
-            "rating": 5,
-            "content": "이어폰 디자인이 깔끔하고 착용감도 편해요. 음질은 가격대비 그냥저냥 괜찮은 것 같아요. 아침에 운동할 때 써봤는데 떨어지지도 않고 좋네요!",
-            "timestamp": "2024-01-15 14:30",
-        },
-        {
-            "id": 2,
-            "author": "이영희",
-            "rating": 5,
-            "content": "제품 정말 좋아요! 음질도 훌륭하고 배터리도 오래 갑니다.",
-            "timestamp": "2024-01-14 10:20",
-        },
-        {
-            "id": 3,
-            "author": "박철수",
-            "rating": 3,
-            "content": "쏘쏘. 배송은 빨라서 좋았던듯",
-            "timestamp": "2024-01-13 16:45",
-        },
-        {
-            "id": 4,
-            "author": "최지훈",
-            "rating": 1,
-            "content": "진짜 대~~~~~박 입니다!^^ 돈을 땅에 버리고 싶은 사람이라면 꼭 사시길",
-            "timestamp": "2024-01-12 09:15",
-        },
-        {
-            "id": 5,
-            "author": "정수연",
-            "rating": 3,
-            "content": "생각보다 별로예요. 가성비 좋다고해서 기대했는데... 이 가격이면 다른거 사세요",
-            "timestamp": "2024-01-11 16:22",
-        },
-    ]
-# 
+# 리뷰 저장소의 상품 id (예시 리뷰는 상품에 리뷰가 하나도 없을 때만 저장)
+PRODUCT_ID = "lab01-premium-earphone"
+SEED_REVIEWS = [
+    {
+        "author": "김민수",
+        "rating": 5,
+        "content": "이어폰 디자인이 깔끔하고 착용감도 편해요. 음질은 가격대비 그냥저냥 괜찮은 것 같아요. 아침에 운동할 때 써봤는데 떨어지지도 않고 좋네요!",
+        "timestamp": "2024-01-15 14:30",
+    },
+    {
+        "author": "이영희",
+        "rating": 5,
+        "content": "제품 정말 좋아요! 음질도 훌륭하고 배터리도 오래 갑니다.",
+        "timestamp": "2024-01-14 10:20",
+    },
+    {
+        "author": "박철수",
+        "rating": 3,
+        "content": "쏘쏘. 배송은 빨라서 좋았던듯",
+        "timestamp": "2024-01-13 16:45",
+    },
+    {
+        "author": "최지훈",
+        "rating": 1,
+        "content": "진짜 대~~~~~박 입니다!^^ 돈을 땅에 버리고 싶은 사람이라면 꼭 사시길",
+        "timestamp": "2024-01-12 09:15",
+    },
+    {
+        "author": "정수연",
+        "rating": 3,
+        "content": "생각보다 별로예요. 가성비 좋다고해서 기대했는데... 이 가격이면 다른거 사세요",
+        "timestamp": "2024-01-11 16:22",
+    },
+]
+
+if "reviews_seeded" not in st.session_state:
+    default_review_store.seed_reviews(PRODUCT_ID, SEED_REVIEWS)
+    st.session_state.reviews_seeded = True
+
+# 현재 페이지 (0부터)
+if "review_page" not in st.session_state:
+    st.session_state.review_page = 0
+
+
+#감정 분석 결과 (현재 페이지의 결과를 저장소에서 읽어 둠)
+if "sentiment_analysis_results" not in st.session_state:
+    st.session_state.sentiment_analysis_results = {}
 
+# 백그라운드에서 분석 중인 작업 (comment id -> 작업 id)
+if "sentiment_jobs" not in st.session_state:
+    st.session_state.sentiment_jobs = {}
 
-#감정 분석 결과 저장용 session state
-if "save_sentiment_results" not in st.session_state:
-    st.session_state.sentiment_analysis_results = {}
+# "전체 분석" 진행 상황 (BulkRun)
+if "sentiment_bulk" not in st.session_state:
+    st.session_state.sentiment_bulk = None
 
 # 감정 분석 결과 저장 헬퍼 함수
 def save_sentiment_result(comment_id, content, sentiment_result):
-    """감정 분석 결과를 세션 상태에 저장"""
+    """감정 분석 결과를 저장소와 세션 상태에 저장"""
     sentiment_data = sentiment_result["sentiment_result"]
 
     result_dict = {
@@ -155,10 +181,73 @@ def save_sentiment_result(comment_id, content, sentiment_result):
         result_dict["rationale"] = "분석 오류"
         result_dict["error"] = sentiment_result.get("error", "")
 
+    default_review_store.save_result(comment_id, "sentiment", result_dict)
     st.session_state.sentiment_analysis_results[comment_id] = result_dict
     return sentiment_result["success"]
 
 
+def collect_sentiment_jobs():
+    """끝난 백그라운드 분석 작업의 결과를 세션 상태에 반영"""
+    bulk = st.session_state.sentiment_bulk
+    finished = default_job_queue.collect_pending(st.session_state.sentiment_jobs)
+    for comment_id, job in finished.items():
+        review = default_review_store.get_review(comment_id)
+        if review is None:
+            continue  # 분석 중 삭제된 리뷰
+        content = review["content"]
+        if job.status == "done":
+            sentiment_result = job.result
+        else:
+            sentiment_result = {"success": False, "sentiment_result": {}, "error": job.error}
+        if not save_sentiment_result(comment_id, content, sentiment_result) and bulk:
+            bulk.record_error(comment_id, sentiment_result.get("error") or "분석 오류")
+
+
+def needs_sentiment_analysis(comment):
+    """저장된 분석 결과가 없거나, 실패했거나, 분석 후 리뷰 내용이 바뀐 경우"""
+    result = st.session_state.sentiment_analysis_results.get(comment["id"])
+    return (
+        result is None
+        or bool(result.get("error"))
+        or result.get("review_text") != comment["content"]
+    )
+
+
+def submit_sentiment_job(comment_id):
+    """댓글 감정 분석을 백그라운드 작업으로 제출하고 작업 id를 반환"""
+    comment = default_review_store.get_review(comment_id)
+    return default_job_queue.submit(analyze_sentiment, comment["content"])
+
+
+def render_bulk_analysis(comments):
+    """현재 페이지의 미분석 댓글 전체 분석 버튼과 진행 상황"""
+    jobs = st.session_state.sentiment_jobs
+    bulk = st.session_state.sentiment_bulk
+    if bulk:
+        bulk.dispatch(jobs, submit_sentiment_job)
+
+    targets = [
+        c["id"]
+        for c in comments
+        if needs_sentiment_analysis(c) and c["id"] not in jobs
+    ]
+    running = bulk is not None and bulk.completed(jobs) < len(bulk.item_ids)
+    if st.button(
+        f"⚡ 미분석 댓글 전체 분석 ({len(targets)}건)",
+        type="primary",
+        disabled=running or not targets,
+    ):
+        st.session_state.sentiment_bulk = BulkRun(targets)
+        st.rerun()
+
+    if bulk:
+        done, total = bulk.completed(jobs), len(bulk.item_ids)
+        label = "전체 분석 완료" if done == total else "전체 분석 중..."
+        st.progress(done / total, text=f"{label} {done}/{total}")
+        for comment_id, error in bulk.errors.items():
+            st.error(f"댓글 #{comment_id} 분석 실패: {error}")
+
+
 # 별점 HTML 생성 함수
 def generate_stars_html(rating):
     """별점 HTML을 생성"""
@@ -187,9 +276,8 @@ st.header("🛍️ Lab 01. 리뷰 감정 분석 시스템")
 st.subheader("한국어 리뷰의 감정 분석 시스템 실습")
 st.markdown("---")
 
-total_reviews = len(st.session_state.comments)
-total_rating = sum([comment["rating"] for comment in st.session_state.comments])
-average_rating = total_rating / total_reviews if total_reviews else 0
+# 리뷰 수/평균 평점은 DB에서 집계 (전체 리뷰를 메모리로 읽지 않음)
+total_reviews, average_rating = default_review_store.rating_summary(PRODUCT_ID)
 
 st.subheader("📦 상품 정보")
 # <h3 style="color:black">📦 상품 정보</h3>
@@ -217,7 +305,21 @@ st.markdown(
 
 st.subheader("💬 댓글 목록")
 
-for comment in reversed(st.session_state.comments):
+collect_sentiment_jobs()
+
+# 현재 페이지의 리뷰와 분석 결과만 조회 (최신 리뷰부터)
+page_count = max(1, -(-total_reviews // DEFAULT_PAGE_SIZE))
+st.session_state.review_page = min(st.session_state.review_page, page_count - 1)
+comments = default_review_store.list_reviews(
+    PRODUCT_ID, limit=DEFAULT_PAGE_SIZE, offset=st.session_state.review_page * DEFAULT_PAGE_SIZE
+)
+st.session_state.sentiment_analysis_results = default_review_store.get_results(
+    [c["id"] for c in comments], "sentiment"
+)
+
+render_bulk_analysis(comments)
+
+for comment in comments:
     with st.container():
         col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
 
@@ -234,10 +336,14 @@ for comment in reversed(st.session_state.comments):
             st.caption(comment["timestamp"])
 
         with col4:
-            # 이미 분석된 리뷰인지 확인
-            is_analyzed = comment["id"] in st.session_state.sentiment_analysis_results
-            button_text = "✅ 분석완료" if is_analyzed else "😍 감정분석"
-            button_disabled = is_analyzed
+            # 이미 분석된 리뷰인지 / 분석 중인지 확인
+            is_analyzed = not needs_sentiment_analysis(comment)
+            is_running = comment["id"] in st.session_state.sentiment_jobs
+            if is_running:
+                button_text = "⏳ 분석 중..."
+            else:
+                button_text = "✅ 분석완료" if is_analyzed else "😍 감정분석"
+            button_disabled = is_analyzed or is_running
 
             if st.button(
                 button_text,
@@ -246,23 +352,11 @@ for comment in reversed(st.session_state.comments):
                 use_container_width=True,
                 disabled=button_disabled,
             ):
-                with st.spinner("감정 분석 중..."):
-                    try:
-                        sentiment_result = analyze_sentiment(comment["content"])
-                        success = save_sentiment_result(
-                            comment["id"], comment["content"], sentiment_result
-                        )
-
-                        if success:
-                            st.success("✅ 분석 완료!")
-                        else:
-                            st.warning(
-                                "⚠️ 분석 중 오류가 발생했지만 폴백 결과를 저장했습니다."
-                            )
-                        st.rerun()
-
-                    except Exception as e:
-                        st.error(f"감정 분석 중 오류가 발생했습니다: {str(e)}")
+                # 분석은 백그라운드 작업으로 실행하고, 결과는 다음 화면 갱신 때 반영합니다
+                st.session_state.sentiment_jobs[comment["id"]] = default_job_queue.submit(
+                    analyze_sentiment, comment["content"]
+                )
+                st.rerun()
 
         # 감정 분석 결과가 있으면 펼치기/접기 메뉴 표시
         if comment["id"] in st.session_state.sentiment_analysis_results:
@@ -319,6 +413,23 @@ for comment in reversed(st.session_state.comments):
 
         st.markdown("---")
 
+# 페이지 이동
+col_prev, col_page, col_next = st.columns([1, 2, 1])
+with col_prev:
+    if st.button("◀ 이전", disabled=st.session_state.review_page == 0, use_container_width=True):
+        st.session_state.review_page -= 1
+        st.rerun()
+with col_page:
+    st.caption(f"{st.session_state.review_page + 1} / {page_count} 페이지")
+with col_next:
+    if st.button(
+        "다음 ▶",
+        disabled=st.session_state.review_page >= page_count - 1,
+        use_container_width=True,
+    ):
+        st.session_state.review_page += 1
+        st.rerun()
+
 st.markdown("---")
 
 st.subheader("✍️ 새 댓글 작성")
@@ -341,17 +452,18 @@ with st.form("comment_form"):
 
     if submitted:
         if author_name and comment_content:
-            new_comment = {
-                "id": len(st.session_state.comments) + 1,
-                "author": author_name,
-                "rating": rating,
-                "content": comment_content,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M"),
-            }
-            st.session_state.comments.append(new_comment)
+            default_review_store.add_review(
+                PRODUCT_ID, author=author_name, rating=rating, content=comment_content
+            )
+            st.session_state.review_page = 0
             st.success("댓글이 등록되었습니다!")
             st.rerun()
         else:
             st.error("작성자명과 댓글 내용을 모두 입력해주세요.")
 
 st.markdown("---")
+
+# 분석 중인 작업이 있으면 잠시 후 다시 그려 결과를 반영합니다
+if st.session_state.sentiment_jobs:
+    time.sleep(POLL_INTERVAL)
+    st.rerun()
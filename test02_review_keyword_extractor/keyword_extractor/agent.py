@@ -2,11 +2,31 @@ import json
 import logging
 from dataclasses import dataclass
 from string import Template
-from typing import List, Literal
+from typing import List, Literal, Optional, Tuple
 
 from pydantic import BaseModel, Field
-from strands import Agent
-from strands_tools import file_read
+from pydantic.json_schema import SkipJsonSchema
+
+from review_common.agent_pool import default_pool
+from review_common.concurrency import DEFAULT_TIMEOUT, run_limited
+from review_common.metrics import instrumented
+from review_common.resilience import UNAVAILABLE_ERRORS, record_degraded
+from review_common.response_parser import (
+    DEFAULT_STRUCTURED_MODE,
+    StructuredMode,
+    invoke_structured,
+    invoke_structured_async,
+)
+from review_common.result_cache import (
+    lookup_result,
+    make_cache_key,
+    prompt_version,
+    store_result,
+)
+
+from .highlight import locate_phrase
+from .matcher import KeywordMatcher
+from .registry import default_registry
 
 # Configure the root strands logger
 logging.getLogger("strands").setLevel(logging.INFO)
@@ -17,6 +37,8 @@ logging.basicConfig(
 )
 
 
+MODEL_ID = "apac.anthropic.claude-3-haiku-20240307-v1:0"
+
 SYSTEM_PROMPT = """
 당신은 키워드 기반 리뷰 분석 전문가입니다.
 
@@ -26,12 +48,13 @@ SYSTEM_PROMPT = """
 </핵심작업>
 
 <작업프로세스>
-1. 등록된 키워드 조회: file_read 도구를 사용하여 "lab02_review_keyword_extractor/registered_keywords.txt" 파일을 읽고 등록된 키워드 목록을 획득해주세요
+1. 등록된 키워드 확인: 사용자 메시지의 <등록키워드> 태그에 주어진 키워드 목록만 매칭 대상으로 사용해주세요
 2. 리뷰 텍스트 분석: 등록된 키워드를 참고하여 리뷰에서 관련 키워드와 구문을 식별해주세요
 3. 매칭 수행:
    - 완전 일치를 우선해주세요
    - 부분 일치 및 유사어를 고려해주세요
    - 의미론적 유사어를 고려해주세요
+   - 키워드에 함께 주어진 동의어가 리뷰에 나오면 해당 키워드(동의어가 아닌 등록 키워드)로 매칭해주세요
 </작업프로세스>
 
 <출력형식>
@@ -59,6 +82,7 @@ SYSTEM_PROMPT = """
 KEYWORD_EXTRACTOR_PROMPT_TEMPLATE = Template(
     """
 아래 리뷰에서 등록된 키워드와 매칭되는 내용을 찾아주세요.
+<등록키워드>$registered_keywords</등록키워드>
 <리뷰>
     $review_text
 </리뷰>
@@ -66,12 +90,41 @@ KEYWORD_EXTRACTOR_PROMPT_TEMPLATE = Template(
 )
 
 
+SEMANTIC_ONLY_PROMPT_TEMPLATE = Template(
+    """
+아래 리뷰에서 등록된 키워드와 매칭되는 내용을 찾아주세요.
+다음 키워드는 이미 찾았으므로 제외하고, 나머지 등록 키워드에 대한 의미론적 유사어(semantic) 매칭만 찾아주세요: $found_keywords
+<등록키워드>$registered_keywords</등록키워드>
+<리뷰>
+    $review_text
+</리뷰>
+"""
+)
+
+STRUCTURED_PROMPT = "키워드 분석 결과를 구조화된 형태로 추출하시오"
+
+PROMPT_VERSION = prompt_version(
+    SYSTEM_PROMPT,
+    KEYWORD_EXTRACTOR_PROMPT_TEMPLATE.template,
+    SEMANTIC_ONLY_PROMPT_TEMPLATE.template,
+)
+
+# LLM 호출 정책
+# - auto: 로컬 매처가 아무것도 찾지 못한 경우에만 LLM 호출 (semantic 매칭 위임)
+# - always: 로컬 매칭 결과에 더해, 남은 키워드의 semantic 매칭을 LLM으로 찾음
+# - never: 로컬 매칭만 사용
+SemanticMode = Literal["auto", "always", "never"]
+
+
 class KeywordHighlight(BaseModel):
     """키워드별 매칭되는 문장리스트 데이터셋"""
 
     keyword: str = Field(description="기준 키워드")
     match_type: Literal["exact", "partial", "semantic"]
     original_phrase: str = Field(description="리뷰에서 발견된 원본 구문")
+    # 원문 내 original_phrase 위치 (LLM 출력 스키마에는 포함하지 않음, 찾지 못하면 None)
+    start: SkipJsonSchema[Optional[int]] = None
+    end: SkipJsonSchema[Optional[int]] = None
 
 
 class KeywordAnalysisResult(BaseModel):
@@ -80,28 +133,223 @@ class KeywordAnalysisResult(BaseModel):
     matched_keywords: List[KeywordHighlight]
 
 
-def search_keywords(review_text: str) -> dict:
-    # 키워드 매칭 Agent
-    keyword_agent = Agent(
-        model="apac.anthropic.claude-3-haiku-20240307-v1:0",
-        tools=[file_read],
-        system_prompt=SYSTEM_PROMPT,
-    )
+@instrumented("keywords")
+def search_keywords(
+    review_text: str,
+    semantic: SemanticMode = "auto",
+    structured_mode: StructuredMode = DEFAULT_STRUCTURED_MODE,
+) -> dict:
+    """
+    리뷰 텍스트에서 등록 키워드와 매칭되는 구문을 찾는 메인 함수
+
+    exact/partial 매칭은 로컬 매처로 먼저 찾고, semantic 정책에 따라 필요한 경우에만 LLM을 호출합니다.
+
+    Args:
+        review_text (str): 분석할 리뷰 텍스트
+        semantic (SemanticMode): LLM 호출 정책 (auto, always, never)
+        structured_mode (StructuredMode): 구조화 출력 방식 (single: 한 번의 호출, two_pass: 기존 2회 호출)
+
+    Returns:
+        dict: 키워드 매칭 결과 (model_calls: 이번 호출에 사용된 모델 호출 수,
+            matched_keywords의 start/end: original_phrase의 원문 내 문자 위치,
+            degraded: 모델을 쓸 수 없어 로컬 매칭 결과만 반환한 경우 True)
+    """
+    cache_key, cached, local_highlights, prompt = _prepare(review_text, semantic)
+    if cached is not None:
+        return cached
+    if prompt is None:
+        return _finalize(review_text, cache_key, local_highlights)
+
+    # 키워드 매칭 Agent (풀에서 재사용)
+    try:
+        with default_pool.checkout(MODEL_ID, SYSTEM_PROMPT) as keyword_agent:
+            # Agent 실행 및 구조화 (single 모드에서는 검증 실패 시에만 structured_output 추가 호출)
+            result, str_response, model_calls = invoke_structured(
+                keyword_agent,
+                prompt,
+                KeywordAnalysisResult,
+                STRUCTURED_PROMPT,
+                mode=structured_mode,
+                label="keywords",
+            )
+    except UNAVAILABLE_ERRORS as e:
+        return _degraded(local_highlights, e)
+
+    return _finalize(review_text, cache_key, local_highlights, result, str_response, model_calls)
+
+
+@instrumented("keywords")
+async def search_keywords_async(
+    review_text: str,
+    semantic: SemanticMode = "auto",
+    structured_mode: StructuredMode = DEFAULT_STRUCTURED_MODE,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+) -> dict:
+    """
+    search_keywords 의 비동기 버전
+
+    로컬 매칭만으로 끝나는 경우에는 모델을 호출하지 않고, LLM 호출은 전역 동시 호출
+    세마포어 안에서 timeout(초) 제한을 받아 실행됩니다.
+    """
+    cache_key, cached, local_highlights, prompt = _prepare(review_text, semantic)
+    if cached is not None:
+        return cached
+    if prompt is None:
+        return _finalize(review_text, cache_key, local_highlights)
+
+    async def invoke():
+        with default_pool.checkout(MODEL_ID, SYSTEM_PROMPT) as keyword_agent:
+            return await invoke_structured_async(
+                keyword_agent,
+                prompt,
+                KeywordAnalysisResult,
+                STRUCTURED_PROMPT,
+                mode=structured_mode,
+                label="keywords",
+            )
+
+    try:
+        result, str_response, model_calls = await run_limited(invoke, timeout)
+    except UNAVAILABLE_ERRORS as e:
+        return _degraded(local_highlights, e)
+    return _finalize(review_text, cache_key, local_highlights, result, str_response, model_calls)
+
 
-    # Agent 실행
-    prompt = KEYWORD_EXTRACTOR_PROMPT_TEMPLATE.substitute(review_text=review_text)
-    agent_response = keyword_agent(prompt)
-    str_response = str(agent_response)
+def _prepare(
+    review_text: str, semantic: SemanticMode
+) -> Tuple[str, Optional[dict], List[KeywordHighlight], Optional[str]]:
+    """
+    캐시 조회와 로컬 매칭을 수행합니다.
 
-    # Structured output 으로 출력
-    result = keyword_agent.structured_output(
-        KeywordAnalysisResult, "키워드 분석 결과를 구조화된 형태로 추출하시오"
+    Returns:
+        Tuple: (캐시 키, 캐시된 결과, 로컬 매칭 결과, LLM 프롬프트 - LLM 호출이 필요 없으면 None)
+    """
+    cache_key = make_cache_key(
+        "keywords",
+        review_text,
+        model_id=MODEL_ID,
+        prompt_version=PROMPT_VERSION,
+        # 등록 키워드가 바뀌면 결과도 달라지므로 키에 포함
+        extra={
+            "registered_keywords": default_registry.version,
+            "semantic": semantic,
+            "local_semantic": default_registry.semantic_matcher_name,
+        },
     )
+    cached = lookup_result(cache_key)
+    if cached is not None:
+        return cache_key, cached, [], None
 
-    return {
+    local_highlights = [
+        KeywordHighlight(
+            keyword=match.keyword,
+            match_type=match.match_type,
+            original_phrase=match.original_phrase,
+            start=match.start,
+            end=match.end,
+        )
+        for match in default_registry.matcher().find(review_text)
+    ]
+
+    # 로컬 의미 매처가 켜져 있으면 남은 키워드의 semantic 매칭도 모델 호출 없이 찾습니다
+    semantic_matcher = default_registry.semantic_matcher()
+    if semantic_matcher is not None and semantic != "never":
+        local_highlights += [
+            KeywordHighlight(
+                keyword=match.keyword,
+                match_type=match.match_type,
+                original_phrase=match.original_phrase,
+                start=match.start,
+                end=match.end,
+            )
+            for match in semantic_matcher.find(
+                review_text, exclude=[h.keyword for h in local_highlights]
+            )
+        ]
+
+    needs_llm = semantic == "always" or (semantic == "auto" and not local_highlights)
+    if not needs_llm:
+        return cache_key, None, local_highlights, None
+
+    # 등록 키워드 전체가 아니라 리뷰와 관련 있는 후보만 프롬프트에 넣어 등록 키워드 수와 관계없이 프롬프트 크기를 일정하게 유지합니다
+    found = {h.keyword for h in local_highlights}
+    candidates = [
+        entry for entry in default_registry.candidates(review_text) if entry.keyword not in found
+    ]
+    if not candidates:
+        return cache_key, None, local_highlights, None
+    registered_keywords = "\n" + "\n".join(entry.prompt_line() for entry in candidates) + "\n"
+    if local_highlights:
+        prompt = SEMANTIC_ONLY_PROMPT_TEMPLATE.substitute(
+            review_text=review_text,
+            found_keywords=", ".join(h.keyword for h in local_highlights),
+            registered_keywords=registered_keywords,
+        )
+    else:
+        prompt = KEYWORD_EXTRACTOR_PROMPT_TEMPLATE.substitute(
+            review_text=review_text, registered_keywords=registered_keywords
+        )
+    return cache_key, None, local_highlights, prompt
+
+
+def _finalize(
+    review_text: str,
+    cache_key: str,
+    local_highlights: List[KeywordHighlight],
+    result: Optional[KeywordAnalysisResult] = None,
+    str_response: str = "",
+    model_calls: int = 0,
+) -> dict:
+    """로컬 결과와 LLM 결과를 합쳐 캐시에 저장하고 반환합니다."""
+    # 로컬에서 이미 찾은 키워드는 로컬 결과(위치 정보 포함)를 우선합니다
+    local_keywords = {h.keyword for h in local_highlights}
+    llm_highlights = [
+        _with_offsets(review_text, highlight)
+        for highlight in (result.matched_keywords if result else [])
+        if highlight.keyword not in local_keywords
+    ]
+
+    response = {
         "success": True,
-        "analysis_result": (
-            result.model_dump() if hasattr(result, "model_dump") else result.__dict__
-        ),
+        "analysis_result": KeywordAnalysisResult(
+            matched_keywords=local_highlights + llm_highlights
+        ).model_dump(),
         "raw_response": str_response,
+        "model_calls": model_calls,
     }
+    store_result(cache_key, response)
+    return response
+
+
+def _degraded(local_highlights: List[KeywordHighlight], error: BaseException) -> dict:
+    """
+    throttling/서킷 차단으로 모델을 호출할 수 없을 때 로컬 매칭 결과만 반환합니다.
+
+    semantic 매칭이 빠진 결과이므로 캐시에 저장하지 않습니다.
+    """
+    record_degraded("keywords", error)
+    return {
+        "success": True,
+        "analysis_result": KeywordAnalysisResult(matched_keywords=local_highlights).model_dump(),
+        "raw_response": "",
+        "model_calls": 0,
+        "degraded": True,
+        "error": str(error),
+    }
+
+
+def _with_offsets(review_text: str, highlight: KeywordHighlight) -> KeywordHighlight:
+    """LLM이 돌려준 original_phrase의 원문 위치를 채웁니다. (원문에 없는 구문이면 None)"""
+    span = locate_phrase(review_text, highlight.original_phrase)
+    start, end = span if span else (None, None)
+    return highlight.model_copy(update={"start": start, "end": end})
+
+
+def load_registered_keywords() -> List[str]:
+    """등록 키워드 목록 (레지스트리에서 조회)"""
+    return default_registry.keywords()
+
+
+def get_keyword_matcher() -> KeywordMatcher:
+    """등록 키워드로 만든 로컬 매처 (키워드가 바뀌면 다시 만듭니다)"""
+    return default_registry.matcher()
@@ -0,0 +1,72 @@
+import html
+from typing import Iterable, List, Optional, Tuple
+
+# 하이라이트 <mark> 태그 스타일
+MARK_STYLE = (
+    "background: linear-gradient(135deg, #fff3cd 0%, #ffeaa7 100%); color: #856404; "
+    "padding: 3px 8px; border-radius: 8px; font-weight: 500; "
+    "box-shadow: 0 2px 6px rgba(255, 235, 59, 0.3); border: 1px solid #ffeaa7;"
+)
+
+
+def locate_phrase(text: str, phrase: str, start: int = 0) -> Optional[Tuple[int, int]]:
+    """
+    원문에서 구문의 위치(시작, 끝)를 찾습니다.
+
+    LLM이 돌려준 구문은 원문과 공백/줄바꿈이 조금 다를 수 있으므로,
+    그대로 찾지 못하면 공백을 무시하고 다시 찾습니다.
+
+    Args:
+        text (str): 리뷰 원문
+        phrase (str): 찾을 구문
+        start (int): 탐색 시작 위치
+
+    Returns:
+        Optional[Tuple[int, int]]: 원문 기준 (시작, 끝) - 찾지 못하면 None
+    """
+    phrase = phrase.strip()
+    if not phrase:
+        return None
+    index = text.find(phrase, start)
+    if index >= 0:
+        return index, index + len(phrase)
+
+    # 공백을 뺀 문자열에서 찾은 뒤 원문 위치로 되돌립니다
+    positions = [i for i in range(start, len(text)) if not text[i].isspace()]
+    compact_text = "".join(text[i] for i in positions)
+    compact_phrase = "".join(phrase.split())
+    index = compact_text.find(compact_phrase)
+    if index < 0:
+        return None
+    return positions[index], positions[index + len(compact_phrase) - 1] + 1
+
+
+def merge_spans(spans: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """겹치거나 맞닿은 구간을 합칩니다. (시작 위치 순으로 정렬된 결과)"""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(span for span in spans if span[0] < span[1]):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def render_highlights(text: str, spans: Iterable[Tuple[int, int]], style: str = MARK_STYLE) -> str:
+    """
+    원문의 지정 구간을 <mark>로 감싼 HTML을 만듭니다.
+
+    구간을 합친 뒤 원문을 한 번만 훑으므로 구문 수와 관계없이 원문 길이에 비례하는 시간에 끝나고,
+    원문은 escape 하므로 구간이 겹치거나 리뷰에 HTML이 들어 있어도 결과가 깨지지 않습니다.
+    """
+    parts: List[str] = []
+    cursor = 0
+    for start, end in merge_spans(spans):
+        start, end = max(start, cursor), min(end, len(text))
+        if start >= end:
+            continue
+        parts.append(html.escape(text[cursor:start]))
+        parts.append(f'<mark style="{style}">{html.escape(text[start:end])}</mark>')
+        cursor = end
+    parts.append(html.escape(text[cursor:]))
+    return "".join(parts)
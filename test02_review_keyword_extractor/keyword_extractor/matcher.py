@@ -0,0 +1,201 @@
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Literal, Optional, Tuple
+
+# 키워드 뒤에 붙어도 "완전 일치"로 보는 조사/서술격 조사 (긴 것부터 비교)
+PARTICLES = sorted(
+    [
+        "이", "가", "은", "는", "을", "를", "의", "에", "에서", "에게", "께", "한테",
+        "로", "으로", "와", "과", "도", "만", "까지", "부터", "보다", "처럼", "만큼",
+        "조차", "마저", "이나", "나", "이랑", "랑", "이든", "든", "이라도", "라도",
+        "요", "이요", "이다", "다", "입니다", "이에요", "예요", "이죠", "죠", "이고",
+        "고", "인데", "이라", "라", "이라서", "라서", "였", "이었", "였어요", "이었어요",
+    ],
+    key=len,
+    reverse=True,
+)
+
+# 용언 키워드(예: "깔끔하다")에서 어간을 만들 때 사용하는 "하다" 활용형
+HADA_STEMS = ("하", "해", "했", "한", "할")
+
+# 원본 구문을 나누는 기준 (문장/절 단위)
+PHRASE_DELIMITERS = re.compile(r"[.!?,;\n]")
+
+MatchType = Literal["exact", "partial", "semantic"]
+
+# 같은 키워드에 여러 매칭이 있을 때의 우선순위 (작을수록 우선)
+MATCH_RANK = {"exact": 0, "partial": 1, "semantic": 2}
+
+# 패턴 종류: 키워드 자체, 용언 어간, 등록된 동의어
+PatternKind = Literal["keyword", "stem", "synonym"]
+
+
+@dataclass
+class KeywordMatch:
+    """로컬 매처가 찾은 키워드 매칭 결과"""
+
+    keyword: str
+    match_type: MatchType
+    original_phrase: str
+    start: int
+    end: int
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum()
+
+
+def _is_particle_chain(rest: str) -> bool:
+    """rest가 조사(및 조사 조합)로만 이루어져 있는지 확인합니다. (예: "에서도", "이에요")"""
+    while rest:
+        for particle in PARTICLES:
+            if rest.startswith(particle):
+                rest = rest[len(particle):]
+                break
+        else:
+            return False
+    return True
+
+
+def _stems(keyword: str) -> List[str]:
+    """
+    용언 키워드의 어간 패턴을 만듭니다.
+
+    "깔끔하다" -> ["깔끔하", "깔끔해", "깔끔했", "깔끔한", "깔끔할"]
+    "편리하다" -> [...], "가볍다" -> ["가볍"] (어간이 두 글자 이상일 때만)
+    """
+    if not keyword.endswith("다") or len(keyword) < 3:
+        return []
+    stem = keyword[:-1]
+    if stem.endswith("하"):
+        return [stem[:-1] + ending for ending in HADA_STEMS]
+    return [stem] if len(stem) >= 2 else []
+
+
+class KeywordMatcher:
+    """
+    등록 키워드를 Aho–Corasick 오토마톤으로 한 번에 찾는 결정적 매처
+
+    - 키워드 단독 또는 키워드 + 조사 형태("화질이", "디자인에서도")는 exact
+    - 복합어 일부("고화질", "디자인적")나 활용형("깔끔해요")은 partial
+    - 등록된 동의어가 나타나면 semantic (예: 키워드 "화질"의 동의어 "해상도")
+    - 키워드마다 가장 좋은 매칭 하나(exact > partial > semantic, 먼저 나온 위치 우선)만 반환합니다
+    """
+
+    def __init__(
+        self,
+        keywords: Iterable[str],
+        synonyms: Optional[Dict[str, Iterable[str]]] = None,
+    ):
+        self.keywords: List[str] = []
+        # 상태별 전이, 실패 링크, 출력 (패턴 길이, 키워드, 패턴 종류)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, str, PatternKind]]] = [[]]
+
+        synonyms = synonyms or {}
+        for keyword in dict.fromkeys(k.strip() for k in keywords):
+            if not keyword:
+                continue
+            self.keywords.append(keyword)
+            self._add_pattern(keyword, keyword, "keyword")
+            for stem in _stems(keyword):
+                self._add_pattern(stem, keyword, "stem")
+            for synonym in synonyms.get(keyword, ()):
+                if synonym.strip() and synonym.strip() != keyword:
+                    self._add_pattern(synonym.strip(), keyword, "synonym")
+        self._build_failure_links()
+
+    def _add_pattern(self, pattern: str, keyword: str, kind: PatternKind) -> None:
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(pattern), keyword, kind))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def iter_hits(self, text: str) -> Iterable[Tuple[int, int, str, PatternKind]]:
+        """(시작, 끝, 키워드, 패턴 종류) 형태로 모든 패턴 출현 위치를 반환합니다."""
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, keyword, kind in self._output[state]:
+                yield index + 1 - length, index + 1, keyword, kind
+
+    def find(self, text: str) -> List[KeywordMatch]:
+        """
+        리뷰 텍스트에서 등록 키워드의 exact/partial/semantic(동의어) 매칭을 찾습니다.
+
+        Args:
+            text (str): 리뷰 텍스트
+
+        Returns:
+            List[KeywordMatch]: 키워드별 최적 매칭 (등록 순서)
+        """
+        best: Dict[str, KeywordMatch] = {}
+        for start, end, keyword, kind in self.iter_hits(text):
+            current = best.get(keyword)
+            if current is not None and current.match_type == "exact":
+                continue
+            if kind == "keyword":
+                match_type: MatchType = self._classify(text, start, end)
+            else:
+                match_type = "partial" if kind == "stem" else "semantic"
+            if current is not None and MATCH_RANK[match_type] >= MATCH_RANK[current.match_type]:
+                continue
+            phrase, phrase_start, phrase_end = _enclosing_phrase(text, start, end)
+            best[keyword] = KeywordMatch(
+                keyword=keyword,
+                match_type=match_type,
+                original_phrase=phrase,
+                start=phrase_start,
+                end=phrase_end,
+            )
+        return [best[k] for k in self.keywords if k in best]
+
+    @staticmethod
+    def _classify(text: str, start: int, end: int) -> Literal["exact", "partial"]:
+        """키워드 앞뒤 글자를 보고 exact/partial 을 판단합니다."""
+        if start > 0 and _is_word_char(text[start - 1]):
+            return "partial"
+        word_end = end
+        while word_end < len(text) and _is_word_char(text[word_end]):
+            word_end += 1
+        return "exact" if _is_particle_chain(text[end:word_end]) else "partial"
+
+
+def _enclosing_phrase(text: str, start: int, end: int) -> Tuple[str, int, int]:
+    """매칭 위치를 포함하는 문장/절과 그 시작/끝 위치를 반환합니다."""
+    phrase_start = 0
+    for delimiter in PHRASE_DELIMITERS.finditer(text, 0, start):
+        phrase_start = delimiter.end()
+    next_delimiter: Optional[re.Match] = PHRASE_DELIMITERS.search(text, end)
+    phrase_end = next_delimiter.start() if next_delimiter else len(text)
+
+    while phrase_start < start and text[phrase_start].isspace():
+        phrase_start += 1
+    while phrase_end > end and text[phrase_end - 1].isspace():
+        phrase_end -= 1
+    return text[phrase_start:phrase_end], phrase_start, phrase_end
@@ -0,0 +1,80 @@
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
+
+# 후보로 인정하는 최소 점수 (용어의 n-gram 중 리뷰에 나타난 비율)
+MIN_CANDIDATE_SCORE = 0.5
+
+
+def char_ngrams(text: str, n: int = 2) -> Set[str]:
+    """
+    공백으로 나눈 토큰별 문자 n-gram 집합 (n보다 짧은 토큰은 토큰 자체를 사용)
+
+    "배터리 수명" -> {"배터", "터리", "수명"}
+    """
+    grams: Set[str] = set()
+    for token in text.lower().split():
+        if len(token) < n:
+            grams.add(token)
+            continue
+        grams.update(token[i : i + n] for i in range(len(token) - n + 1))
+    return grams
+
+
+class NgramIndex:
+    """
+    용어(키워드/동의어)의 문자 n-gram 역색인
+
+    리뷰 텍스트의 n-gram과 겹치는 용어만 찾아 LLM에 넘길 후보 키워드를 고릅니다.
+    조회 비용은 등록 용어 수가 아니라 리뷰 길이와 겹치는 posting 크기에 비례합니다.
+    """
+
+    def __init__(self, terms: Iterable[Tuple[str, int]], n: int = 2):
+        """
+        Args:
+            terms (Iterable[Tuple[str, int]]): (용어, 키워드 번호) 목록 (동의어는 같은 키워드 번호를 사용)
+            n (int): n-gram 길이
+        """
+        self.n = n
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        self._term_owner: List[int] = []
+        self._term_size: List[int] = []
+        # n보다 짧은 용어(예: "맛")가 있으면 리뷰의 글자 단위 gram도 함께 조회합니다
+        self._has_short_terms = False
+        for term, owner in terms:
+            grams = char_ngrams(term, n)
+            if not grams:
+                continue
+            term_id = len(self._term_owner)
+            self._term_owner.append(owner)
+            self._term_size.append(len(grams))
+            self._has_short_terms |= any(len(gram) < n for gram in grams)
+            for gram in grams:
+                self._postings[gram].append(term_id)
+
+    def search(
+        self, text: str, limit: int, min_score: float = MIN_CANDIDATE_SCORE
+    ) -> List[Tuple[int, float]]:
+        """
+        리뷰 텍스트와 관련 있는 키워드 번호를 점수 순으로 반환합니다.
+
+        점수는 용어의 n-gram 중 리뷰에도 있는 비율이며, 키워드별로 가장 높은 용어 점수를 사용합니다.
+        (리뷰 n-gram은 어절 단위로 만들기 때문에 "배터리가" 같은 조사 결합형도 겹칩니다)
+
+        Returns:
+            List[Tuple[int, float]]: (키워드 번호, 점수) - 최대 limit 개
+        """
+        grams = char_ngrams(text, self.n)
+        if self._has_short_terms:
+            grams |= set(text.lower().replace(" ", ""))
+        hits: Counter = Counter()
+        for gram in grams:
+            for term_id in self._postings.get(gram, ()):
+                hits[term_id] += 1
+
+        best: Dict[int, float] = {}
+        for term_id, count in hits.items():
+            score = count / self._term_size[term_id]
+            owner = self._term_owner[term_id]
+            if score >= min_score and score > best.get(owner, 0.0):
+                best[owner] = score
+        return sorted(best.items(), key=lambda item: (-item[1], item[0]))[:limit]
@@ -0,0 +1,325 @@
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .matcher import KeywordMatcher
+from .ngram_index import NgramIndex
+from .semantic import LOCAL_SEMANTIC_MATCHER, SemanticMatcher, create_embedder
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 파일 잠금 없이 동작
+    fcntl = None
+
+# 등록 키워드 파일 경로
+KEYWORDS_FILE = os.path.join(os.path.dirname(__file__), "registered_keywords.txt")
+
+# LLM 프롬프트에 넣는 최대 후보 키워드 수 (등록 키워드 수와 관계없이 프롬프트 크기를 일정하게 유지)
+MAX_PROMPT_KEYWORDS = int(os.environ.get("MAX_PROMPT_KEYWORDS", "30"))
+
+# 키워드 파일 한 줄의 필드 구분자: "키워드 | 동의어1, 동의어2 | 카테고리" (키워드만 있는 줄도 허용)
+FIELD_SEPARATOR = "|"
+SYNONYM_SEPARATOR = ","
+
+# 트라이 노드에서 "여기서 끝나는 키워드"를 표시하는 키
+_TERMINAL = "\0"
+
+
+@dataclass(frozen=True)
+class KeywordEntry:
+    """등록 키워드와 동의어 그룹, 카테고리"""
+
+    keyword: str
+    synonyms: Tuple[str, ...] = ()
+    category: Optional[str] = None
+
+    @classmethod
+    def from_line(cls, line: str) -> Optional["KeywordEntry"]:
+        fields = [field.strip() for field in line.split(FIELD_SEPARATOR)]
+        if not fields[0]:
+            return None
+        synonyms = tuple(
+            dict.fromkeys(
+                s.strip() for s in (fields[1] if len(fields) > 1 else "").split(SYNONYM_SEPARATOR)
+                if s.strip() and s.strip() != fields[0]
+            )
+        )
+        category = fields[2] if len(fields) > 2 and fields[2] else None
+        return cls(keyword=fields[0], synonyms=synonyms, category=category)
+
+    def to_line(self) -> str:
+        if not self.synonyms and not self.category:
+            return self.keyword
+        fields = [self.keyword, f"{SYNONYM_SEPARATOR} ".join(self.synonyms)]
+        if self.category:
+            fields.append(self.category)
+        return f" {FIELD_SEPARATOR} ".join(fields)
+
+    def prompt_line(self) -> str:
+        """LLM 프롬프트에 넣는 한 줄 표현 (예: "화질 (동의어: 해상도, 선명도 / 분류: 디스플레이)")"""
+        details = []
+        if self.synonyms:
+            details.append(f"동의어: {', '.join(self.synonyms)}")
+        if self.category:
+            details.append(f"분류: {self.category}")
+        return f"- {self.keyword} ({' / '.join(details)})" if details else f"- {self.keyword}"
+
+
+class KeywordRegistry:
+    """
+    등록 키워드 목록을 메모리에 보관하는 레지스트리
+
+    - 파일은 처음 한 번만 읽고, 이후에는 mtime/크기가 바뀐 경우에만 다시 읽습니다
+    - 키워드마다 동의어 그룹과 카테고리를 가질 수 있습니다
+    - 중복 확인은 dict(set), 접두사 검색은 트라이로 처리합니다
+    - LLM 호출 전 리뷰와 관련 있는 후보 키워드만 문자 n-gram 역색인으로 고릅니다
+    - 키워드 등록은 파일 끝에 한 줄을 추가(append)하는 방식이며, 파일 잠금으로 프로세스 간 중복 등록을 막습니다
+    - 로컬 매처(KeywordMatcher, SemanticMatcher)도 키워드가 바뀔 때만 다시 만듭니다
+    """
+
+    def __init__(self, path: str = KEYWORDS_FILE, semantic_matcher: str = LOCAL_SEMANTIC_MATCHER):
+        self.path = path
+        self.semantic_matcher_name = semantic_matcher
+        self._lock = threading.RLock()
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._entries: Dict[str, KeywordEntry] = {}
+        self._trie: Dict[str, Any] = {}
+        self._version = ""
+        self._matcher: Optional[KeywordMatcher] = None
+        self._index: Optional[NgramIndex] = None
+        self._semantic: Optional[SemanticMatcher] = None
+        self._embedder: Any = None
+
+    def keywords(self) -> List[str]:
+        """등록 순서대로 키워드 목록"""
+        with self._lock:
+            self._refresh()
+            return list(self._entries)
+
+    def entries(self) -> List[KeywordEntry]:
+        """등록 순서대로 키워드 항목 (동의어/카테고리 포함)"""
+        with self._lock:
+            self._refresh()
+            return list(self._entries.values())
+
+    def get(self, keyword: str) -> Optional[KeywordEntry]:
+        with self._lock:
+            self._refresh()
+            return self._entries.get(keyword.strip())
+
+    def categories(self) -> Dict[str, List[str]]:
+        """카테고리별 키워드 목록 (카테고리가 없는 키워드는 제외)"""
+        with self._lock:
+            self._refresh()
+            grouped: Dict[str, List[str]] = {}
+            for entry in self._entries.values():
+                if entry.category:
+                    grouped.setdefault(entry.category, []).append(entry.keyword)
+            return grouped
+
+    def candidates(self, review_text: str, limit: int = MAX_PROMPT_KEYWORDS) -> List[KeywordEntry]:
+        """
+        리뷰와 관련 있을 가능성이 높은 후보 키워드를 고릅니다.
+
+        등록 키워드가 limit 개 이하이면 전부 반환하고, 그보다 많으면 키워드/동의어의
+        문자 n-gram이 리뷰와 많이 겹치는 순서로 최대 limit 개를 반환합니다.
+        """
+        with self._lock:
+            self._refresh()
+            entries = list(self._entries.values())
+            if len(entries) <= limit:
+                return entries
+            if self._index is None:
+                self._index = NgramIndex(
+                    (term, position)
+                    for position, entry in enumerate(entries)
+                    for term in (entry.keyword, *entry.synonyms)
+                )
+            index = self._index
+        return [entries[position] for position, _ in index.search(review_text, limit)]
+
+    def __contains__(self, keyword: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return keyword.strip() in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._entries)
+
+    @property
+    def version(self) -> str:
+        """키워드 목록의 해시 (캐시 키 등에 사용)"""
+        with self._lock:
+            self._refresh()
+            return self._version
+
+    def matcher(self) -> KeywordMatcher:
+        """현재 키워드 목록으로 만든 로컬 매처"""
+        with self._lock:
+            self._refresh()
+            if self._matcher is None:
+                self._matcher = KeywordMatcher(
+                    self._entries,
+                    synonyms={k: e.synonyms for k, e in self._entries.items() if e.synonyms},
+                )
+            return self._matcher
+
+    def semantic_matcher(self) -> Optional[SemanticMatcher]:
+        """현재 키워드 목록으로 만든 임베딩 기반 의미 매처 (LOCAL_SEMANTIC_MATCHER=off 이면 None)"""
+        with self._lock:
+            self._refresh()
+            if self._semantic is None and self.semantic_matcher_name != "off":
+                # 임베딩 모델은 한 번만 로드하고, 키워드가 바뀌면 키워드 행렬만 다시 계산합니다
+                if self._embedder is None:
+                    self._embedder = create_embedder(self.semantic_matcher_name)
+                    if self._embedder is None:
+                        self.semantic_matcher_name = "off"
+                        return None
+                self._semantic = SemanticMatcher(
+                    self._entries,
+                    synonyms={k: e.synonyms for k, e in self._entries.items() if e.synonyms},
+                    embedder=self._embedder,
+                )
+            return self._semantic
+
+    def complete(self, prefix: str, limit: int = 20) -> List[str]:
+        """prefix로 시작하는 등록 키워드 (트라이 탐색)"""
+        with self._lock:
+            self._refresh()
+            node = self._trie
+            for char in prefix:
+                node = node.get(char)
+                if node is None:
+                    return []
+            results: List[str] = []
+            stack = [(node, prefix)]
+            while stack and len(results) < limit:
+                current, word = stack.pop()
+                if _TERMINAL in current:
+                    results.append(word)
+                for char in sorted((c for c in current if c != _TERMINAL), reverse=True):
+                    stack.append((current[char], word + char))
+            return results
+
+    def register(
+        self,
+        keyword: str,
+        synonyms: Iterable[str] = (),
+        category: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        새 키워드를 등록합니다.
+
+        Args:
+            keyword (str): 등록할 키워드
+            synonyms (Iterable[str]): 동의어 목록
+            category (Optional[str]): 카테고리
+
+        Returns:
+            Dict[str, Any]: status(registered/already_exists), keyword, total_keywords
+        """
+        synonyms = tuple(synonyms)
+        fields = [keyword, *synonyms, category or ""]
+        if any(char in field for field in fields for char in ("\n", FIELD_SEPARATOR)):
+            raise ValueError(f"키워드/동의어/카테고리에는 줄바꿈이나 '{FIELD_SEPARATOR}'를 쓸 수 없습니다.")
+        if any(SYNONYM_SEPARATOR in synonym for synonym in synonyms):
+            raise ValueError(f"동의어에는 '{SYNONYM_SEPARATOR}'를 쓸 수 없습니다.")
+        entry = KeywordEntry.from_line(
+            FIELD_SEPARATOR.join([keyword, SYNONYM_SEPARATOR.join(synonyms), category or ""])
+        )
+        if entry is None:
+            raise ValueError("키워드는 비어 있지 않은 한 줄 문자열이어야 합니다.")
+        keyword = entry.keyword
+
+        with self._lock, self._file_lock():
+            # 다른 프로세스가 추가한 키워드까지 반영한 뒤 중복 확인
+            self._refresh()
+            if keyword in self._entries:
+                return {
+                    "status": "already_exists",
+                    "keyword": keyword,
+                    "total_keywords": len(self._entries),
+                }
+
+            # 마지막 줄에 줄바꿈이 없는 파일이면 줄바꿈부터 추가합니다
+            needs_newline = self._stamp is not None and self._stamp[1] > 0 and not self._ends_with_newline()
+            line = ("\n" if needs_newline else "") + entry.to_line() + "\n"
+            # O_APPEND + 한 번의 write: 기존 내용을 다시 쓰지 않고 끝에만 추가합니다
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line.encode("utf-8"))
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+            self._add(entry)
+            self._update_version()
+            self._stamp = self._file_stamp()
+            return {
+                "status": "registered",
+                "keyword": keyword,
+                "total_keywords": len(self._entries),
+            }
+
+    def _refresh(self) -> None:
+        """파일의 mtime/크기가 바뀌었으면 다시 읽습니다. (lock 보유 상태에서 호출)"""
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return
+        self._entries, self._trie = {}, {}
+        self._matcher = self._index = self._semantic = None
+        if stamp is not None:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    entry = KeywordEntry.from_line(line)
+                    # 같은 키워드가 여러 번 있으면 처음 것을 사용합니다
+                    if entry is not None and entry.keyword not in self._entries:
+                        self._add(entry)
+        self._update_version()
+        self._stamp = stamp
+
+    def _add(self, entry: KeywordEntry) -> None:
+        self._entries[entry.keyword] = entry
+        node = self._trie
+        for char in entry.keyword:
+            node = node.setdefault(char, {})
+        node[_TERMINAL] = True
+        self._matcher = self._index = self._semantic = None
+
+    def _update_version(self) -> None:
+        content = "\n".join(entry.to_line() for entry in self._entries.values())
+        self._version = hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """프로세스 간 등록을 직렬화하는 잠금 파일 (<키워드 파일>.lock)"""
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# 키워드 분석기와 Streamlit 앱이 함께 사용하는 기본 레지스트리
+default_registry = KeywordRegistry()
@@ -0,0 +1,233 @@
+import logging
+import os
+import re
+import zlib
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy가 없으면 로컬 의미 매칭을 사용하지 않습니다
+    np = None
+
+from .matcher import PHRASE_DELIMITERS, KeywordMatch
+
+logger = logging.getLogger(__name__)
+
+# 로컬 의미 매처 설정
+# - off: 사용하지 않음 (semantic 매칭은 LLM이 담당)
+# - hashing: 문자 n-gram 해싱 벡터 (추가 의존성/모델 다운로드 없음)
+# - 그 밖의 값: sentence-transformers 모델 이름 (CPU에서 실행, 설치되어 있지 않으면 hashing으로 대체)
+LOCAL_SEMANTIC_MATCHER = os.environ.get("LOCAL_SEMANTIC_MATCHER", "off")
+
+# 유사도가 이 값 이상인 키워드만 semantic 매칭으로 봅니다 (비어 있으면 임베더별 기본값)
+SEMANTIC_MATCH_THRESHOLD = os.environ.get("SEMANTIC_MATCH_THRESHOLD", "")
+
+# 해싱 벡터 차원과 리뷰 구간(연속 어절 수) 최대 길이
+HASHING_DIM = int(os.environ.get("SEMANTIC_HASHING_DIM", "256"))
+MAX_SPAN_WORDS = int(os.environ.get("SEMANTIC_MAX_SPAN_WORDS", "2"))
+
+# 한 번의 행렬 곱으로 비교하는 리뷰 구간 수 (구간 수 x 키워드 수 float32 행렬 크기를 제한)
+SIMILARITY_CHUNK = 2048
+
+
+@lru_cache(maxsize=65536)
+def _text_features(text: str, dim: int) -> Tuple[Tuple[int, ...], Tuple[float, ...]]:
+    """공백을 뺀 텍스트의 문자 2/3-gram을 해싱한 (차원 번호, 부호) 목록 (자주 나오는 구간은 캐시)"""
+    padded = f"<{''.join(text.lower().split())}>"
+    hashes = [
+        zlib.crc32(padded[i : i + n].encode("utf-8"))
+        for n in (2, 3)
+        for i in range(len(padded) - n + 1)
+    ]
+    # 해시 충돌이 한쪽으로 쌓이지 않도록 부호도 해시로 정합니다
+    return tuple(h % dim for h in hashes), tuple(1.0 if h >> 31 else -1.0 for h in hashes)
+
+
+class HashingEmbedder:
+    """
+    문자 n-gram 해싱 벡터 임베더 (모델 없이 CPU에서 동작하는 기본 임베더)
+
+    공백을 무시한 문자 n-gram 벡터이므로 띄어쓰기/조사/어미 차이("가성 비", "배터리 수명이")에 강하고,
+    학습된 의미 유사도(예: "소리" ~ "음질")는 잡지 못합니다.
+    """
+
+    default_threshold = 0.6
+
+    def __init__(self, dim: int = HASHING_DIM):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts: Sequence[str]) -> "np.ndarray":
+        """L2 정규화된 (len(texts), dim) float32 행렬"""
+        rows: List[int] = []
+        indices: List[int] = []
+        signs: List[float] = []
+        for row, text in enumerate(texts):
+            text_indices, text_signs = _text_features(text, self.dim)
+            rows.extend([row] * len(text_indices))
+            indices.extend(text_indices)
+            signs.extend(text_signs)
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(
+            matrix,
+            (np.array(rows, dtype=np.int64), np.array(indices, dtype=np.int64)),
+            np.array(signs, dtype=np.float32),
+        )
+        return _normalize(matrix)
+
+
+class SentenceTransformerEmbedder:
+    """sentence-transformers 모델 임베더 (CPU 전용, 모델은 처음 한 번만 로드)"""
+
+    default_threshold = 0.55
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.name = model_name
+        self._model = SentenceTransformer(model_name, device="cpu")
+
+    def embed(self, texts: Sequence[str]) -> "np.ndarray":
+        vectors = self._model.encode(list(texts), batch_size=64, convert_to_numpy=True)
+        return _normalize(vectors.astype(np.float32))
+
+
+def _normalize(matrix: "np.ndarray") -> "np.ndarray":
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def create_embedder(name: str = LOCAL_SEMANTIC_MATCHER):
+    """설정값에 맞는 임베더 (off 이거나 numpy가 없으면 None)"""
+    if name == "off":
+        return None
+    if np is None:
+        logger.warning("numpy가 설치되어 있지 않아 로컬 의미 매칭을 사용하지 않습니다.")
+        return None
+    if name == "hashing":
+        return HashingEmbedder()
+    try:
+        return SentenceTransformerEmbedder(name)
+    except ImportError:
+        logger.warning("sentence-transformers가 없어 해싱 임베더를 사용합니다: %s", name)
+        return HashingEmbedder()
+
+
+class SemanticMatcher:
+    """
+    임베딩 코사인 유사도로 등록 키워드의 semantic 매칭을 찾는 로컬 매처
+
+    - 키워드(와 동의어) 벡터는 생성 시 한 번 계산해 (용어 수, 차원) 행렬로 보관합니다
+    - 리뷰는 문장/절 안의 연속 어절 구간(최대 MAX_SPAN_WORDS 어절)으로 나눠 임베딩합니다
+    - 모든 구간과 모든 키워드의 유사도를 행렬 곱 한 번으로 계산합니다 (벡터가 정규화되어 있으므로 내적 = 코사인)
+    - 여러 리뷰를 한 번에 처리하면(find_batch) 같은 구간은 한 번만 임베딩/비교합니다
+    """
+
+    def __init__(
+        self,
+        keywords: Iterable[str],
+        synonyms: Optional[Dict[str, Iterable[str]]] = None,
+        embedder=None,
+        threshold: Optional[float] = None,
+        max_span_words: int = MAX_SPAN_WORDS,
+    ):
+        if np is None:
+            raise RuntimeError("로컬 의미 매칭에는 numpy가 필요합니다.")
+        self.embedder = embedder or HashingEmbedder()
+        if threshold is None:
+            threshold = float(SEMANTIC_MATCH_THRESHOLD or self.embedder.default_threshold)
+        self.threshold = threshold
+        self.max_span_words = max_span_words
+
+        self.keywords: List[str] = list(dict.fromkeys(k.strip() for k in keywords if k.strip()))
+        synonyms = synonyms or {}
+        terms: List[str] = []
+        owners: List[int] = []
+        for position, keyword in enumerate(self.keywords):
+            for term in (keyword, *synonyms.get(keyword, ())):
+                terms.append(term)
+                owners.append(position)
+        self._owners = np.array(owners, dtype=np.int64)
+        # (차원, 용어 수): 구간 행렬과 바로 곱할 수 있도록 전치해서 보관
+        self._term_matrix = self.embedder.embed(terms).T.copy() if terms else None
+
+    def find(self, text: str, exclude: Iterable[str] = ()) -> List[KeywordMatch]:
+        """리뷰 하나의 semantic 매칭 (exclude 키워드는 제외)"""
+        return self.find_batch([text], exclude)[0]
+
+    def find_batch(
+        self, texts: Sequence[str], exclude: Iterable[str] = ()
+    ) -> List[List[KeywordMatch]]:
+        """
+        여러 리뷰의 semantic 매칭을 한 번에 찾습니다.
+
+        Returns:
+            List[List[KeywordMatch]]: 리뷰별 매칭 (키워드 등록 순서, 키워드마다 유사도가 가장 높은 구간)
+        """
+        results: List[List[KeywordMatch]] = [[] for _ in texts]
+        if self._term_matrix is None:
+            return results
+
+        # 같은 구간 텍스트는 한 번만 임베딩합니다
+        span_ids: Dict[str, int] = {}
+        occurrences: List[Tuple[int, int, str, int, int]] = []  # (리뷰 번호, 구간 번호, 구절, 시작, 끝)
+        for review, text in enumerate(texts):
+            for span, phrase, start, end in _spans(text, self.max_span_words):
+                span_id = span_ids.setdefault(span, len(span_ids))
+                occurrences.append((review, span_id, phrase, start, end))
+        if not occurrences:
+            return results
+
+        # 구간별로 임계값을 넘는 (용어, 유사도)만 남깁니다
+        unique_spans = list(span_ids)
+        span_hits: Dict[int, List[Tuple[int, float]]] = {}
+        for offset in range(0, len(unique_spans), SIMILARITY_CHUNK):
+            vectors = self.embedder.embed(unique_spans[offset : offset + SIMILARITY_CHUNK])
+            scores = vectors @ self._term_matrix
+            rows, cols = np.nonzero(scores >= self.threshold)
+            for row, col in zip(rows.tolist(), cols.tolist()):
+                span_hits.setdefault(offset + row, []).append((col, float(scores[row, col])))
+
+        excluded = set(exclude)
+        best: List[Dict[int, Tuple[float, KeywordMatch]]] = [{} for _ in texts]
+        for review, span_id, phrase, start, end in occurrences:
+            for term, score in span_hits.get(span_id, ()):
+                owner = int(self._owners[term])
+                keyword = self.keywords[owner]
+                current = best[review].get(owner)
+                if keyword in excluded or (current is not None and current[0] >= score):
+                    continue
+                best[review][owner] = (
+                    score,
+                    KeywordMatch(
+                        keyword=keyword,
+                        match_type="semantic",
+                        original_phrase=phrase,
+                        start=start,
+                        end=end,
+                    ),
+                )
+        for review, matches in enumerate(best):
+            results[review] = [matches[owner][1] for owner in sorted(matches)]
+        return results
+
+
+_WORD = re.compile(r"\S+")
+
+
+def _spans(text: str, max_words: int) -> Iterable[Tuple[str, str, int, int]]:
+    """(구간 텍스트, 구간을 포함하는 구절, 구절 시작, 구절 끝) - 구절은 문장/절 단위"""
+    phrase_start = 0
+    for boundary in [*PHRASE_DELIMITERS.finditer(text), None]:
+        phrase_end = boundary.start() if boundary else len(text)
+        words = [m.group() for m in _WORD.finditer(text, phrase_start, phrase_end)]
+        if words:
+            stripped = text[phrase_start:phrase_end].strip()
+            start = text.index(stripped, phrase_start)
+            for size in range(1, max_words + 1):
+                for i in range(len(words) - size + 1):
+                    yield " ".join(words[i : i + size]), stripped, start, start + len(stripped)
+        if boundary:
+            phrase_start = boundary.end()
@@ -1,53 +1,73 @@
 import json
 import os
+import sys
+import time
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 import streamlit as st
-from keyword_extractor.agent import search_keywords
 
-# 키워드 저장 파일 경로
-KEYWORDS_FILE = os.path.join(
-    os.path.dirname(__file__), "keyword_extractor", "registered_keywords.txt"
-)
+# 공통 모듈(review_common) import를 위해 저장소 루트를 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from keyword_extractor.agent import search_keywords
+from keyword_extractor.highlight import locate_phrase, render_highlights
+from keyword_extractor.registry import default_registry
+from review_common.jobs import POLL_INTERVAL, BulkRun, default_job_queue
+from review_common.metrics import start_metrics_server
+from review_common.review_store import DEFAULT_PAGE_SIZE, default_review_store
+from review_common.tracing import setup_tracing
+
+# 키워드 필터 버튼으로 표시할 최대 개수
+MAX_KEYWORD_BUTTONS = 48
 
 def load_keywords() -> List[str]:
     """등록된 키워드 목록 로드"""
-    if os.path.exists(KEYWORDS_FILE):
-        with open(KEYWORDS_FILE, "r", encoding="utf-8") as f:
-            keywords = [line.strip() for line in f if line.strip()]
-            return keywords
-    return []
-
-
-def save_keywords(keywords: List[str]):
-    """키워드 목록 저장"""
-    with open(KEYWORDS_FILE, "w", encoding="utf-8") as f:
-        for keyword in keywords:
-            f.write(f"{keyword}\n")
-
-
-def register_keyword(keyword: str) -> Dict[str, Any]:
-    """새로운 키워드 등록"""
-    # 기존 키워드 로드
-    keywords = load_keywords()
-
-    # 중복 체크
-    if keyword in keywords:
-        return {
-            "status": "already_exists",
-            "keyword": keyword,
-            "total_keywords": len(keywords),
-        }
+    return default_registry.keywords()
 
-    # 새 키워드 추가
-    keywords.append(keyword)
 
-    # 저장
-    save_keywords(keywords)
+def register_keyword(
+    keyword: str, synonyms: List[str] = [], category: str = ""
+) -> Dict[str, Any]:
+    """새로운 키워드 등록 (파일 끝에 한 줄 추가, 중복은 set으로 확인)"""
+    return default_registry.register(keyword, synonyms=synonyms, category=category or None)
+
+
+def highlight_span(content: str, item: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+    """매칭 항목의 원문 위치 (위치 정보가 없는 이전 결과는 original_phrase로 찾음)"""
+    start, end = item.get("start"), item.get("end")
+    if start is not None and end is not None:
+        return start, end
+    return locate_phrase(content, item.get("original_phrase", ""))
+
+
+def run_keyword_search(content: str) -> Dict[str, Any]:
+    """백그라운드 작업에서 실행하는 키워드 검색 (세션 상태는 건드리지 않음)"""
+    # 등록 키워드가 바뀌면 결과도 달라지므로 분석에 사용한 키워드 목록 버전을 함께 저장
+    keywords_version = default_registry.version
+    return {
+        "review_text": content,
+        "keywords_version": keywords_version,
+        "match_result": search_keywords(content),
+    }
 
-    return {"status": "registered", "keyword": keyword, "total_keywords": len(keywords)}
+
+def needs_keyword_analysis(comment: Dict[str, Any]) -> bool:
+    """저장된 결과가 없거나, 실패/로컬 결과로 대체됐거나, 리뷰/등록 키워드가 분석 이후 바뀐 경우"""
+    result = st.session_state.keyword_matching_results.get(comment["id"])
+    return (
+        result is None
+        or not result.get("match_result", {}).get("success")
+        or result.get("match_result", {}).get("degraded")
+        or result.get("review_text") != comment["content"]
+        or result.get("keywords_version") != default_registry.version
+    )
+
+
+def submit_keyword_job(comment_id: int) -> str:
+    """리뷰 키워드 검색을 백그라운드 작업으로 제출하고 작업 id를 반환"""
+    comment = default_review_store.get_review(comment_id)
+    return default_job_queue.submit(run_keyword_search, comment["content"])
 
 
 # 키워드 추출 헬퍼 함수
@@ -72,6 +92,10 @@ def extract_keywords_from_result(match_result: Dict[str, Any]) -> List[str]:
         return matched_keywords
 
 
+# METRICS_PORT 가 설정되어 있으면 /metrics 엔드포인트를, TRACE_EXPORTER 가 설정되어 있으면 트레이스 내보내기를 켭니다 (프로세스당 한 번)
+start_metrics_server()
+setup_tracing()
+
 st.set_page_config(page_title="Lab 02. 키워드 검색 Agent", page_icon="🏷️", layout="wide")
 
 st.markdown(
@@ -147,51 +171,77 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-# 세션 상태 초기화
+# 세션 상태 초기화 (키워드 매칭 결과는 현재 페이지의 결과를 저장소에서 읽어 둠)
 if "keyword_matching_results" not in st.session_state:
     st.session_state.keyword_matching_results = {}
 
+# 백그라운드에서 분석 중인 작업 (comment id -> 작업 id)
+if "keyword_jobs" not in st.session_state:
+    st.session_state.keyword_jobs = {}
+
+# "전체 분석" 진행 상황 (BulkRun)
+if "keyword_bulk" not in st.session_state:
+    st.session_state.keyword_bulk = None
+
+# 끝난 백그라운드 분석 작업의 결과를 반영
+for comment_id, job in default_job_queue.collect_pending(st.session_state.keyword_jobs).items():
+    bulk = st.session_state.keyword_bulk
+    if job.status == "done":
+        default_review_store.save_result(
+            comment_id,
+            "keywords",
+            {"timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), **job.result},
+        )
+    elif bulk and comment_id in bulk.item_ids:
+        bulk.record_error(comment_id, job.error)
+    else:
+        st.toast(f"키워드 검색 중 오류: {job.error}")
+
 if "show_keyword_modal" not in st.session_state:
     st.session_state.show_keyword_modal = False
 
-if "comments" not in st.session_state:
-    st.session_state.comments = [
-        {
-            "id": 1,
-            "author": "박지훈",
-            "rating": 5,
-            "content": "전반적으로 낫배드. 가격 대비 쓸만한 것 같습니다.",
-            "timestamp": "2024-01-16 17:32",
-        },
-        {
-            "id": 2,
-            "author": "김민수",
-            "rating": 5,
-            "content": "주문한지 하루만에 왔어요! 급했는데 빠른 배송 감사합니다. ",
-            "timestamp": "2024-01-15 14:30",
-        },
-        {
-            "id": 3,
-            "author": "이영희",
-            "rating": 4,
-            "content": "디자인이 제일 맘에 들어요, 하얀색 강추입니다! 근데 제가 귀가 작아서그런지 귀에 끼면 좀 아파요",
-            "timestamp": "2024-01-14 16:45",
-        },
-        {
-            "id": 4,
-            "author": "박철수",
-            "rating": 3,
-            "content": "며칠 더 써봐야겠지만, 지금까지는 음질도 배터리도 만족스럽습니다.",
-            "timestamp": "2024-01-13 10:20",
-        },
-        {
-            "id": 5,
-            "author": "최지영",
-            "rating": 5,
-            "content": "제품 맘에 듭니다. 특히 통화할 때 음성이 깔끔하게 들려서 만족스러워요. 배터리도 오래 갑니다.",
-            "timestamp": "2024-01-12 09:15",
-        },
-    ]
+# 리뷰 저장소의 상품 id (예시 리뷰는 상품에 리뷰가 하나도 없을 때만 저장)
+PRODUCT_ID = "lab02-premium-earphone"
+SEED_REVIEWS = [
+    {
+        "author": "박지훈",
+        "rating": 5,
+        "content": "전반적으로 낫배드. 가격 대비 쓸만한 것 같습니다.",
+        "timestamp": "2024-01-16 17:32",
+    },
+    {
+        "author": "김민수",
+        "rating": 5,
+        "content": "주문한지 하루만에 왔어요! 급했는데 빠른 배송 감사합니다. ",
+        "timestamp": "2024-01-15 14:30",
+    },
+    {
+        "author": "이영희",
+        "rating": 4,
+        "content": "디자인이 제일 맘에 들어요, 하얀색 강추입니다! 근데 제가 귀가 작아서그런지 귀에 끼면 좀 아파요",
+        "timestamp": "2024-01-14 16:45",
+    },
+    {
+        "author": "박철수",
+        "rating": 3,
+        "content": "며칠 더 써봐야겠지만, 지금까지는 음질도 배터리도 만족스럽습니다.",
+        "timestamp": "2024-01-13 10:20",
+    },
+    {
+        "author": "최지영",
+        "rating": 5,
+        "content": "제품 맘에 듭니다. 특히 통화할 때 음성이 깔끔하게 들려서 만족스러워요. 배터리도 오래 갑니다.",
+        "timestamp": "2024-01-12 09:15",
+    },
+]
+
+if "reviews_seeded" not in st.session_state:
+    default_review_store.seed_reviews(PRODUCT_ID, SEED_REVIEWS)
+    st.session_state.reviews_seeded = True
+
+# 현재 페이지 (0부터)
+if "review_page" not in st.session_state:
+    st.session_state.review_page = 0
 
 # 메인 콘텐츠 영역
 st.header("🏷️ Lab 02. 키워드 검색 시스템")
@@ -199,9 +249,8 @@ st.subheader("한국어 리뷰에서 키워드 검색 및 매칭 시스템 실
 st.markdown("---")
 
 # 제품 정보 및 평점 계산
-total_reviews = len(st.session_state.comments)
-total_rating = sum([comment["rating"] for comment in st.session_state.comments])
-average_rating = total_rating / total_reviews if total_reviews else 0
+# 리뷰 수/평균 평점은 DB에서 집계 (전체 리뷰를 메모리로 읽지 않음)
+total_reviews, average_rating = default_review_store.rating_summary(PRODUCT_ID)
 
 # 제품 정보 섹션 (최상단 이동)
 st.subheader("📦 상품 정보")
@@ -237,6 +286,22 @@ with col1:
     st.write("**등록된 키워드 (클릭하여 필터링)**")
     registered_keywords = load_keywords()
 
+    # 카테고리가 있으면 카테고리별로 나눠서 표시
+    categories = default_registry.categories()
+    if categories:
+        selected_category = st.selectbox(
+            "분류", ["전체", *sorted(categories)], key="keyword_category_filter"
+        )
+        if selected_category != "전체":
+            registered_keywords = categories[selected_category]
+
+    # 키워드가 많으면 앞쪽 일부만 버튼으로 표시
+    if len(registered_keywords) > MAX_KEYWORD_BUTTONS:
+        st.caption(
+            f"등록된 키워드 {len(registered_keywords):,}개 중 {MAX_KEYWORD_BUTTONS}개만 표시합니다."
+        )
+        registered_keywords = registered_keywords[:MAX_KEYWORD_BUTTONS]
+
     # 선택된 키워드 세션 상태 초기화
     if "selected_keyword_filter" not in st.session_state:
         st.session_state["selected_keyword_filter"] = None
@@ -276,6 +341,8 @@ if st.session_state.get("show_keyword_modal", False):
 
         with st.form("keyword_form"):
             new_keyword = st.text_input("키워드", placeholder="예: 음질")
+            new_synonyms = st.text_input("동의어 (쉼표로 구분, 선택)", placeholder="예: 소리, 사운드")
+            new_category = st.text_input("분류 (선택)", placeholder="예: 오디오")
 
             col1, col2 = st.columns([1, 1])
             with col1:
@@ -289,7 +356,11 @@ if st.session_state.get("show_keyword_modal", False):
                 if new_keyword:
                     try:
                         with st.spinner("키워드 등록 중..."):
-                            result = register_keyword(new_keyword)
+                            result = register_keyword(
+                                new_keyword,
+                                synonyms=[s.strip() for s in new_synonyms.split(",") if s.strip()],
+                                category=new_category.strip(),
+                            )
                             if result.get("status") == "already_exists":
                                 st.warning(
                                     f"⚠️ 키워드 '{new_keyword}'는 이미 등록되어 있습니다."
@@ -314,10 +385,48 @@ st.divider()
 # 리뷰 섹션
 st.subheader("📝 고객 리뷰")
 
+# 현재 페이지의 리뷰와 분석 결과만 조회 (최신 리뷰부터)
+page_count = max(1, -(-total_reviews // DEFAULT_PAGE_SIZE))
+st.session_state.review_page = min(st.session_state.review_page, page_count - 1)
+comments = default_review_store.list_reviews(
+    PRODUCT_ID, limit=DEFAULT_PAGE_SIZE, offset=st.session_state.review_page * DEFAULT_PAGE_SIZE
+)
+st.session_state.keyword_matching_results = default_review_store.get_results(
+    [c["id"] for c in comments], "keywords"
+)
+
+# 현재 페이지의 미분석 리뷰 전체 분석 (동시 실행 수 제한, 진행 상황 표시)
+keyword_bulk = st.session_state.keyword_bulk
+if keyword_bulk:
+    keyword_bulk.dispatch(st.session_state.keyword_jobs, submit_keyword_job)
+
+bulk_targets = [
+    c["id"]
+    for c in comments
+    if needs_keyword_analysis(c) and c["id"] not in st.session_state.keyword_jobs
+]
+bulk_running = keyword_bulk is not None and keyword_bulk.completed(
+    st.session_state.keyword_jobs
+) < len(keyword_bulk.item_ids)
+if st.button(
+    f"⚡ 미분석 리뷰 전체 분석 ({len(bulk_targets)}건)",
+    type="primary",
+    disabled=bulk_running or not bulk_targets,
+):
+    st.session_state.keyword_bulk = BulkRun(bulk_targets)
+    st.rerun()
+
+if keyword_bulk:
+    done, total = keyword_bulk.completed(st.session_state.keyword_jobs), len(keyword_bulk.item_ids)
+    label = "전체 분석 완료" if done == total else "전체 분석 중..."
+    st.progress(done / total, text=f"{label} {done}/{total}")
+    for comment_id, error in keyword_bulk.errors.items():
+        st.error(f"리뷰 #{comment_id} 분석 실패: {error}")
+
 # 선택된 키워드 필터 가져오기
 selected_keyword = st.session_state.get("selected_keyword_filter", None)
 
-for comment in reversed(st.session_state.comments):
+for comment in comments:
     # 필터링 체크
     show_comment = True
     if selected_keyword:  # 키워드가 선택된 경우에만 필터링
@@ -332,8 +441,8 @@ for comment in reversed(st.session_state.comments):
 
     if show_comment:
         with st.container():
-            # 리뷰 내용 하이라이트 처리
-            highlighted_content = comment["content"]
+            # 리뷰 내용 하이라이트 처리 (원문 위치 기반, 한 번에 렌더링)
+            spans_to_highlight = []
 
             if comment["id"] in st.session_state.keyword_matching_results:
                 result = st.session_state.keyword_matching_results[comment["id"]]
@@ -344,41 +453,25 @@ for comment in reversed(st.session_state.comments):
 
                     # 선택된 키워드와 관련된 구문만 하이라이트
                     matched_keywords = analysis_result.get("matched_keywords", [])
-                    phrases_to_highlight = []
 
                     if matched_keywords:
                         # 새로운 형식: 딕셔너리 배열
                         if isinstance(matched_keywords[0], dict):
                             for item in matched_keywords:
                                 item_keyword = item.get("keyword", "")
-                                original_phrase = item.get("original_phrase", "")
-
-                                # 선택된 키워드와 일치하거나 선택 없을 때만 하이라이트
-                                if (
-                                    not selected_keyword
-                                    or item_keyword == selected_keyword
-                                ) and original_phrase:
-                                    phrases_to_highlight.append(original_phrase)
-                        # 기존 형식: 문자열 배열 - matched_phrases 사용
+                                if selected_keyword and item_keyword != selected_keyword:
+                                    continue
+                                span = highlight_span(comment["content"], item)
+                                if span:
+                                    spans_to_highlight.append(span)
+                        # 기존 형식: 문자열 배열 - matched_phrases 사용 (키워드 선택과 관계없이 전체 구문)
                         else:
-                            if not selected_keyword:
-                                phrases_to_highlight = analysis_result.get(
-                                    "matched_phrases", []
-                                )
-                            else:
-                                # 특정 키워드 선택 시, 해당 키워드의 구문만 추출
-                                all_phrases = analysis_result.get("matched_phrases", [])
-                                phrases_to_highlight = (
-                                    all_phrases  # 기존 형식에서는 전체 구문 사용
-                                )
+                            for phrase in analysis_result.get("matched_phrases", []):
+                                span = locate_phrase(comment["content"], phrase)
+                                if span:
+                                    spans_to_highlight.append(span)
 
-                    # 구문 하이라이트
-                    for phrase in phrases_to_highlight:
-                        if phrase and phrase in highlighted_content:
-                            highlighted_content = highlighted_content.replace(
-                                phrase,
-                                f'<mark style="background: linear-gradient(135deg, #fff3cd 0%, #ffeaa7 100%); color: #856404; padding: 3px 8px; border-radius: 8px; font-weight: 500; box-shadow: 0 2px 6px rgba(255, 235, 59, 0.3); border: 1px solid #ffeaa7;">{phrase}</mark>',
-                            )
+            highlighted_content = render_highlights(comment["content"], spans_to_highlight)
 
             col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
 
@@ -427,35 +520,45 @@ for comment in reversed(st.session_state.comments):
                 st.caption(comment["timestamp"])
 
             with col4:
-                # 개별 키워드 분석 버튼
-                button_label = (
-                    "✅ 재분석"
-                    if comment["id"] in st.session_state.keyword_matching_results
-                    else "🔍 키워드 분석"
-                )
+                # 개별 키워드 분석 버튼 (분석은 백그라운드 작업으로 실행)
+                is_running = comment["id"] in st.session_state.keyword_jobs
+                if is_running:
+                    button_label = "⏳ 분석 중..."
+                elif not needs_keyword_analysis(comment):
+                    button_label = "✅ 재분석"
+                else:
+                    button_label = "🔍 키워드 분석"
                 if st.button(
                     button_label,
                     key=f"search_{comment['id']}",
                     type="primary",
                     use_container_width=True,
+                    disabled=is_running,
                 ):
-                    with st.spinner("키워드 검색 중..."):
-                        try:
-                            match_result = search_keywords(comment["content"])
-                            st.session_state.keyword_matching_results[comment["id"]] = {
-                                "timestamp": datetime.now().strftime(
-                                    "%Y-%m-%d %H:%M:%S"
-                                ),
-                                "review_text": comment["content"],
-                                "match_result": match_result,
-                            }
-                            st.success("✅ 분석 완료!")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"키워드 검색 중 오류: {str(e)}")
+                    st.session_state.keyword_jobs[comment["id"]] = submit_keyword_job(
+                        comment["id"]
+                    )
+                    st.rerun()
 
             st.divider()
 
+# 페이지 이동
+col_prev, col_page, col_next = st.columns([1, 2, 1])
+with col_prev:
+    if st.button("◀ 이전", disabled=st.session_state.review_page == 0, use_container_width=True):
+        st.session_state.review_page -= 1
+        st.rerun()
+with col_page:
+    st.caption(f"{st.session_state.review_page + 1} / {page_count} 페이지")
+with col_next:
+    if st.button(
+        "다음 ▶",
+        disabled=st.session_state.review_page >= page_count - 1,
+        use_container_width=True,
+    ):
+        st.session_state.review_page += 1
+        st.rerun()
+
 st.divider()
 
 # 새 리뷰 등록 섹션
@@ -475,20 +578,16 @@ with st.form("new_comment_form"):
 
     if st.form_submit_button("리뷰 등록", type="primary"):
         if author_name and comment_content:
-            new_comment = {
-                "id": (
-                    max([c["id"] for c in st.session_state.comments]) + 1
-                    if st.session_state.comments
-                    else 1
-                ),
-                "author": author_name,
-                "content": comment_content,
-                "rating": rating,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M"),
-            }
-
-            st.session_state.comments.append(new_comment)
+            default_review_store.add_review(
+                PRODUCT_ID, author=author_name, rating=rating, content=comment_content
+            )
+            st.session_state.review_page = 0
             st.success("리뷰가 등록되었습니다!")
             st.rerun()
         else:
             st.error("작성자와 리뷰 내용을 모두 입력해주세요.")
+
+# 분석 중인 작업이 있으면 잠시 후 다시 그려 결과를 반영합니다
+if st.session_state.keyword_jobs:
+    time.sleep(POLL_INTERVAL)
+    st.rerun()
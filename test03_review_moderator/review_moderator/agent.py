@@ -1,14 +1,50 @@
+import asyncio
+import io
 import logging
 import os
-from datetime import datetime
 from string import Template
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, Dict, Literal, Optional, Tuple
 
 from PIL.Image import Image as PILImage
-from pydantic import BaseModel, Field
-from strands import Agent
+from review_common.agent_pool import default_pool
+from review_common.concurrency import DEFAULT_TIMEOUT, run_limited
+from review_common.metrics import current_call, instrumented
+from review_common.resilience import UNAVAILABLE_ERRORS, record_degraded
+from review_common.response_parser import (
+    DEFAULT_STRUCTURED_MODE,
+    StructuredMode,
+    invoke_structured,
+    invoke_structured_async,
+)
+from review_common.result_cache import (
+    image_fingerprint,
+    lookup_result,
+    make_cache_key,
+    prompt_version,
+    store_result,
+)
 
-from .tools import check_image_product_match, check_profanity, check_rating_consistency
+from .image_handoff import (
+    NO_IMAGE_REF,
+    PERSIST_REVIEW_IMAGES,
+    persist_in_background,
+    register_image,
+    release_image,
+)
+from .image_preprocess import preprocess_image
+from .image_store import DEFAULT_IMAGES_FOLDER, get_image_store
+from .models import ReviewModerationResult
+from .parallel import aggregate_checks, run_parallel_checks, run_parallel_checks_async
+from .routing import HAIKU_MODEL_ID, SONNET_MODEL_ID, routing_version
+from .tools import (
+    IMAGE_MATCH_PROMPT,
+    PROFANITY_PROMPT,
+    RATING_CONSISTENCY_PROMPT,
+    check_image_product_match,
+    check_profanity,
+    check_rating_consistency,
+    degraded_outputs,
+)
 
 #Configure the root strands logger
 logging.getLogger("strands").setLevel(logging.INFO)
@@ -18,6 +54,10 @@ logging.basicConfig(
     format="%(levelname)s | %(name)s | %(message)s", handlers=[logging.StreamHandler()]
 )
 
+MODEL_ID = "apac.anthropic.claude-3-haiku-20240307-v1:0"
+
+MODERATION_TOOLS = [check_profanity, check_rating_consistency, check_image_product_match]
+
 # 통합 리뷰 검수 Agent 시스템 프롬프트
 UNIFIED_MODERATOR_PROMPT = """
     당신은 이커머스 플랫폼의 리뷰 검수 전문가입니다.
@@ -68,33 +108,41 @@ USER_PROMPT_TEMPLATE = Template(
     별점: $rating 점 (1-5점 척도)
     제품: $product
     카테고리: $category
-    이미지: $has_image ($image_path)
+    이미지: $has_image (image_ref: $image_ref)
     """
 )
 
-class CheckResult(BaseModel):
-    """개별 검사 결과"""
-
-    status: Literal["PASS", "FAIL", "SKIP"] = Field(description="검사 상태")
-    reason: str = Field(description="구체적인 판단 근거 (필수)")
-    confidence: float = Field(ge=0.0, le=1.0, description="신뢰도 (0.0-1.0)")
+STRUCTURED_PROMPT = "모델의 종합적인 리뷰 검수 결과를 구조화합니다."
 
+# 검수 결과는 통합 Agent와 하위 도구 Agent의 프롬프트/모델(라우팅 정책 포함) 모두에 의존합니다
+PROMPT_VERSION = prompt_version(
+    UNIFIED_MODERATOR_PROMPT,
+    USER_PROMPT_TEMPLATE.template,
+    PROFANITY_PROMPT,
+    RATING_CONSISTENCY_PROMPT,
+    IMAGE_MATCH_PROMPT,
+    routing_version(),
+)
+CACHE_MODEL_ID = "+".join([MODEL_ID, SONNET_MODEL_ID, HAIKU_MODEL_ID])
 
-class ReviewModerationResult(BaseModel):
-    """리뷰 모더레이션 분석 결과"""
 
-    profanity_check: CheckResult = Field(description="욕설/비속어 검사 결과")
-    rating_consistency: CheckResult = Field(description="평점-내용 일치성 검사 결과")
-    image_match: CheckResult = Field(description="이미지-내용 일치성 검사 결과")
-    overall_status: Literal["PASS", "FAIL"] = Field(description="전체 검수 통과 여부")
-    failed_checks: List[str] = Field(description="실패한 검사 항목 리스트")
+# 검수 실행 방식
+# - agent: 통합 Agent가 도구 호출 순서를 결정하고 결과를 종합 (기존 방식)
+# - parallel: 세 가지 검사를 동시에 실행하고 결과를 코드에서 종합
+ModerationEngine = Literal["agent", "parallel"]
+DEFAULT_ENGINE: ModerationEngine = os.environ.get(  # type: ignore[assignment]
+    "MODERATION_ENGINE", "agent"
+)
 
 
+@instrumented("moderation")
 def moderate_review(
     review_content: str,
     rating: int,
     product_data: Dict[str, Any],
     image: Optional[PILImage] = None,
+    structured_mode: StructuredMode = DEFAULT_STRUCTURED_MODE,
+    engine: ModerationEngine = DEFAULT_ENGINE,
 ) -> Dict[str, Any]:
     """
     리뷰를 종합적으로 검수하는 메인 함수
@@ -104,68 +152,241 @@ def moderate_review(
         rating (int): 별점 (1-5)
         product_data (Dict[str, Any]): name(제품명), category(카테고리) 등 제품 정보
         image (Optional[PILImage]): 업로드된 이미지 (PIL Image 객체)
+        structured_mode (StructuredMode): 구조화 출력 방식 (single: 최종 응답을 로컬 검증, two_pass: 기존 방식)
+        engine (ModerationEngine): 검수 실행 방식 (agent: 통합 Agent, parallel: 검사 병렬 실행)
 
     Returns:
-        Dict[str, Any]: 검수 결과
+        Dict[str, Any]: 검수 결과 (통합 Agent 모델을 쓸 수 없으면 로컬 검사만 반영한 결과, degraded=True)
     """
-    image_path = None
-    if image:
-        image_path = save_image(image)
-
-    # 통합 검수 Agent 생성
-    unified_moderator = Agent(
-        model="apac.anthropic.claude-3-haiku-20240307-v1:0",
-        tools=[check_profanity, check_rating_consistency, check_image_product_match],
-        system_prompt=UNIFIED_MODERATOR_PROMPT,
+    cache_key, cached = _lookup(review_content, rating, product_data, image)
+    if cached is not None:
+        return cached
+
+    image_ref = _hand_off(image) if image else None
+    try:
+        if engine == "parallel":
+            moderated_result, raw_response, model_calls = run_parallel_checks(
+                review_content, rating, product_data, image_ref
+            )
+            return _finalize(cache_key, moderated_result, raw_response, model_calls)
+
+        user_prompt = _user_prompt(review_content, rating, product_data, image_ref)
+
+        # 통합 검수 Agent (풀에서 재사용)
+        with default_pool.checkout(
+            MODEL_ID, UNIFIED_MODERATOR_PROMPT, MODERATION_TOOLS
+        ) as unified_moderator:
+            # 통합 검수 Agent 실행 및 구조화 (single 모드에서는 검증 실패 시에만 structured_output 추가 호출)
+            moderated_result, raw_response, model_calls = invoke_structured(
+                unified_moderator,
+                user_prompt,
+                ReviewModerationResult,
+                STRUCTURED_PROMPT,
+                mode=structured_mode,
+                label="moderation",
+            )
+    except UNAVAILABLE_ERRORS as e:
+        return _degraded(review_content, product_data, image_ref, e)
+    finally:
+        if image_ref:
+            release_image(image_ref)
+
+    return _finalize(cache_key, moderated_result, raw_response, model_calls)
+
+
+@instrumented("moderation")
+async def moderate_review_async(
+    review_content: str,
+    rating: int,
+    product_data: Dict[str, Any],
+    image: Optional[PILImage] = None,
+    structured_mode: StructuredMode = DEFAULT_STRUCTURED_MODE,
+    engine: ModerationEngine = DEFAULT_ENGINE,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+) -> Dict[str, Any]:
+    """
+    moderate_review 의 비동기 버전
+
+    - agent 엔진: 통합 Agent 호출 전체가 하나의 동시 호출 슬롯과 timeout(초)을 사용합니다
+      (통합 Agent가 부르는 도구는 Agent 내부에서 실행되므로 슬롯을 따로 잡지 않습니다)
+    - parallel 엔진: 검사별 모델 호출이 각각 슬롯과 timeout을 사용하고, 전체도 timeout 안에 끝나야 합니다
+
+    시간 초과 시 asyncio.TimeoutError가 발생하며, 진행 중이던 Agent는 풀에 반환되지 않습니다.
+    모델을 쓸 수 없을 때는 moderate_review 와 같이 로컬 검사만 반영한 결과(degraded=True)를 반환합니다.
+    """
+    cache_key, cached = _lookup(review_content, rating, product_data, image)
+    if cached is not None:
+        return cached
+
+    image_ref = await asyncio.to_thread(_hand_off, image) if image else None
+    try:
+        if engine == "parallel":
+            moderated_result, raw_response, model_calls = await asyncio.wait_for(
+                run_parallel_checks_async(
+                    review_content, rating, product_data, image_ref, timeout
+                ),
+                timeout,
+            )
+            return _finalize(cache_key, moderated_result, raw_response, model_calls)
+
+        user_prompt = _user_prompt(review_content, rating, product_data, image_ref)
+
+        async def invoke():
+            with default_pool.checkout(
+                MODEL_ID, UNIFIED_MODERATOR_PROMPT, MODERATION_TOOLS
+            ) as unified_moderator:
+                return await invoke_structured_async(
+                    unified_moderator,
+                    user_prompt,
+                    ReviewModerationResult,
+                    STRUCTURED_PROMPT,
+                    mode=structured_mode,
+                    label="moderation",
+                )
+
+        moderated_result, raw_response, model_calls = await run_limited(invoke, timeout)
+    except UNAVAILABLE_ERRORS as e:
+        return await asyncio.to_thread(_degraded, review_content, product_data, image_ref, e)
+    finally:
+        if image_ref:
+            release_image(image_ref)
+
+    return _finalize(cache_key, moderated_result, raw_response, model_calls)
+
+
+def _lookup(
+    review_content: str,
+    rating: int,
+    product_data: Dict[str, Any],
+    image: Optional[PILImage],
+) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """캐시 키를 만들고 캐시된 검수 결과가 있으면 함께 반환합니다."""
+    cache_key = make_cache_key(
+        "moderation",
+        review_content,
+        model_id=CACHE_MODEL_ID,
+        prompt_version=PROMPT_VERSION,
+        rating=rating,
+        product_data=product_data,
+        image_hash=image_fingerprint(image),
     )
+    cached = lookup_result(cache_key)
+    if cached is None:
+        return cache_key, None
+    return cache_key, {
+        **cached,
+        "moderation_result": ReviewModerationResult.model_validate(
+            cached["moderation_result"]
+        ),
+    }
+
 
-    # user prompt 생성
-    user_prompt = USER_PROMPT_TEMPLATE.substitute(
+def _user_prompt(
+    review_content: str,
+    rating: int,
+    product_data: Dict[str, Any],
+    image_ref: Optional[str],
+) -> str:
+    """통합 검수 Agent에 전달할 user prompt 생성"""
+    return USER_PROMPT_TEMPLATE.substitute(
         review_content=review_content,
         rating=rating,
         product=product_data.get("name", "Unknown"),
         category=product_data.get("category", "알수없음"),
-        has_image="있음" if image else "없음",
-        image_path=image_path if image_path else "없음",
+        has_image="있음" if image_ref else "없음",
+        image_ref=image_ref if image_ref else NO_IMAGE_REF,
     )
 
-    # 통합 검수 Agent 실행
-    unified_response = unified_moderator(user_prompt)
 
-    # Structured Output
-    moderated_result = unified_moderator.structured_output(
-        ReviewModerationResult, "모델의 종합적인 리뷰 검수 결과를 구조화합니다."
-    )
+def _hand_off(image: PILImage) -> str:
+    """
+    이미지를 전처리(축소/재인코딩/지각 해시)해 메모리에 등록하고 검사 도구에 넘길 참조를 반환합니다.
+
+    PERSIST_REVIEW_IMAGES 가 켜져 있으면 같은 바이트를 백그라운드에서 디스크에도 저장합니다.
+    """
+    encoded = preprocess_image(image)
+    if PERSIST_REVIEW_IMAGES:
+        persist_in_background(encoded)
+    return register_image(encoded)
+
+
+def _finalize(
+    cache_key: str,
+    moderated_result: ReviewModerationResult,
+    raw_response: str,
+    model_calls: int,
+) -> Dict[str, Any]:
+    """
+    검수 결과를 캐시에 저장하고 반환 형식으로 만듭니다.
+
+    검사 도구 중 하나라도 모델을 쓸 수 없어 SKIP/로컬 결과로 대체됐다면 캐시에 저장하지 않습니다.
+    """
+    call = current_call()
+    degraded = call is not None and call.any_degraded
+    if not degraded:
+        store_result(
+            cache_key,
+            {
+                "success": True,
+                "moderation_result": moderated_result.model_dump(),
+                "raw_response": raw_response,
+                "model_calls": model_calls,
+            },
+        )
+
+    response = {
+        "success": True,
+        "moderation_result": moderated_result,
+        "raw_response": raw_response,
+        "model_calls": model_calls,
+    }
+    if degraded:
+        response["degraded"] = True
+    return response
 
+
+def _degraded(
+    review_content: str,
+    product_data: Dict[str, Any],
+    image_ref: Optional[str],
+    error: BaseException,
+) -> Dict[str, Any]:
+    """
+    throttling/서킷 차단으로 통합 검수 Agent를 호출할 수 없을 때의 결과
+
+    로컬 비속어 사전과 이미지 판정 캐시로 가능한 검사만 반영하고 나머지는 SKIP 으로 둡니다.
+    모델 검사가 빠진 결과이므로 캐시에 저장하지 않습니다.
+    """
+    record_degraded("moderation", error)
+    moderated_result, raw_response, _ = aggregate_checks(
+        degraded_outputs(review_content, product_data, image_ref, error), has_image=bool(image_ref)
+    )
     return {
         "success": True,
         "moderation_result": moderated_result,
-        "raw_response": str(unified_response),
+        "raw_response": raw_response,
+        "model_calls": 0,
+        "degraded": True,
     }
 
 
 def save_image(
-    image: PILImage, images_folder: str = "lab03_review_moderator/images"
+    image: PILImage, images_folder: str = DEFAULT_IMAGES_FOLDER
 ) -> str:
     """
-    이미지를 images 폴더에 저장하고 경로를 반환합니다.
+    이미지를 images 폴더의 내용 주소 저장소에 저장하고 경로를 반환합니다.
+
+    같은 이미지는 한 번만 저장되며(SHA-256 샤드 경로), 저장소 크기/보관 기간 설정에 따라
+    오래된 이미지는 자동으로 정리됩니다.
 
     Args:
         image (PILImage): 저장할 PIL Image 객체
-        images_folder (str): 저장할 폴더 경로 (기본값: "images")
+        images_folder (str): 저장할 폴더 경로 (기본값: "lab03_review_moderator/images")
 
     Returns:
         str: 저장된 이미지의 경로
     """
-    os.makedirs(images_folder, exist_ok=True)
-
     image_format = image.format if image.format else "PNG"
-    extension = image_format.lower()
-
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-    filename = f"review_image_{timestamp}.{extension}"
-    filepath = os.path.join(images_folder, filename)
-
-    image.save(filepath, format=image_format)
-
-    return filepath
\ No newline at end of file
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format)
+    return get_image_store(images_folder).put(buffer.getvalue(), image_format.lower())
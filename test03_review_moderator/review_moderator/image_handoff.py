@@ -0,0 +1,102 @@
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+
+from PIL import Image
+
+from review_common.concurrency import get_max_concurrency
+
+from .image_preprocess import EncodedImage, preprocess_image
+from .image_store import DEFAULT_IMAGES_FOLDER, get_image_store
+
+logger = logging.getLogger(__name__)
+
+# 메모리로 전달하는 이미지 참조의 접두사 (도구 인자로는 문자열만 넘길 수 있으므로 참조 문자열을 사용합니다)
+MEMORY_SCHEME = "mem://"
+# 이미지가 없을 때 통합 검수 프롬프트에 넣는 참조 값
+NO_IMAGE_REF = "없음"
+
+# 처리 중인 이미지를 보관하는 최소 개수 (실제 한도는 동시 호출 한도의 2배와 비교해 큰 값)
+# 등록된 참조는 검수가 끝나 release 될 때까지 제거하지 않고, 한도에 닿으면 새 등록이 자리가 날 때까지 기다립니다
+MAX_REGISTERED_IMAGES = int(os.environ.get("IMAGE_HANDOFF_MAX_ENTRIES", "256"))
+
+# 업로드 이미지를 디스크에도 남길지 여부 (기본값: 남기지 않음, 저장은 백그라운드에서 수행)
+PERSIST_REVIEW_IMAGES = os.environ.get("PERSIST_REVIEW_IMAGES", "0") == "1"
+
+
+_lock = threading.Lock()
+_released = threading.Condition(_lock)
+_registry: Dict[str, EncodedImage] = {}
+
+
+def registry_capacity() -> int:
+    """동시에 등록해 둘 수 있는 이미지 수 (동시 호출 한도의 2배 = CLI가 동시에 처리하는 리뷰 수 이상)"""
+    return max(MAX_REGISTERED_IMAGES, 2 * get_max_concurrency())
+
+
+def register_image(encoded: EncodedImage) -> str:
+    """
+    인코딩된 이미지를 메모리에 등록하고 도구에 넘길 참조 문자열(mem://...)을 반환합니다.
+
+    검수 중인 참조는 지우지 않으므로, 한도만큼 등록되어 있으면 다른 검수가 release 할 때까지 기다립니다.
+    """
+    # 같은 이미지가 동시에 검수될 수 있으므로 등록할 때마다 새 참조를 만듭니다 (바이트는 공유)
+    ref = f"{MEMORY_SCHEME}{uuid.uuid4().hex}"
+    with _released:
+        _released.wait_for(lambda: len(_registry) < registry_capacity())
+        _registry[ref] = encoded
+    return ref
+
+
+def release_image(ref: str) -> None:
+    """검수가 끝난 이미지 참조를 메모리에서 제거합니다."""
+    with _released:
+        if _registry.pop(ref, None) is not None:
+            _released.notify()
+
+
+def resolve_image(ref: Optional[str]) -> Optional[EncodedImage]:
+    """
+    참조 문자열로 이미지 바이트를 찾습니다.
+
+    - mem://... : 메모리에 등록된 이미지 (전처리를 마친 바이트를 그대로 사용)
+    - 그 밖의 문자열: 기존 호환용 이미지 파일 경로 (읽어서 전처리)
+
+    Returns:
+        Optional[EncodedImage]: 이미지 (참조가 비었거나 찾을 수 없으면 None)
+    """
+    if not ref:
+        return None
+    if ref.startswith(MEMORY_SCHEME):
+        with _lock:
+            return _registry.get(ref)
+    if not os.path.exists(ref):
+        return None
+    with Image.open(ref) as image:
+        return preprocess_image(image)
+
+
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-writer")
+
+
+def persist_in_background(
+    encoded: EncodedImage, images_folder: str = DEFAULT_IMAGES_FOLDER
+) -> Future:
+    """
+    이미 인코딩된 바이트를 백그라운드 스레드에서 이미지 저장소에 저장합니다. (재인코딩 없음)
+
+    Returns:
+        Future: 저장된 파일 경로를 결과로 갖는 Future
+    """
+    future = _writer.submit(get_image_store(images_folder).put, encoded.data, encoded.format)
+    future.add_done_callback(_log_failure)
+    return future
+
+
+def _log_failure(future: Future) -> None:
+    error = future.exception()
+    if error is not None:
+        logger.warning("리뷰 이미지 저장 실패: %s", error)
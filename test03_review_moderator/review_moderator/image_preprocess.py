@@ -0,0 +1,159 @@
+import hashlib
+import io
+import os
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image
+from PIL.Image import Image as PILImage
+
+# 비전 모델에 보내는 이미지 크기 기준
+# Claude 비전 입력은 대략 (가로 x 세로) / 750 토큰을 사용하므로 토큰 예산에 맞춰 축소합니다
+IMAGE_TOKEN_BUDGET = int(os.environ.get("IMAGE_TOKEN_BUDGET", "1600"))
+MAX_IMAGE_EDGE = int(os.environ.get("MAX_IMAGE_EDGE", "1568"))
+PIXELS_PER_TOKEN = 750
+
+# 재인코딩 형식과 품질 (WEBP 또는 JPEG)
+IMAGE_OUTPUT_FORMAT = os.environ.get("IMAGE_OUTPUT_FORMAT", "WEBP").upper()
+IMAGE_OUTPUT_QUALITY = int(os.environ.get("IMAGE_OUTPUT_QUALITY", "85"))
+
+# Bedrock 이미지 content block이 지원하는 형식 (PIL format -> Bedrock format)
+SUPPORTED_FORMATS = {"PNG": "png", "JPEG": "jpeg", "GIF": "gif", "WEBP": "webp"}
+
+# dHash 해밍 거리가 이 값 이하이면 같은 이미지로 봅니다 (64비트 기준)
+NEAR_DUPLICATE_DISTANCE = int(os.environ.get("IMAGE_DUPLICATE_DISTANCE", "5"))
+
+
+@dataclass(frozen=True)
+class EncodedImage:
+    """전처리를 마친 이미지 바이트와 형식, 지각 해시 (검사 Agent에 그대로 전달)"""
+
+    data: bytes
+    format: str
+    phash: Optional[int] = None
+
+    @property
+    def digest(self) -> str:
+        return hashlib.sha256(self.data).hexdigest()
+
+    def as_content_block(self) -> Dict[str, Any]:
+        """Strands/Bedrock 이미지 content block"""
+        return {"image": {"format": self.format, "source": {"bytes": self.data}}}
+
+
+def target_size(width: int, height: int) -> Tuple[int, int]:
+    """토큰 예산과 최대 변 길이를 넘지 않도록 비율을 유지한 크기를 계산합니다."""
+    scale = min(
+        1.0,
+        MAX_IMAGE_EDGE / max(width, height),
+        (IMAGE_TOKEN_BUDGET * PIXELS_PER_TOKEN / (width * height)) ** 0.5,
+    )
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def dhash(image: PILImage, hash_size: int = 8) -> int:
+    """
+    차이 해시(dHash): 흑백 (hash_size+1) x hash_size 로 줄인 뒤 가로로 이웃한 픽셀의 밝기 비교
+
+    크기 조정/재인코딩/약간의 색 보정에는 거의 변하지 않아 중복 이미지 판별에 사용합니다.
+    """
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+    pixels = list(small.getdata())
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def preprocess_image(image: PILImage) -> EncodedImage:
+    """
+    비전 모델 입력용으로 이미지를 정규화합니다.
+
+    - 애니메이션 이미지는 첫 프레임만 사용합니다 (호출자의 이미지 프레임 위치는 바꾸지 않습니다)
+    - 토큰 예산(IMAGE_TOKEN_BUDGET)과 최대 변 길이(MAX_IMAGE_EDGE)에 맞춰 축소합니다
+    - IMAGE_OUTPUT_FORMAT(WEBP/JPEG) 형식으로 한 번만 인코딩합니다
+    - 중복 판별용 dHash를 함께 계산합니다
+    """
+    if getattr(image, "is_animated", False):
+        frame = image.tell()
+        image.seek(0)
+        first_frame = image.copy()
+        image.seek(frame)
+        image = first_frame
+    phash = dhash(image)
+
+    size = target_size(*image.size)
+    if size != image.size:
+        image = image.resize(size, Image.Resampling.LANCZOS)
+
+    pil_format = IMAGE_OUTPUT_FORMAT if IMAGE_OUTPUT_FORMAT in ("WEBP", "JPEG") else "WEBP"
+    if pil_format == "JPEG" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    elif image.mode not in ("RGB", "RGBA", "L"):
+        image = image.convert("RGBA")
+    buffer = io.BytesIO()
+    image.save(buffer, format=pil_format, quality=IMAGE_OUTPUT_QUALITY)
+    return EncodedImage(data=buffer.getvalue(), format=SUPPORTED_FORMATS[pil_format], phash=phash)
+
+
+class ImageVerdictCache:
+    """
+    제품별 이미지-제품 매칭 결과 캐시 (지각 해시로 비슷한 이미지까지 찾음)
+
+    - 키: 제품 정보(+ 프롬프트/모델 버전) -> [(dHash, 검사 결과)]
+    - 해밍 거리가 max_distance 이하인 이미지가 있으면 그 결과를 재사용합니다
+    - 제품 수(max_products)와 제품별 이미지 수(max_per_product)를 넘으면 오래된 것부터 제거합니다
+    """
+
+    def __init__(
+        self,
+        max_products: int = 1024,
+        max_per_product: int = 64,
+        max_distance: int = NEAR_DUPLICATE_DISTANCE,
+    ):
+        self.max_products = max_products
+        self.max_per_product = max_per_product
+        self.max_distance = max_distance
+        self.stats: Counter = Counter()
+        self._entries: "OrderedDict[str, List[Tuple[int, Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, product_key: str, phash: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entries = self._entries.get(product_key, [])
+            best = min(
+                ((hamming_distance(phash, cached), verdict) for cached, verdict in entries),
+                key=lambda item: item[0],
+                default=None,
+            )
+            if best is None or best[0] > self.max_distance:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(product_key)
+            self.stats["hits"] += 1
+            return dict(best[1])
+
+    def put(self, product_key: str, phash: int, verdict: Dict[str, Any]) -> None:
+        with self._lock:
+            entries = self._entries.setdefault(product_key, [])
+            entries.append((phash, dict(verdict)))
+            del entries[: -self.max_per_product]
+            self._entries.move_to_end(product_key)
+            while len(self._entries) > self.max_products:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# 이미지 매칭 도구가 함께 사용하는 기본 캐시
+verdict_cache = ImageVerdictCache()
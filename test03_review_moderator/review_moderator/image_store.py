@@ -0,0 +1,239 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 이미지 저장소 기본 설정 (환경 변수로 조정 가능)
+DEFAULT_IMAGES_FOLDER = "lab03_review_moderator/images"
+DEFAULT_MAX_BYTES = int(os.environ.get("IMAGE_STORE_MAX_BYTES", str(1024 * 1024 * 1024)))
+DEFAULT_MAX_AGE_SECONDS = float(os.environ.get("IMAGE_STORE_MAX_AGE_DAYS", "30")) * 86400
+DEFAULT_COMPACTION_INTERVAL = float(os.environ.get("IMAGE_STORE_COMPACT_SECONDS", "600"))
+
+# 쓰다 만 임시 파일은 이 시간(초)이 지나면 정리합니다
+STALE_TEMP_SECONDS = 3600
+TEMP_SUFFIX = ".tmp"
+
+HEX_DIGITS = frozenset("0123456789abcdef")
+
+
+class ImageStore:
+    """
+    SHA-256 내용 주소 기반 이미지 저장소
+
+    - 파일 경로: <root>/<해시 앞 2자리>/<다음 2자리>/<해시>.<확장자> (디렉터리당 파일 수를 제한)
+    - 같은 이미지는 한 번만 저장하고, 다시 저장하면 접근 시각(mtime)만 갱신합니다
+    - 전체 크기가 max_bytes를 넘거나 max_age_seconds 동안 쓰이지 않은 파일은 오래된 것부터 제거합니다
+    - 백그라운드 정리(compaction) 스레드가 주기적으로 만료 파일/빈 디렉터리/임시 파일을 정리합니다
+    - 크기 계산과 정리는 저장소가 만든 샤드 디렉터리 안에서만 하므로, 루트에 있는 예전 파일이나
+      다른 폴더는 건드리지 않습니다
+    """
+
+    def __init__(
+        self,
+        root: str = DEFAULT_IMAGES_FOLDER,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+        compaction_interval: float = DEFAULT_COMPACTION_INTERVAL,
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.compaction_interval = compaction_interval
+        self.stats: Counter = Counter()
+        self._total_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def path_for(self, digest: str, extension: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:4], f"{digest}.{extension}")
+
+    def put(self, data: bytes, extension: str) -> str:
+        """
+        이미지 바이트를 저장하고 경로를 반환합니다.
+
+        Args:
+            data (bytes): 인코딩된 이미지 바이트
+            extension (str): 파일 확장자 (png, webp 등)
+
+        Returns:
+            str: 저장된 이미지의 경로
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest, extension.lower())
+        with self._lock:
+            if os.path.exists(path):
+                os.utime(path)
+                self.stats["deduplicated"] += 1
+                return path
+
+            total = self._current_total() + len(data)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 임시 파일에 쓴 뒤 이름을 바꿔 읽는 쪽이 쓰다 만 파일을 보지 않도록 합니다
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=TEMP_SUFFIX)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self.stats["stored"] += 1
+            self._total_bytes = total
+
+        if total > self.max_bytes:
+            self.compact()
+        self.start_compaction()
+        return path
+
+    def compact(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        만료/초과 파일을 제거하고 빈 샤드 디렉터리와 오래된 임시 파일을 정리합니다.
+
+        디렉터리 탐색은 lock 없이 수행하므로 정리 중에도 저장(put)이 막히지 않습니다.
+
+        Returns:
+            Dict[str, int]: 제거한 파일 수와 정리 후 전체 크기
+        """
+        now = time.time() if now is None else now
+        files = self._scan()
+        total = sum(size for _, _, size in files)
+        removed = 0
+
+        # 오래 쓰이지 않은 파일부터 (mtime 오름차순)
+        for mtime, path, size in sorted(files):
+            expired = now - mtime > self.max_age_seconds
+            if not expired and total <= self.max_bytes:
+                break
+            with self._lock:
+                try:
+                    # 탐색 이후 다시 저장(접근)된 파일은 남겨 둡니다
+                    if os.stat(path).st_mtime != mtime:
+                        continue
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+                total -= size
+                removed += 1
+                if self._total_bytes is not None:
+                    self._total_bytes -= size
+                self.stats["evicted"] += 1
+
+        self._remove_stale_temp_files(now)
+        self._remove_empty_dirs()
+        return {"removed": removed, "total_bytes": total}
+
+    def start_compaction(self) -> None:
+        """백그라운드 정리 스레드를 (아직 없으면) 시작합니다."""
+        if self._compactor is not None or self.compaction_interval <= 0:
+            return
+        with self._lock:
+            if self._compactor is not None:
+                return
+            self._compactor = threading.Thread(
+                target=self._compaction_loop, name="image-store-compactor", daemon=True
+            )
+            self._compactor.start()
+
+    def stop_compaction(self) -> None:
+        self._stop.set()
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._current_total()
+
+    def _compaction_loop(self) -> None:
+        while not self._stop.wait(self.compaction_interval):
+            try:
+                self.compact()
+            except OSError as e:
+                logger.warning("이미지 저장소 정리 실패: %s", e)
+
+    def _current_total(self) -> int:
+        """전체 크기 (처음 한 번만 디렉터리를 훑습니다, lock 보유 상태에서 호출)"""
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, _, size in self._scan())
+        return self._total_bytes
+
+    def _scan(self) -> List[Tuple[float, str, int]]:
+        """(mtime, 경로, 크기) 목록 (임시 파일 제외)"""
+        files = []
+        for dirpath in self._shard_dirs():
+            for filename in _list_files(dirpath):
+                if filename.endswith(TEMP_SUFFIX):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, path, stat.st_size))
+        return files
+
+    def _remove_stale_temp_files(self, now: float) -> None:
+        for dirpath in self._shard_dirs():
+            for filename in _list_files(dirpath):
+                if not filename.endswith(TEMP_SUFFIX):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    if now - os.stat(path).st_mtime > STALE_TEMP_SECONDS:
+                        os.remove(path)
+                except FileNotFoundError:
+                    continue
+
+    def _remove_empty_dirs(self) -> None:
+        """비어 있는 샤드 디렉터리를 안쪽(<2자리>/<2자리>)부터 지웁니다."""
+        for top in _list_shards(self.root):
+            top_path = os.path.join(self.root, top)
+            for dirpath in [os.path.join(top_path, sub) for sub in _list_shards(top_path)] + [top_path]:
+                try:
+                    if not os.listdir(dirpath):
+                        os.rmdir(dirpath)
+                except OSError:
+                    continue
+
+    def _shard_dirs(self) -> List[str]:
+        """저장소가 만든 샤드 디렉터리 (<root>/<해시 앞 2자리>/<다음 2자리>) 목록"""
+        return [
+            os.path.join(self.root, top, sub)
+            for top in _list_shards(self.root)
+            for sub in _list_shards(os.path.join(self.root, top))
+        ]
+
+
+def _list_shards(path: str) -> List[str]:
+    """path 바로 아래의 샤드 디렉터리 이름 (소문자 16진수 2자리)"""
+    try:
+        with os.scandir(path) as entries:
+            return [
+                entry.name
+                for entry in entries
+                if len(entry.name) == 2 and set(entry.name) <= HEX_DIGITS and entry.is_dir()
+            ]
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
+def _list_files(path: str) -> List[str]:
+    try:
+        with os.scandir(path) as entries:
+            return [entry.name for entry in entries if entry.is_file()]
+    except FileNotFoundError:
+        return []
+
+
+_stores: Dict[str, ImageStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_image_store(root: str = DEFAULT_IMAGES_FOLDER) -> ImageStore:
+    """폴더별로 하나의 저장소 인스턴스를 공유합니다."""
+    key = os.path.abspath(root)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = ImageStore(root)
+        return store
@@ -0,0 +1,50 @@
+from typing import List, Literal
+
+from pydantic import BaseModel, Field
+
+
+class CheckResult(BaseModel):
+    """개별 검사 결과"""
+
+    status: Literal["PASS", "FAIL", "SKIP"] = Field(description="검사 상태")
+    reason: str = Field(description="구체적인 판단 근거 (필수)")
+    confidence: float = Field(ge=0.0, le=1.0, description="신뢰도 (0.0-1.0)")
+
+
+class ReviewModerationResult(BaseModel):
+    """리뷰 모더레이션 분석 결과"""
+
+    profanity_check: CheckResult = Field(description="욕설/비속어 검사 결과")
+    rating_consistency: CheckResult = Field(description="평점-내용 일치성 검사 결과")
+    image_match: CheckResult = Field(description="이미지-내용 일치성 검사 결과")
+    overall_status: Literal["PASS", "FAIL"] = Field(description="전체 검수 통과 여부")
+    failed_checks: List[str] = Field(description="실패한 검사 항목 리스트")
+
+
+class ProfanityCheckOutput(BaseModel):
+    """욕설/비속어 검사 Agent 응답"""
+
+    is_appropriate: bool = Field(description="적절한 리뷰인지 여부")
+    confidence: float = Field(description="신뢰도 (0.0-1.0)")
+    detected_issues: List[str] = Field(default_factory=list, description="감지된 문제점들")
+    severity: str = Field(default="", description="심각도 (low/medium/high)")
+    reason: str = Field(default="", description="판단 근거")
+
+
+class ImageMatchOutput(BaseModel):
+    """이미지-제품 일치성 검사 Agent 응답"""
+
+    is_related: bool = Field(description="이미지와 제품이 관련 있는지 여부")
+    confidence: float = Field(description="신뢰도 (0.0-1.0)")
+    reason: str = Field(default="", description="판단 근거")
+    detected_objects: List[str] = Field(default_factory=list, description="이미지에서 감지된 주요 객체들")
+
+
+class RatingConsistencyOutput(BaseModel):
+    """평점-내용 일치성 검사 Agent 응답"""
+
+    content_sentiment: Literal["positive", "negative", "neutral"] = Field(description="리뷰 내용의 감정")
+    sentiment_confidence: float = Field(description="감정 판단 신뢰도 (0.0-1.0)")
+    is_consistent: bool = Field(description="평점과 내용이 일치하는지 여부")
+    reason: str = Field(default="", description="판단 근거")
+    detected_emotions: List[str] = Field(default_factory=list, description="감지된 감정이나 표현들")
@@ -0,0 +1,221 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from review_common.concurrency import DEFAULT_TIMEOUT
+from review_common.metrics import propagate
+from review_common.response_parser import load_json_object
+
+from .models import CheckResult, ReviewModerationResult
+from .tools import (
+    check_image_product_match,
+    check_image_product_match_async,
+    check_profanity,
+    check_profanity_async,
+    check_rating_consistency,
+    check_rating_consistency_async,
+)
+
+
+def run_parallel_checks(
+    review_content: str,
+    rating: int,
+    product_data: Dict[str, Any],
+    image_ref: Optional[str],
+) -> Tuple[ReviewModerationResult, str, int]:
+    """
+    세 가지 검수를 동시에 실행하고 결과를 코드에서 종합합니다. (통합 Agent의 추가 LLM 턴 없음)
+
+    - 이미지가 없으면 image_match는 모델 호출 없이 SKIP 처리합니다
+    - overall_status는 FAIL인 검사가 하나라도 있으면 FAIL 입니다
+
+    Args:
+        review_content (str): 리뷰 내용
+        rating (int): 별점 (1-5)
+        product_data (Dict[str, Any]): 제품 정보
+        image_ref (Optional[str]): 이미지 참조 (mem://... 또는 파일 경로)
+
+    Returns:
+        Tuple[ReviewModerationResult, str, int]: (검수 결과, 검사별 원본 응답 JSON, 모델 호출 수)
+    """
+    # 각 검사의 메트릭이 moderate_review 호출의 하위 도구 호출로 기록되도록 컨텍스트를 복사해 실행합니다
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        profanity_future = executor.submit(propagate(check_profanity), review_content)
+        rating_future = executor.submit(
+            propagate(check_rating_consistency), rating, review_content
+        )
+        image_future = (
+            executor.submit(propagate(check_image_product_match), image_ref, product_data)
+            if image_ref
+            else None
+        )
+        outputs = {
+            "profanity_check": profanity_future.result(),
+            "rating_consistency": rating_future.result(),
+            "image_match": image_future.result() if image_future else None,
+        }
+
+    return aggregate_checks(outputs, has_image=image_future is not None)
+
+
+async def run_parallel_checks_async(
+    review_content: str,
+    rating: int,
+    product_data: Dict[str, Any],
+    image_ref: Optional[str],
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+) -> Tuple[ReviewModerationResult, str, int]:
+    """
+    run_parallel_checks 의 비동기 버전 (스레드 대신 asyncio.gather 로 동시에 실행)
+
+    각 검사의 모델 호출은 전역 동시 호출 세마포어 안에서 timeout(초) 제한을 받습니다.
+    한 검사가 실패하거나 취소되면 나머지 검사도 취소됩니다.
+    """
+    calls = [
+        check_profanity_async(review_content, timeout),
+        check_rating_consistency_async(rating, review_content, timeout),
+    ]
+    if image_ref:
+        calls.append(check_image_product_match_async(image_ref, product_data, timeout))
+
+    tasks = [asyncio.ensure_future(call) for call in calls]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    outputs = {
+        "profanity_check": results[0],
+        "rating_consistency": results[1],
+        "image_match": results[2] if image_ref else None,
+    }
+    return aggregate_checks(outputs, has_image=bool(image_ref))
+
+
+def aggregate_checks(
+    outputs: Dict[str, Any], has_image: bool
+) -> Tuple[ReviewModerationResult, str, int]:
+    """검사별 도구 응답을 종합해 (검수 결과, 원본 응답 JSON, 모델 호출 수)를 만듭니다."""
+    checks = {
+        "profanity_check": to_profanity_check(outputs["profanity_check"]),
+        "rating_consistency": to_rating_consistency_check(outputs["rating_consistency"]),
+        "image_match": (
+            to_image_match_check(outputs["image_match"])
+            if has_image
+            else CheckResult(status="SKIP", reason="업로드된 이미지가 없습니다.", confidence=1.0)
+        ),
+    }
+    failed_checks = [name for name, check in checks.items() if check.status == "FAIL"]
+    result = ReviewModerationResult(
+        **checks,
+        overall_status="FAIL" if failed_checks else "PASS",
+        failed_checks=failed_checks,
+    )
+
+    raw_response = json.dumps(
+        {
+            name: load_check_json(output) or _raw_text(output)
+            for name, output in outputs.items()
+        },
+        ensure_ascii=False,
+    )
+    model_calls = sum(_model_calls(output) for output in outputs.values())
+    return result, raw_response, model_calls
+
+
+def to_profanity_check(output: Any) -> CheckResult:
+    """check_profanity 응답을 CheckResult로 변환합니다."""
+    data = load_check_json(output)
+    if data is not None and data.get("status") in ("SKIP", "ERROR"):
+        return _skipped(data)
+    if data is None or "is_appropriate" not in data:
+        return _unreadable(output)
+    issues = data.get("detected_issues") or []
+    reason = data.get("reason", "")
+    if issues and not data["is_appropriate"]:
+        reason = f"{reason} (감지: {', '.join(map(str, issues))})"
+    return CheckResult(
+        status="PASS" if data["is_appropriate"] else "FAIL",
+        reason=reason or "판단 근거 없음",
+        confidence=_confidence(data.get("confidence")),
+    )
+
+
+def to_rating_consistency_check(output: Any) -> CheckResult:
+    """check_rating_consistency 응답을 CheckResult로 변환합니다."""
+    data = load_check_json(output)
+    if data is not None and data.get("status") in ("SKIP", "ERROR"):
+        return _skipped(data)
+    if data is None or "is_consistent" not in data:
+        return _unreadable(output)
+    return CheckResult(
+        status="PASS" if data["is_consistent"] else "FAIL",
+        reason=data.get("reason") or "판단 근거 없음",
+        confidence=_confidence(data.get("sentiment_confidence")),
+    )
+
+
+def to_image_match_check(output: Any) -> CheckResult:
+    """check_image_product_match 응답을 CheckResult로 변환합니다."""
+    data = load_check_json(output)
+    if data is None:
+        return _unreadable(output)
+    if data.get("status") in ("SKIP", "ERROR"):
+        return _skipped(data)
+    if "is_related" not in data:
+        return _unreadable(output)
+    return CheckResult(
+        status="PASS" if data["is_related"] else "FAIL",
+        reason=data.get("reason") or "판단 근거 없음",
+        confidence=_confidence(data.get("confidence")),
+    )
+
+
+def load_check_json(output: Any) -> Optional[Dict[str, Any]]:
+    """도구 응답(dict 또는 Agent 결과)에서 JSON 객체를 꺼냅니다."""
+    if isinstance(output, dict):
+        return output
+    return load_json_object(str(output))
+
+
+def _skipped(data: Dict[str, Any]) -> CheckResult:
+    """이미지 없음/도구 오류/모델 사용 불가로 건너뛴 검사"""
+    return CheckResult(
+        status="SKIP",
+        reason=data.get("reason") or "검사를 수행하지 못했습니다.",
+        confidence=_confidence(data.get("confidence")) if data["status"] == "SKIP" else 0.0,
+    )
+
+
+def _unreadable(output: Any) -> CheckResult:
+    return CheckResult(
+        status="SKIP",
+        reason=f"검사 결과를 해석할 수 없습니다: {_raw_text(output)[:200]}",
+        confidence=0.0,
+    )
+
+
+def _confidence(value: Any) -> float:
+    try:
+        return min(max(float(value), 0.0), 1.0)
+    except (TypeError, ValueError):
+        return 0.5
+
+
+def _raw_text(output: Any) -> str:
+    if output is None:
+        return ""
+    if isinstance(output, dict):
+        return json.dumps(output, ensure_ascii=False)
+    return str(output)
+
+
+def _model_calls(output: Any) -> int:
+    if isinstance(output, dict):
+        # 모델 라우팅을 거친 응답은 단계별 호출 수를 합산해 담고 있습니다 (로컬/캐시 응답은 0)
+        return output.get("model_calls", 0)
+    metrics = getattr(output, "metrics", None)
+    return getattr(metrics, "cycle_count", 0) if metrics is not None else 0
@@ -0,0 +1,318 @@
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from review_common.metrics import default_metrics
+
+# 한글 음절 -> 호환 자모 분해 테이블
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSEONG = [
+    "", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ",
+    "ㄿ", "ㅀ", "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ",
+]
+HANGUL_START, HANGUL_END = 0xAC00, 0xD7A3
+
+# 확실한 욕설/비속어/선정적 표현 (자모 조합/연음 정규화 후 비교하므로 "ㅅㅣ발", "십알" 등 변형도 잡힙니다)
+STRONG_TERMS = [
+    "시발", "씨발", "씨팔", "시팔", "씨벌", "십새", "좆같", "좃같", "병신", "븅신",
+    "개새끼", "개색기", "개세끼", "지랄", "존나", "니애미", "느금마", "엠창",
+    "미친놈", "미친년", "닥쳐", "염병", "섹스", "야동",
+]
+
+# 정상 단어에 욕설 글자가 포함된 경우 (검사 전에 제거)
+ALLOWED_WORDS = ["시발점", "시발역", "병신년"]
+
+# 영문 자판으로 친 한글 욕설과 로마자 표기 (예: tlqkf = 시발)
+ROMANIZED_TERMS = [
+    "sibal", "ssibal", "shibal", "siba", "ssiba", "tlqkf", "qudtls", "wlfkf",
+    "whssk", "fuck", "shit", "bitch",
+]
+
+# 초성만으로 쓰인 욕설 토큰
+CHOSEONG_TERMS = {"ㅅㅂ", "ㅆㅂ", "ㅂㅅ", "ㅄ", "ㅈㄹ", "ㅈㄴ", "ㄲㅈ", "ㅁㅊ", "ㅗ"}
+
+# 문맥에 따라 의미가 달라지는 표현 -> LLM 판단으로 넘깁니다 (예: "미친 음질", "전원이 꺼져요", "씹는 맛")
+AMBIGUOUS_TERMS = [
+    "미친", "미쳤", "쓰레기", "시바", "개같", "뒤져", "죽여", "죽일", "꺼져", "씹",
+    "좆", "졸라", "새끼", "보지", "자지", "혐오", "틀딱", "한남", "김치녀", "벌레",
+    "야하", "19금",
+]
+
+# 조합 후에도 남은 낱자모 중 웃음/울음 표시로 흔히 쓰는 것 (LOCAL_PROFANITY_PASS 판단에서 제외)
+EMOTICON_JAMO = frozenset("ㅋㅎㅠㅜ")
+
+# 스팸/광고성 패턴 -> LLM 판단으로 넘깁니다
+SPAM_PATTERNS = [
+    re.compile(r"https?://|www\.|\.com\b|\.kr\b", re.IGNORECASE),
+    re.compile(r"\d{2,3}[-. ]?\d{3,4}[-. ]?\d{4}"),
+    re.compile(r"카톡|카카오톡|오픈채팅|텔레그램|텔레|라인\s*id|부업|수익|할인\s*코드|광고", re.IGNORECASE),
+]
+
+# 글자 사이에 끼워 넣은 구분 기호/숫자 (예: s-i-b-a, 시.발, 씨1발)
+OBFUSCATION_SEPARATORS = re.compile(r"(?<=\w)[-_.*~!@#$%^&+=|/\\'\"`0-9]+(?=\w)")
+REPEATED_CHARS = re.compile(r"(.)\1+")
+
+# 사전에 걸리지 않은 리뷰의 로컬 PASS 허용 여부 (기본값: 끔)
+# 사전은 위협/폭력, 혐오/차별 표현(검수 기준 3, 4)을 잡지 못하므로 켜면 LLM 호출은 줄지만
+# 그런 리뷰도 PASS 됩니다. 정밀도보다 재현율이 중요한 기본 설정에서는 확실한 FAIL만 로컬에서 끝냅니다.
+LOCAL_PROFANITY_PASS = os.environ.get("LOCAL_PROFANITY_PASS", "0") != "0"
+# LOCAL_PROFANITY_PASS 를 켰을 때 이 길이 이하이면서 아무 신호도 없는 리뷰만 로컬에서 PASS 처리합니다
+MAX_CONFIDENT_PASS_LENGTH = 300
+
+
+def decompose_jamo(text: str) -> str:
+    """한글 음절을 호환 자모로 분해합니다. (예: "시발" -> "ㅅㅣㅂㅏㄹ")"""
+    return "".join("".join(unit) if isinstance(unit, tuple) else unit for unit in _to_units(text))
+
+
+def compose_jamo(text: str, liaison: bool = False) -> str:
+    """
+    낱자모로 풀어 쓴 글자를 음절로 다시 조합합니다. (예: "ㅅㅣㅂㅏㄹ" -> "시발", "씨ㅂㅏㄹ" -> "씨발")
+
+    같은 모음을 늘여 쓴 음절은 하나로 합칩니다. (예: "씨이발" -> "씨발")
+    liaison=True 이면 받침 뒤에 초성 ㅇ이 오는 경우 받침을 다음 음절로 옮깁니다. (예: "십알" -> "시발")
+    """
+    units = []
+    for unit in _to_units(text):
+        previous = units[-1] if units else None
+        if (
+            isinstance(unit, tuple)
+            and isinstance(previous, tuple)
+            and not previous[2]
+            and unit == ("ㅇ", previous[1], "")
+        ):
+            continue
+        units.append(unit)
+    if liaison:
+        for i in range(len(units) - 1):
+            current, following = units[i], units[i + 1]
+            if (
+                isinstance(current, tuple)
+                and isinstance(following, tuple)
+                and current[2]
+                and current[2] in CHOSEONG
+                and following[0] == "ㅇ"
+            ):
+                units[i] = (current[0], current[1], "")
+                units[i + 1] = (current[2], following[1], following[2])
+    return "".join(_compose_unit(unit) for unit in units)
+
+
+def _to_units(text: str) -> List[Any]:
+    """텍스트를 (초성, 중성, 종성) 음절 단위 또는 그 밖의 문자로 나눕니다. 낱자모 조합도 처리합니다."""
+    units: List[Any] = []
+    index = 0
+    while index < len(text):
+        char = text[index]
+        code = ord(char)
+        if HANGUL_START <= code <= HANGUL_END:
+            offset = code - HANGUL_START
+            syllable = [CHOSEONG[offset // 588], JUNGSEONG[(offset % 588) // 28], JONGSEONG[offset % 28]]
+            index += 1
+        elif char in CHOSEONG and index + 1 < len(text) and text[index + 1] in JUNGSEONG:
+            syllable = [char, text[index + 1], ""]
+            index += 2
+        else:
+            units.append(char)
+            index += 1
+            continue
+
+        # 받침 없는 음절 뒤의 낱자음은 뒤에 모음이 오지 않으면 받침으로 붙입니다 (예: "ㅅㅣㅂㅏㄹ")
+        if (
+            not syllable[2]
+            and index < len(text)
+            and text[index] in JONGSEONG
+            and not (index + 1 < len(text) and text[index + 1] in JUNGSEONG)
+        ):
+            syllable[2] = text[index]
+            index += 1
+        units.append(tuple(syllable))
+    return units
+
+
+def _compose_unit(unit: Any) -> str:
+    if not isinstance(unit, tuple):
+        return unit
+    cho, jung, jong = unit
+    return chr(
+        HANGUL_START
+        + (CHOSEONG.index(cho) * 21 + JUNGSEONG.index(jung)) * 28
+        + JONGSEONG.index(jong)
+    )
+
+
+def match_dropped_vowels(token: str, term: str) -> bool:
+    """
+    모음을 빼고 초성만 남긴 음절이 섞인 표기가 term과 일치하는지 비교합니다. (예: "ㅆ발" -> "씨발")
+
+    낱자음은 term 음절의 초성과 같으면 일치로 보고, 초성만으로 된 표기와 구분하도록
+    온전한 음절이 하나 이상 그대로 일치해야 합니다.
+    """
+    units, term_units = _to_units(token), _to_units(term)
+    for start in range(len(units) - len(term_units) + 1):
+        window = units[start : start + len(term_units)]
+        exact = 0
+        for unit, expected in zip(window, term_units):
+            if unit == expected:
+                exact += isinstance(unit, tuple)
+            elif not (isinstance(unit, str) and isinstance(expected, tuple) and unit == expected[0]):
+                break
+        else:
+            if exact and exact < len(term_units):
+                return True
+    return False
+
+
+def leftover_jamo(text: str) -> List[str]:
+    """음절로 조합되지 않고 남은 호환 자모 (웃음/울음 표시 제외)"""
+    return [char for char in text if "\u3131" <= char <= "\u318e" and char not in EMOTICON_JAMO]
+
+
+def normalize_for_screening(text: str) -> str:
+    """전각/호환 문자 통일, 소문자화, 난독화 구분 기호 제거, 반복 문자 축약, 낱자모 조합"""
+    # 호환 자모(ㅅ, ㅂ 등)는 NFKC에서 조합형 자모로 바뀌므로 그대로 둡니다
+    text = "".join(
+        char if "\u3130" <= char <= "\u318f" else unicodedata.normalize("NFKC", char)
+        for char in text
+    ).lower()
+    for word in ALLOWED_WORDS:
+        text = text.replace(word, " ")
+    text = OBFUSCATION_SEPARATORS.sub("", text)
+    text = REPEATED_CHARS.sub(r"\1", text)
+    return compose_jamo(text)
+
+
+@dataclass
+class LocalVerdict:
+    """1단계(로컬 사전) 검사 결과. status가 None이면 LLM 검사가 필요합니다."""
+
+    status: Optional[str]
+    confidence: float
+    reason: str
+    detected: List[str] = field(default_factory=list)
+
+    @property
+    def decided(self) -> bool:
+        return self.status is not None
+
+    def as_tool_response(self) -> Dict[str, Any]:
+        """check_profanity LLM 응답과 같은 형식의 dict"""
+        return {
+            "is_appropriate": self.status == "PASS",
+            "confidence": self.confidence,
+            "detected_issues": self.detected,
+            "severity": "high" if self.status == "FAIL" else "low",
+            "reason": self.reason,
+            "stage": "local",
+        }
+
+
+def screen_profanity(content: str) -> LocalVerdict:
+    """
+    로컬 사전으로 욕설/비속어를 빠르게 판정합니다.
+
+    - 확실한 욕설(낱자모/연음 표기, 난독화, 로마자/초성 표기 포함)이 있으면 FAIL
+    - 문맥 의존 표현이나 스팸 신호가 있으면 판단 보류 (LLM으로 넘김)
+    - 아무 신호가 없는 리뷰도 판단 보류 (LOCAL_PROFANITY_PASS 를 켠 경우에만 짧은 리뷰를 PASS)
+
+    Args:
+        content (str): 리뷰 내용
+
+    Returns:
+        LocalVerdict: 로컬 판정 결과
+    """
+    normalized = normalize_for_screening(content)
+    tokens = normalized.split()
+    # 연음 표기 변형 ("십알" -> "시발") 도 함께 비교합니다
+    variants = tokens + [compose_jamo(token, liaison=True) for token in tokens]
+
+    detected = [term for term in STRONG_TERMS if any(term in token for token in variants)]
+    detected += [
+        term for term in ROMANIZED_TERMS if any(term in token for token in tokens)
+    ]
+    detected += [token for token in tokens if token in CHOSEONG_TERMS]
+    # 구분 기호를 지운 뒤 모음이 빠진 낱자음이 음절 옆에 남은 경우 (예: "ㅆ1발" -> "ㅆ발")
+    detected += [
+        term
+        for term in STRONG_TERMS
+        if any(leftover_jamo(token) and match_dropped_vowels(token, term) for token in tokens)
+    ]
+    if detected:
+        return _record(
+            LocalVerdict(
+                status="FAIL",
+                confidence=0.95,
+                reason="로컬 비속어 사전에서 욕설/비속어 표현이 감지되었습니다.",
+                detected=sorted(set(detected)),
+            )
+        )
+
+    # 띄어쓰기로 쪼갠 욕설 (예: "시 발") 은 정상 문장과 구분이 어려워 LLM 판단으로 넘깁니다
+    squashed = "".join(tokens)
+    squashed_variants = (squashed, compose_jamo(squashed, liaison=True))
+    suspicious = [
+        term
+        for term in STRONG_TERMS + AMBIGUOUS_TERMS
+        if any(term in variant for variant in squashed_variants)
+    ]
+    suspicious += [pattern.pattern for pattern in SPAM_PATTERNS if pattern.search(content)]
+    if suspicious:
+        return _record(
+            LocalVerdict(
+                status=None,
+                confidence=0.0,
+                reason="문맥 판단이 필요한 표현이 있어 LLM 검사가 필요합니다.",
+                detected=suspicious,
+            )
+        )
+    # 조합되지 않은 낱자모가 남아 있으면 사전이 놓친 변형일 수 있어 로컬 PASS 하지 않습니다
+    if (
+        not LOCAL_PROFANITY_PASS
+        or len(content) > MAX_CONFIDENT_PASS_LENGTH
+        or leftover_jamo(normalized)
+    ):
+        return _record(
+            LocalVerdict(
+                status=None,
+                confidence=0.0,
+                reason="로컬 사전으로는 위협/혐오 표현 여부를 확정할 수 없어 LLM 검사가 필요합니다.",
+            )
+        )
+
+    return _record(
+        LocalVerdict(
+            status="PASS",
+            confidence=0.9,
+            reason="로컬 비속어/스팸 사전에서 문제 표현이 발견되지 않았습니다.",
+        )
+    )
+
+
+_stats_lock = threading.Lock()
+_stage_counts: Counter = Counter()
+
+
+def _record(verdict: LocalVerdict) -> LocalVerdict:
+    name = {"PASS": "local_pass", "FAIL": "local_fail"}.get(verdict.status, "escalated")
+    with _stats_lock:
+        _stage_counts[name] += 1
+    return verdict
+
+
+def profanity_stage_stats() -> Dict[str, Any]:
+    """단계별 처리 건수와 LLM 호출을 피한 비율"""
+    with _stats_lock:
+        stats: Dict[str, Any] = dict(_stage_counts)
+    total = sum(stats.values())
+    local = stats.get("local_pass", 0) + stats.get("local_fail", 0)
+    stats["total"] = total
+    stats["llm_avoided_ratio"] = local / total if total else 0.0
+    return stats
+
+
+default_metrics.register_counters("profanity_filter", profanity_stage_stats)
@@ -0,0 +1,261 @@
+import json
+import os
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from review_common.agent_pool import default_pool
+from review_common.concurrency import DEFAULT_TIMEOUT, run_limited
+from review_common.metrics import default_metrics
+from review_common.resilience import UNAVAILABLE_ERRORS
+from review_common.response_parser import parse_structured, reask_structured, reask_structured_async
+from review_common.tracing import add_event
+
+from .models import ImageMatchOutput, ProfanityCheckOutput, RatingConsistencyOutput
+
+SONNET_MODEL_ID = "us.anthropic.claude-3-7-sonnet-20250219-v1:0"
+HAIKU_MODEL_ID = "apac.anthropic.claude-3-haiku-20240307-v1:0"
+
+# 모델 등급 라우팅
+# - tiered: 저렴한 모델(Haiku)로 먼저 검사하고, 신뢰도가 기준보다 낮거나 응답 JSON을 해석할 수 없을 때만 Sonnet으로 재검사
+#   (기존에 Sonnet을 쓰던 욕설/이미지 검사만 해당, 평점 일치성 검사는 기존처럼 Haiku만 사용)
+# - off: 기존처럼 검사별 고정 모델 하나만 사용
+MODEL_ROUTING = os.environ.get("MODEL_ROUTING", "tiered")
+
+# 검사별 상위 모델로 넘기는 신뢰도 기준 (이 값보다 낮으면 재검사)
+PROFANITY_ESCALATION_THRESHOLD = float(os.environ.get("PROFANITY_ESCALATION_THRESHOLD", "0.8"))
+IMAGE_MATCH_ESCALATION_THRESHOLD = float(os.environ.get("IMAGE_MATCH_ESCALATION_THRESHOLD", "0.75"))
+# 평점 일치성 검사는 Haiku 한 단계라 재검사하지 않고, 기준 미만 응답은 low_confidence 통계로만 집계합니다
+RATING_ESCALATION_THRESHOLD = float(os.environ.get("RATING_ESCALATION_THRESHOLD", "0.7"))
+
+TIERED_MODELS = (HAIKU_MODEL_ID, SONNET_MODEL_ID)
+
+# 마지막 단계 응답도 해석할 수 없을 때 같은 Agent에 다시 묻는 프롬프트
+STRUCTURED_PROMPT = "방금 검사한 결과를 구조화된 형태로 추출하시오"
+
+
+@dataclass(frozen=True)
+class RoutingPolicy:
+    """검사 하나의 모델 등급 정책"""
+
+    check: str
+    # 저렴한 모델부터 차례로 시도할 모델 목록
+    tiers: Tuple[str, ...]
+    threshold: float
+    # 응답을 검증할 모델과 신뢰도 필드
+    output_model: Type[BaseModel]
+    confidence_field: str = "confidence"
+
+    def judge(self, output: Any) -> Tuple[Optional[Dict[str, Any]], str]:
+        """
+        모델 응답을 해석하고 판정합니다.
+
+        코드 블록이나 설명 문장이 섞인 응답도 로컬에서 복구해 output_model 로 검증합니다.
+
+        Returns:
+            Tuple[Optional[Dict], str]: (응답 JSON, accepted | low_confidence | malformed)
+        """
+        result = parse_structured(str(output), self.output_model, self.check)
+        if result is None:
+            return None, "malformed"
+        return self.verdict(result.model_dump())
+
+    def verdict(self, data: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+        """검증된 응답의 신뢰도를 기준과 비교합니다."""
+        confidence = data[self.confidence_field]
+        return data, "accepted" if confidence >= self.threshold else "low_confidence"
+
+
+def build_policies(mode: str = MODEL_ROUTING) -> Dict[str, RoutingPolicy]:
+    """라우팅 모드에 맞는 검사별 정책 (off 이면 기존 고정 모델 한 단계)"""
+    tiered = mode != "off"
+    return {
+        "profanity": RoutingPolicy(
+            "profanity",
+            TIERED_MODELS if tiered else (SONNET_MODEL_ID,),
+            PROFANITY_ESCALATION_THRESHOLD,
+            output_model=ProfanityCheckOutput,
+        ),
+        "image_match": RoutingPolicy(
+            "image_match",
+            TIERED_MODELS if tiered else (SONNET_MODEL_ID,),
+            IMAGE_MATCH_ESCALATION_THRESHOLD,
+            output_model=ImageMatchOutput,
+        ),
+        "rating_consistency": RoutingPolicy(
+            "rating_consistency",
+            (HAIKU_MODEL_ID,),
+            RATING_ESCALATION_THRESHOLD,
+            output_model=RatingConsistencyOutput,
+            confidence_field="sentiment_confidence",
+        ),
+    }
+
+
+ROUTING_POLICIES = build_policies()
+
+
+def routing_version(policies: Optional[Dict[str, RoutingPolicy]] = None) -> str:
+    """캐시 키에 넣을 라우팅 정책 문자열 (모델 목록이나 기준이 바뀌면 달라집니다)"""
+    policies = policies or ROUTING_POLICIES
+    return json.dumps(
+        {name: [list(policy.tiers), policy.threshold] for name, policy in sorted(policies.items())}
+    )
+
+
+def run_routed(check: str, system_prompt: str, message: Any) -> Dict[str, Any]:
+    """
+    정책에 따라 저렴한 모델부터 검사를 실행합니다.
+
+    중간 단계의 응답을 해석할 수 없으면 상위 모델로 넘기고, 마지막 단계의 응답까지
+    해석할 수 없을 때만 같은 Agent에 structured_output 으로 다시 묻습니다.
+    중간 단계 모델이 throttling/서킷 차단으로 응답하지 못해도 상위 모델로 넘깁니다.
+
+    Args:
+        check (str): 검사 이름 (profanity, image_match, rating_consistency)
+        system_prompt (str): 검사 Agent 시스템 프롬프트
+        message (Any): 검사 Agent에 보낼 메시지
+
+    Returns:
+        Dict[str, Any]: 검증된 검사 응답에 stage/model_id/model_tier/model_calls 를 더한 dict
+
+    Raises:
+        ModelUnavailableError, ModelThrottledException: 마지막 단계 모델까지 사용할 수 없을 때
+    """
+    policy = ROUTING_POLICIES[check]
+    model_calls = 0
+    for tier, model_id in enumerate(policy.tiers):
+        try:
+            with default_pool.checkout(model_id, system_prompt) as agent:
+                output = agent(message)
+                data, verdict = policy.judge(output)
+                if verdict == "malformed" and _is_last(policy, tier):
+                    result = reask_structured(agent, policy.output_model, STRUCTURED_PROMPT, policy.check)
+                    data, verdict = policy.verdict(result.model_dump())
+                    model_calls += 1
+        except UNAVAILABLE_ERRORS:
+            if _skip_unavailable(policy, tier):
+                continue
+            raise
+        model_calls += _cycle_count(output)
+        if _settle(policy, tier, verdict):
+            return _response(data, model_id, tier, model_calls)
+    raise AssertionError("unreachable")
+
+
+async def run_routed_async(
+    check: str, system_prompt: str, message: Any, timeout: Optional[float] = DEFAULT_TIMEOUT
+) -> Dict[str, Any]:
+    """run_routed 의 비동기 버전 (단계별 모델 호출이 각각 동시 호출 슬롯과 timeout을 사용)"""
+    policy = ROUTING_POLICIES[check]
+    model_calls = 0
+    for tier, model_id in enumerate(policy.tiers):
+
+        async def invoke():
+            with default_pool.checkout(model_id, system_prompt) as agent:
+                output = await agent.invoke_async(message)
+                data, verdict = policy.judge(output)
+                reasked = 0
+                if verdict == "malformed" and _is_last(policy, tier):
+                    result = await reask_structured_async(
+                        agent, policy.output_model, STRUCTURED_PROMPT, policy.check
+                    )
+                    reasked = 1
+                    data, verdict = policy.verdict(result.model_dump())
+                return output, data, verdict, reasked
+
+        try:
+            output, data, verdict, reasked = await run_limited(invoke, timeout)
+        except UNAVAILABLE_ERRORS:
+            if _skip_unavailable(policy, tier):
+                continue
+            raise
+        model_calls += _cycle_count(output) + reasked
+        if _settle(policy, tier, verdict):
+            return _response(data, model_id, tier, model_calls)
+    raise AssertionError("unreachable")
+
+
+def _settle(policy: RoutingPolicy, tier: int, verdict: str) -> bool:
+    """판정을 기록하고 이 단계의 응답을 사용할지(True) 다음 단계로 넘길지(False) 결정합니다."""
+    last = _is_last(policy, tier)
+    model_id = policy.tiers[tier]
+    with _stats_lock:
+        _tier_counts[(policy.check, model_id, "attempts")] += 1
+        _tier_counts[(policy.check, model_id, verdict)] += 1
+        if verdict == "accepted" or last:
+            _tier_counts[(policy.check, model_id, "served")] += 1
+    if verdict == "accepted" or last:
+        return True
+    add_event(
+        "model_routing.escalate",
+        {"check": policy.check, "from_model": model_id, "reason": verdict},
+    )
+    return False
+
+
+def _skip_unavailable(policy: RoutingPolicy, tier: int) -> bool:
+    """응답하지 못한 단계를 기록하고, 상위 모델이 남아 있으면 True (마지막 단계면 호출자가 예외를 다시 발생)"""
+    model_id = policy.tiers[tier]
+    with _stats_lock:
+        _tier_counts[(policy.check, model_id, "attempts")] += 1
+        _tier_counts[(policy.check, model_id, "unavailable")] += 1
+    if _is_last(policy, tier):
+        return False
+    add_event(
+        "model_routing.escalate",
+        {"check": policy.check, "from_model": model_id, "reason": "unavailable"},
+    )
+    return True
+
+
+def _is_last(policy: RoutingPolicy, tier: int) -> bool:
+    return tier == len(policy.tiers) - 1
+
+
+def _response(data: Dict[str, Any], model_id: str, tier: int, model_calls: int) -> Dict[str, Any]:
+    routing = {"stage": "model", "model_id": model_id, "model_tier": tier, "model_calls": model_calls}
+    return {**data, **routing}
+
+
+def _cycle_count(output: Any) -> int:
+    metrics = getattr(output, "metrics", None)
+    return getattr(metrics, "cycle_count", 0) if metrics is not None else 0
+
+
+_stats_lock = threading.Lock()
+_tier_counts: Counter = Counter()
+
+
+def routing_stats() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    검사별/모델별 라우팅 통계
+
+    Returns:
+        Dict: {검사: {모델 id: {attempts, accepted, low_confidence, malformed, unavailable, served, hit_rate, served_share}}}
+            hit_rate: 이 모델로 시도한 검사 중 상위 모델 없이 끝난(accepted) 비율
+            served_share: 해당 검사의 최종 응답 중 이 모델이 낸 비율
+    """
+    with _stats_lock:
+        counts = Counter(_tier_counts)
+    stats: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for (check, model_id, name), count in counts.items():
+        stats.setdefault(check, {}).setdefault(model_id, {})[name] = count
+    for models in stats.values():
+        total_served = sum(entry.get("served", 0) for entry in models.values())
+        for entry in models.values():
+            attempts = entry.get("attempts", 0)
+            entry["hit_rate"] = entry.get("accepted", 0) / attempts if attempts else 0.0
+            entry["served_share"] = entry.get("served", 0) / total_served if total_served else 0.0
+    return stats
+
+
+def _flat_stats() -> Dict[str, int]:
+    with _stats_lock:
+        return {f"{check}.{model_id}.{name}": count for (check, model_id, name), count in _tier_counts.items()}
+
+
+default_metrics.register_counters("model_routing", _flat_stats)
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import os
 import re
@@ -6,8 +7,17 @@ import time
 from typing import Any, Dict, List, Optional
 
 import logging
-from strands import Agent, tool
-from strands_tools import image_reader
+from strands import tool
+
+from review_common.concurrency import DEFAULT_TIMEOUT
+from review_common.metrics import instrumented
+from review_common.resilience import UNAVAILABLE_ERRORS, record_degraded
+from review_common.result_cache import prompt_version
+
+from .image_handoff import NO_IMAGE_REF, resolve_image
+from .image_preprocess import EncodedImage, verdict_cache
+from .profanity_filter import screen_profanity
+from .routing import routing_version, run_routed, run_routed_async
 
 # Configure the root strands logger 
 logging.getLogger("strands").setLevel(logging.INFO)
@@ -17,6 +27,9 @@ logging.basicConfig(
     format="%(levelname)s | %(name)s | %(message)s", handlers=[logging.StreamHandler()]
 )
 
+# 1단계 로컬 비속어 사전 사용 여부 (확실한 FAIL은 LLM 호출 없이 반환, PASS는 LOCAL_PROFANITY_PASS 참고)
+LOCAL_PROFANITY_FILTER = os.environ.get("LOCAL_PROFANITY_FILTER", "1") != "0"
+
 PROFANITY_PROMPT = """
     리뷰 내용이 부적절한 표현을 포함하고 있는지 검수해주세요:
 
@@ -80,8 +93,12 @@ RATING_CONSISTENCY_PROMPT = """
     }
 """
 
+# 이미지 매칭 결과 캐시 버전 (프롬프트나 모델이 바뀌면 이전 결과를 재사용하지 않습니다)
+IMAGE_MATCH_VERSION = prompt_version(IMAGE_MATCH_PROMPT, routing_version())
+
 
 @tool
+@instrumented("check_profanity")
 def check_profanity(content: str) -> Any:
     """
     리뷰 내용의 선정적/욕설 표현을 검수합니다.
@@ -92,48 +109,47 @@ def check_profanity(content: str) -> Any:
     Returns:
         Any: 검사 결과
     """
-    profanity_agent = Agent(
-        model="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
-        system_prompt=PROFANITY_PROMPT,
-    )
-    return profanity_agent(
-        f"다음 리뷰 내용의 선정적/욕설 표현을 검수하세요. <review_content>{content}</review_content>"
-    )
+    local_response = _local_profanity_response(content)
+    if local_response is not None:
+        return local_response
+
+    try:
+        return run_routed("profanity", PROFANITY_PROMPT, _profanity_message(content))
+    except UNAVAILABLE_ERRORS as e:
+        return _degraded_profanity_response(content, e)
 
 
 @tool
-def check_image_product_match(image_path: str, product_data: Dict) -> Any:
+@instrumented("check_image_product_match")
+def check_image_product_match(image_ref: str, product_data: Dict) -> Any:
     """
     리뷰에 업로드된 이미지와 실제 제품의 관련성을 검증합니다.
 
     Args:
-        media_files (List[Dict]): 업로드된 미디어 파일 정보
+        image_ref (str): 업로드된 이미지 참조 (mem://... 또는 이미지 파일 경로)
         product_data (Dict): 제품 정보
 
     Returns:
-        Any: 매칭 검사 결과
+        Any: 매칭 검사 결과 (모델을 쓸 수 없으면 SKIP, 참조한 이미지를 찾을 수 없으면 ERROR)
     """
+    if _no_image(image_ref):
+        return _NO_IMAGE_RESPONSE
+    image = resolve_image(image_ref)
+    if image is None:
+        return _missing_image_response(image_ref)
+    cached = _cached_image_verdict(image, product_data)
+    if cached is not None:
+        return cached
     try:
-        if not image_path or not os.path.exists(image_path):
-            return {
-                "status": "SKIP",
-                "reason": "업로드된 이미지가 없습니다.",
-                "confidence": 1.0,
-            }
-        image_match_agent = Agent(
-            model="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
-            system_prompt=IMAGE_MATCH_PROMPT,
-            tools=[image_reader],
-        )
-
-        return image_match_agent(
-            f"다음 이미지와 제품정보를 기반으로 상호관련 여부를 체크해주세요. <image_path>{image_path}</image_path> <product_data>{product_data}</product_data>"
-        )
-    except Exception as e:
-        return {"status": "ERROR", "reason": str(e), "confidence": 1.0}
+        result = run_routed("image_match", IMAGE_MATCH_PROMPT, _image_match_message(image, product_data))
+    except UNAVAILABLE_ERRORS as e:
+        return _unavailable_response("image_match", e)
+    _remember_image_verdict(image, product_data, result)
+    return result
 
 
 @tool
+@instrumented("check_rating_consistency")
 def check_rating_consistency(rating: int, content: str) -> Any:
     """
     별점과 리뷰 내용의 일치성을 분석합니다.
@@ -143,12 +159,196 @@ def check_rating_consistency(rating: int, content: str) -> Any:
         content (str): 리뷰 내용
 
     Returns:
-        Dict[str, Any]: 일치성 검사 결과
+        Dict[str, Any]: 일치성 검사 결과 (모델을 쓸 수 없으면 SKIP)
+    """
+    try:
+        return run_routed(
+            "rating_consistency", RATING_CONSISTENCY_PROMPT, _rating_consistency_message(rating, content)
+        )
+    except UNAVAILABLE_ERRORS as e:
+        return _unavailable_response("rating_consistency", e)
+
+
+# 비동기 검사 함수 (parallel 엔진의 비동기 경로에서 사용, 응답 형식은 위 도구와 동일)
+# 각 모델 호출은 전역 동시 호출 세마포어 안에서 timeout(초) 제한을 받습니다.
+# 메트릭은 동기 도구와 같은 이름으로 기록합니다.
+
+
+@instrumented("check_profanity")
+async def check_profanity_async(content: str, timeout: Optional[float] = DEFAULT_TIMEOUT) -> Any:
+    """check_profanity 의 비동기 버전"""
+    local_response = _local_profanity_response(content)
+    if local_response is not None:
+        return local_response
+
+    try:
+        return await run_routed_async(
+            "profanity", PROFANITY_PROMPT, _profanity_message(content), timeout
+        )
+    except UNAVAILABLE_ERRORS as e:
+        return _degraded_profanity_response(content, e)
+
+
+@instrumented("check_image_product_match")
+async def check_image_product_match_async(
+    image_ref: str, product_data: Dict, timeout: Optional[float] = DEFAULT_TIMEOUT
+) -> Any:
+    """check_image_product_match 의 비동기 버전 (시간 초과/취소는 호출자에게 전달됩니다)"""
+    if _no_image(image_ref):
+        return _NO_IMAGE_RESPONSE
+    image = await asyncio.to_thread(resolve_image, image_ref)
+    if image is None:
+        return _missing_image_response(image_ref)
+    cached = _cached_image_verdict(image, product_data)
+    if cached is not None:
+        return cached
+
+    try:
+        result = await run_routed_async(
+            "image_match", IMAGE_MATCH_PROMPT, _image_match_message(image, product_data), timeout
+        )
+    except UNAVAILABLE_ERRORS as e:
+        return _unavailable_response("image_match", e)
+    _remember_image_verdict(image, product_data, result)
+    return result
+
+
+@instrumented("check_rating_consistency")
+async def check_rating_consistency_async(
+    rating: int, content: str, timeout: Optional[float] = DEFAULT_TIMEOUT
+) -> Any:
+    """check_rating_consistency 의 비동기 버전"""
+    try:
+        return await run_routed_async(
+            "rating_consistency",
+            RATING_CONSISTENCY_PROMPT,
+            _rating_consistency_message(rating, content),
+            timeout,
+        )
+    except UNAVAILABLE_ERRORS as e:
+        return _unavailable_response("rating_consistency", e)
+
+
+def degraded_outputs(
+    content: str, product_data: Dict, image_ref: Optional[str], error: BaseException
+) -> Dict[str, Any]:
+    """
+    통합 검수 Agent를 사용할 수 없을 때 모델 없이 만들 수 있는 검사별 응답
+
+    - 욕설/비속어: 로컬 사전 판정 (확실하지 않으면 SKIP)
+    - 평점-내용 일치성: SKIP
+    - 이미지: 같은(거의 같은) 이미지의 이전 판정이 캐시에 있으면 사용, 없으면 SKIP
     """
-    rating_consistency_agent = Agent(
-        model="apac.anthropic.claude-3-haiku-20240307-v1:0",
-        system_prompt=RATING_CONSISTENCY_PROMPT,
-    )
-    return rating_consistency_agent(
-        f"다음 별점과 리뷰 내용의 일치성을 분석해주세요. <rating>{rating}</rating> <review_content>{content}</review_content>"
-    )
+    image_output = None
+    if not _no_image(image_ref):
+        image = resolve_image(image_ref)
+        if image is None:
+            image_output = _missing_image_response(image_ref)
+        else:
+            image_output = _cached_image_verdict(image, product_data) or _unavailable_response(
+                "image_match", error
+            )
+    return {
+        "profanity_check": _degraded_profanity_response(content, error),
+        "rating_consistency": _unavailable_response("rating_consistency", error),
+        "image_match": image_output,
+    }
+
+
+# run_routed 가 응답에 더하는 필드 (이미지 판정 캐시에는 저장하지 않음)
+_ROUTING_FIELDS = ("stage", "model_id", "model_tier", "model_calls")
+
+_NO_IMAGE_RESPONSE = {
+    "status": "SKIP",
+    "reason": "업로드된 이미지가 없습니다.",
+    "confidence": 1.0,
+}
+
+
+def _no_image(image_ref: Optional[str]) -> bool:
+    return not image_ref or image_ref == NO_IMAGE_REF
+
+
+def _missing_image_response(image_ref: str) -> Dict[str, Any]:
+    """
+    이미지 참조를 찾을 수 없을 때의 응답 (이미지가 없는 리뷰와 구분해 ERROR로 표시)
+
+    검사를 하지 못한 결과이므로 degraded 로 기록해 캐시에 저장되지 않게 합니다.
+    """
+    error = LookupError(f"이미지 참조를 찾을 수 없습니다: {image_ref}")
+    record_degraded("image_match", error)
+    return {
+        "status": "ERROR",
+        "reason": f"업로드된 이미지를 찾을 수 없어 이미지 검사를 하지 못했습니다: {image_ref}",
+        "confidence": 0.0,
+        "stage": "degraded",
+    }
+
+
+def _local_profanity_response(content: str) -> Optional[Dict[str, Any]]:
+    """로컬 사전으로 판정이 끝나면 도구 응답을, LLM 검사가 필요하면 None을 반환합니다."""
+    if not LOCAL_PROFANITY_FILTER:
+        return None
+    verdict = screen_profanity(content)
+    return verdict.as_tool_response() if verdict.decided else None
+
+
+def _degraded_profanity_response(content: str, error: BaseException) -> Dict[str, Any]:
+    """모델을 쓸 수 없을 때 로컬 사전 판정을 사용합니다. (LOCAL_PROFANITY_FILTER 설정과 관계없이)"""
+    verdict = screen_profanity(content)
+    if not verdict.decided:
+        return _unavailable_response("profanity", error)
+    record_degraded("profanity", error)
+    return {**verdict.as_tool_response(), "stage": "degraded_local"}
+
+
+def _unavailable_response(check: str, error: BaseException) -> Dict[str, Any]:
+    """모델을 쓸 수 없어 건너뛴 검사의 응답"""
+    record_degraded(check, error)
+    return {
+        "status": "SKIP",
+        "reason": f"모델 호출이 제한되어 검사를 건너뛰었습니다: {error}",
+        "confidence": 0.0,
+        "stage": "degraded",
+    }
+
+
+def _image_product_key(product_data: Dict) -> str:
+    """이미지 매칭 결과 캐시의 제품 키 (프롬프트/모델이 바뀌면 달라집니다)"""
+    return IMAGE_MATCH_VERSION + json.dumps(product_data, ensure_ascii=False, sort_keys=True, default=str)
+
+
+def _cached_image_verdict(image: EncodedImage, product_data: Dict) -> Optional[Dict[str, Any]]:
+    """같은 제품에 대해 같거나 거의 같은 이미지의 매칭 결과가 있으면 반환합니다."""
+    if image.phash is None:
+        return None
+    cached = verdict_cache.get(_image_product_key(product_data), image.phash)
+    if cached is None:
+        return None
+    return {**cached, "stage": "phash_cache"}
+
+
+def _remember_image_verdict(image: EncodedImage, product_data: Dict, output: Dict[str, Any]) -> None:
+    """모델의 이미지 매칭 결과를 지각 해시 캐시에 저장합니다. (해석할 수 없는 응답은 저장하지 않음)"""
+    if image.phash is None or "is_related" not in output:
+        return
+    verdict = {key: value for key, value in output.items() if key not in _ROUTING_FIELDS}
+    verdict_cache.put(_image_product_key(product_data), image.phash, verdict)
+
+
+def _profanity_message(content: str) -> str:
+    return f"다음 리뷰 내용의 선정적/욕설 표현을 검수하세요. <review_content>{content}</review_content>"
+
+
+def _image_match_message(image: EncodedImage, product_data: Dict) -> List[Dict[str, Any]]:
+    """이미지 바이트를 그대로 담은 메시지 (파일 저장/image_reader 재디코딩 없음)"""
+    return [
+        {
+            "text": f"다음 이미지와 제품정보를 기반으로 상호관련 여부를 체크해주세요. <product_data>{product_data}</product_data>"
+        },
+        image.as_content_block(),
+    ]
+
+
+def _rating_consistency_message(rating: int, content: str) -> str:
+    return f"다음 별점과 리뷰 내용의 일치성을 분석해주세요. <rating>{rating}</rating> <review_content>{content}</review_content>"
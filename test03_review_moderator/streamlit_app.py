@@ -1,14 +1,32 @@
+import io
 import os
 import sys
+import time
 from datetime import datetime
 
 import streamlit as st
 from PIL import Image
 
 sys.path.append(".")
+# 공통 모듈(review_common) import를 위해 저장소 루트를 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # 이미지 경로 설정
 IMAGES_DIR = os.path.join(os.path.dirname(__file__), "images")
+# 업로드 이미지 저장 폴더 (내용 주소 저장소, 리뷰에는 경로만 저장)
+UPLOADS_DIR = os.path.join(IMAGES_DIR, "uploads")
+
+from review_common.jobs import POLL_INTERVAL, BulkRun, default_job_queue
+from review_common.metrics import start_metrics_server
+from review_common.review_store import DEFAULT_PAGE_SIZE, default_review_store
+from review_common.tracing import setup_tracing
+from review_moderator.image_store import get_image_store
+
+# 검수 대상 상품 정보
+PRODUCT_DATA = {
+    "name": "프리미엄 무선 이어폰",
+    "category": "전자기기",
+}
 
 # 검수 에이전트 import 시도
 try:
@@ -19,6 +37,10 @@ except ImportError as e:
     print(f"Agent import 실패: {e}")
     AGENT_AVAILABLE = False
 
+# METRICS_PORT 가 설정되어 있으면 /metrics 엔드포인트를, TRACE_EXPORTER 가 설정되어 있으면 트레이스 내보내기를 켭니다 (프로세스당 한 번)
+start_metrics_server()
+setup_tracing()
+
 st.set_page_config(page_title="Lab 03. 리뷰 검수 Agent", page_icon="🛍️", layout="wide")
 
 st.markdown(
@@ -85,62 +107,160 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-if "comments" not in st.session_state:
-    st.session_state.comments = [
-        {
-            "id": 1,
-            "author": "김민수",
-            "rating": 5,
-            "content": "이 제품 정말 좋아요! 음질도 훌륭하고 배터리도 오래 갑니다.",
-            "timestamp": "2024-01-15 14:30",
-            "image": None,
-        },
-        {
-            "id": 2,
-            "author": "이영희",
-            "rating": 1,
-            "content": "완전 쓰레기네요. 돈 아까워요.",
-            "timestamp": "2024-01-14 10:20",
-            "image": None,
-        },
-        {
-            "id": 3,
-            "author": "박철수",
-            "rating": 5,
-            "content": "별로예요. 기대했는데 실망이에요.",
-            "timestamp": "2024-01-13 16:45",
-            "image": None,
-        },
-        {
-            "id": 4,
-            "author": "최지훈",
-            "rating": 4,
-            "content": "이어폰 디자인이 깔끔하고 착용감도 편해요. 음질은 가격대비 괜찮은 것 같아요. 아침에 운동할 때 써봤는데 떨어지지도 않고 좋네요!",
-            "timestamp": "2024-01-12 09:15",
-            "image_path": os.path.join(IMAGES_DIR, "earphone.png"),
-        },
-        {
-            "id": 5,
-            "author": "정수연",
-            "rating": 3,
-            "content": "이어폰 만만세",
-            "timestamp": "2024-01-11 16:22",
-            "image_path": os.path.join(IMAGES_DIR, "flower.webp"),
-        },
-    ]
-
-# 검수 결과 저장용 session state
+# 리뷰 저장소의 상품 id (예시 리뷰는 상품에 리뷰가 하나도 없을 때만 저장)
+PRODUCT_ID = "lab03-premium-earphone"
+SEED_REVIEWS = [
+    {
+        "author": "김민수",
+        "rating": 5,
+        "content": "이 제품 정말 좋아요! 음질도 훌륭하고 배터리도 오래 갑니다.",
+        "timestamp": "2024-01-15 14:30",
+    },
+    {
+        "author": "이영희",
+        "rating": 1,
+        "content": "완전 쓰레기네요. 돈 아까워요.",
+        "timestamp": "2024-01-14 10:20",
+    },
+    {
+        "author": "박철수",
+        "rating": 5,
+        "content": "별로예요. 기대했는데 실망이에요.",
+        "timestamp": "2024-01-13 16:45",
+    },
+    {
+        "author": "최지훈",
+        "rating": 4,
+        "content": "이어폰 디자인이 깔끔하고 착용감도 편해요. 음질은 가격대비 괜찮은 것 같아요. 아침에 운동할 때 써봤는데 떨어지지도 않고 좋네요!",
+        "timestamp": "2024-01-12 09:15",
+        "image_path": os.path.join(IMAGES_DIR, "earphone.png"),
+    },
+    {
+        "author": "정수연",
+        "rating": 3,
+        "content": "이어폰 만만세",
+        "timestamp": "2024-01-11 16:22",
+        "image_path": os.path.join(IMAGES_DIR, "flower.webp"),
+    },
+]
+
+if "reviews_seeded" not in st.session_state:
+    default_review_store.seed_reviews(PRODUCT_ID, SEED_REVIEWS)
+    st.session_state.reviews_seeded = True
+
+# 현재 페이지 (0부터)
+if "review_page" not in st.session_state:
+    st.session_state.review_page = 0
+
+# 검수 결과 (현재 페이지의 결과를 저장소에서 읽어 둠)
 if "comment_moderation_results" not in st.session_state:
     st.session_state.comment_moderation_results = {}
 
+# 백그라운드에서 검수 중인 작업 (comment id -> 작업 id)
+if "moderation_jobs" not in st.session_state:
+    st.session_state.moderation_jobs = {}
+
+# "전체 검수" 진행 상황 (BulkRun)
+if "moderation_bulk" not in st.session_state:
+    st.session_state.moderation_bulk = None
+
+
+def run_moderation(content, rating, image=None, image_path=None):
+    """백그라운드 작업에서 실행하는 리뷰 검수 (결과를 세션에 저장할 형태로 반환)"""
+    # 이미지 로드 (PIL Image로 변환)
+    if image is None and image_path:
+        try:
+            image = Image.open(image_path)
+        except Exception:
+            pass
+
+    result = moderate_review(
+        review_content=content,
+        rating=rating,
+        product_data=PRODUCT_DATA,
+        image=image,
+    )
+
+    moderation_result = result["moderation_result"]
+    if hasattr(moderation_result, "model_dump"):
+        moderation_result_dict = moderation_result.model_dump()
+    else:
+        moderation_result_dict = moderation_result
+
+    return {
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "review_text": content,
+        "rating": rating,
+        "overall_status": moderation_result_dict["overall_status"],
+        "details": moderation_result_dict,
+        "failed_checks": moderation_result_dict.get("failed_checks", []),
+        "raw_response": result.get("raw_response", ""),
+        "degraded": result.get("degraded", False),
+    }
+
+
+def submit_moderation(comment, image=None):
+    """댓글 검수를 백그라운드 작업으로 제출 (막 업로드한 이미지는 다시 읽지 않도록 그대로 전달)"""
+    st.session_state.moderation_jobs[comment["id"]] = default_job_queue.submit(
+        run_moderation,
+        comment["content"],
+        comment["rating"],
+        image=image,
+        image_path=comment.get("image_path"),
+    )
+
+
+def submit_moderation_job(comment_id):
+    """댓글 검수 작업을 제출하고 작업 id를 반환"""
+    comment = default_review_store.get_review(comment_id)
+    return default_job_queue.submit(
+        run_moderation,
+        comment["content"],
+        comment["rating"],
+        image_path=comment.get("image_path"),
+    )
+
+
+def store_uploaded_image(image):
+    """업로드 이미지를 이미지 저장소에 저장하고 경로를 반환"""
+    image_format = image.format if image.format else "PNG"
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format)
+    return get_image_store(UPLOADS_DIR).put(buffer.getvalue(), image_format.lower())
+
+
+def needs_moderation(comment):
+    """검수 결과가 없거나, 모델 없이 로컬 결과로 대체됐거나, 검수 이후 리뷰 내용/평점이 바뀐 경우"""
+    result = st.session_state.comment_moderation_results.get(comment["id"])
+    return (
+        result is None
+        or result.get("degraded")
+        or result.get("review_text") != comment["content"]
+        or result.get("rating") != comment["rating"]
+    )
+
+
+# 끝난 백그라운드 검수 작업의 결과를 반영
+for comment_id, job in default_job_queue.collect_pending(
+    st.session_state.moderation_jobs
+).items():
+    bulk = st.session_state.moderation_bulk
+    if job.status == "done":
+        default_review_store.save_result(
+            comment_id, "moderation", job.result, status=job.result["overall_status"]
+        )
+    elif bulk and comment_id in bulk.item_ids:
+        bulk.record_error(comment_id, job.error)
+    else:
+        st.toast(f"검수 중 오류가 발생했습니다: {job.error}")
+
 # 메인 콘텐츠 영역)
 st.header("🏷️ Lab 03. 리뷰 검수 Agent")
 st.subheader("부적절 리뷰 검수 시스템 실습")
 st.markdown("---")
 
-total_reviews = len(st.session_state.comments)
-total_rating = sum([comment["rating"] for comment in st.session_state.comments])
-average_rating = total_rating / total_reviews if total_reviews else 0
+# 리뷰 수/평균 평점은 DB에서 집계 (전체 리뷰를 메모리로 읽지 않음)
+total_reviews, average_rating = default_review_store.rating_summary(PRODUCT_ID)
 
 st.subheader("📦 상품 정보")
 st.markdown(
@@ -167,7 +287,59 @@ st.markdown(
 
 st.subheader("💬 댓글 목록")
 
-for comment in reversed(st.session_state.comments):
+# 현재 페이지의 리뷰와 검수 결과만 조회 (최신 리뷰부터, 검수 상태로 필터링 가능)
+status_filter = st.radio(
+    "검수 상태",
+    ["전체", "PASS", "FAIL", "pending"],
+    format_func=lambda x: {"pending": "미검수"}.get(x, x),
+    horizontal=True,
+    key="status_filter",
+)
+status = None if status_filter == "전체" else status_filter
+filtered_reviews = default_review_store.count_reviews(PRODUCT_ID, status=status)
+page_count = max(1, -(-filtered_reviews // DEFAULT_PAGE_SIZE))
+st.session_state.review_page = min(st.session_state.review_page, page_count - 1)
+comments = default_review_store.list_reviews(
+    PRODUCT_ID,
+    limit=DEFAULT_PAGE_SIZE,
+    offset=st.session_state.review_page * DEFAULT_PAGE_SIZE,
+    status=status,
+)
+st.session_state.comment_moderation_results = default_review_store.get_results(
+    [c["id"] for c in comments], "moderation"
+)
+
+# 미검수 댓글 전체 검수 (동시 실행 수 제한, 진행 상황 표시)
+if AGENT_AVAILABLE:
+    moderation_bulk = st.session_state.moderation_bulk
+    if moderation_bulk:
+        moderation_bulk.dispatch(st.session_state.moderation_jobs, submit_moderation_job)
+
+    bulk_targets = [
+        c["id"]
+        for c in comments
+        if needs_moderation(c) and c["id"] not in st.session_state.moderation_jobs
+    ]
+    bulk_running = moderation_bulk is not None and moderation_bulk.completed(
+        st.session_state.moderation_jobs
+    ) < len(moderation_bulk.item_ids)
+    if st.button(
+        f"⚡ 미검수 댓글 전체 검수 ({len(bulk_targets)}건)",
+        type="primary",
+        disabled=bulk_running or not bulk_targets,
+    ):
+        st.session_state.moderation_bulk = BulkRun(bulk_targets)
+        st.rerun()
+
+    if moderation_bulk:
+        done = moderation_bulk.completed(st.session_state.moderation_jobs)
+        total = len(moderation_bulk.item_ids)
+        label = "전체 검수 완료" if done == total else "전체 검수 중..."
+        st.progress(done / total, text=f"{label} {done}/{total}")
+        for comment_id, error in moderation_bulk.errors.items():
+            st.error(f"댓글 #{comment_id} 검수 실패: {error}")
+
+for comment in comments:
     with st.container():
         col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
 
@@ -175,8 +347,8 @@ for comment in reversed(st.session_state.comments):
             st.write(f"**{comment['author']}**")
             st.write(comment["content"])
 
-            # 이미지 표시 (image 또는 image_path)
-            image_to_display = comment.get("image") or comment.get("image_path")
+            # 이미지 표시
+            image_to_display = comment.get("image_path")
             if image_to_display:
                 st.write("📷 **첨부된 이미지:**")
                 try:
@@ -204,57 +376,21 @@ for comment in reversed(st.session_state.comments):
             st.caption(comment["timestamp"])
 
         with col4:
+            is_running = comment["id"] in st.session_state.moderation_jobs
             if st.button(
-                "🔍 검수하기",
+                "⏳ 검수 중..." if is_running else "🔍 검수하기",
                 key=f"review_{comment['id']}",
                 type="primary",
                 use_container_width=True,
+                disabled=is_running,
             ):
                 if not AGENT_AVAILABLE:
                     st.warning("검수 에이전트를 사용할 수 없습니다.")
                     continue
 
-                with st.spinner("검수 중..."):
-                    try:
-                        product_data = {
-                            "name": "프리미엄 무선 이어폰",
-                            "category": "전자기기",
-                        }
-
-                        # 이미지 로드 (PIL Image로 변환)
-                        image = None
-                        if comment.get("image"):
-                            image = comment["image"]
-                        elif comment.get("image_path"):
-                            try:
-                                image = Image.open(comment["image_path"])
-                            except Exception:
-                                pass
-
-                        result = moderate_review(
-                            review_content=comment["content"],
-                            rating=comment["rating"],
-                            product_data=product_data,
-                            image=image,
-                        )
-
-                        moderation_result = result["moderation_result"]
-                        if hasattr(moderation_result, "model_dump"):
-                            moderation_result_dict = moderation_result.model_dump()
-                        else:
-                            moderation_result_dict = moderation_result
-
-                        st.session_state.comment_moderation_results[comment["id"]] = {
-                            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            "overall_status": moderation_result_dict["overall_status"],
-                            "details": moderation_result_dict,
-                            "failed_checks": moderation_result_dict.get(
-                                "failed_checks", []
-                            ),
-                            "raw_response": result.get("raw_response", ""),
-                        }
-                    except Exception as e:
-                        st.error(f"검수 중 오류가 발생했습니다: {str(e)}")
+                # 검수는 백그라운드 작업으로 실행하고, 결과는 다음 화면 갱신 때 반영합니다
+                submit_moderation(comment)
+                st.rerun()
 
         # 검수 결과가 있으면 펼치기/접기 메뉴 표시
         if comment["id"] in st.session_state.comment_moderation_results:
@@ -333,6 +469,23 @@ for comment in reversed(st.session_state.comments):
 
         st.markdown("---")
 
+# 페이지 이동
+col_prev, col_page, col_next = st.columns([1, 2, 1])
+with col_prev:
+    if st.button("◀ 이전", disabled=st.session_state.review_page == 0, use_container_width=True):
+        st.session_state.review_page -= 1
+        st.rerun()
+with col_page:
+    st.caption(f"{st.session_state.review_page + 1} / {page_count} 페이지")
+with col_next:
+    if st.button(
+        "다음 ▶",
+        disabled=st.session_state.review_page >= page_count - 1,
+        use_container_width=True,
+    ):
+        st.session_state.review_page += 1
+        st.rerun()
+
 st.markdown("---")
 
 st.subheader("✍️ 새 댓글 작성")
@@ -372,59 +525,27 @@ with st.form("comment_form"):
                     st.error(f"이미지 처리 중 오류가 발생했습니다: {e}")
                     st.stop()
 
-            new_comment = {
-                "id": len(st.session_state.comments) + 1,
-                "author": author_name,
-                "rating": rating,
-                "content": comment_content,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M"),
-                "image": image,
-            }
-            st.session_state.comments.append(new_comment)
+            new_comment = default_review_store.add_review(
+                PRODUCT_ID,
+                author=author_name,
+                rating=rating,
+                content=comment_content,
+                image_path=store_uploaded_image(image) if image else None,
+            )
+            st.session_state.review_page = 0
             st.success("댓글이 등록되었습니다!")
 
-            # 자동 검수 수행 (AGENT_AVAILABLE인 경우)
+            # 자동 검수 수행 (AGENT_AVAILABLE인 경우, 백그라운드 작업으로 제출만 하고 바로 반환)
             if AGENT_AVAILABLE:
-                with st.spinner("새 댓글 자동 검수 중..."):
-                    try:
-                        # 상품 정보 준비
-                        product_data = {
-                            "name": "프리미엄 무선 이어폰",
-                            "category": "전자기기",
-                        }
-
-                        # 에이전트로 검수 실행
-                        result = moderate_review(
-                            review_content=comment_content,
-                            rating=rating,
-                            product_data=product_data,
-                            image=image,
-                        )
-
-                        moderation_result = result["moderation_result"]
-                        if hasattr(moderation_result, "model_dump"):
-                            moderation_result_dict = moderation_result.model_dump()
-                        else:
-                            moderation_result_dict = moderation_result
-
-                        # 검수 결과를 comment별로 저장
-                        st.session_state.comment_moderation_results[
-                            new_comment["id"]
-                        ] = {
-                            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            "overall_status": moderation_result_dict["overall_status"],
-                            "details": moderation_result_dict,
-                            "failed_checks": moderation_result_dict.get(
-                                "failed_checks", []
-                            ),
-                            "raw_response": result.get("raw_response", ""),
-                        }
-
-                    except Exception as e:
-                        st.error(f"자동 검수 중 오류가 발생했습니다: {str(e)}")
+                submit_moderation(new_comment, image=image)
 
             st.rerun()
         else:
             st.error("작성자명과 댓글 내용을 모두 입력해주세요.")
 
 st.markdown("---")
+
+# 검수 중인 작업이 있으면 잠시 후 다시 그려 결과를 반영합니다
+if st.session_state.moderation_jobs:
+    time.sleep(POLL_INTERVAL)
+    st.rerun()